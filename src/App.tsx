@@ -1,10 +1,14 @@
-import React, { useEffect, useState } from 'react'
-import Graph from './components/Graph'
+import React, { useCallback, useEffect, useRef, useState } from 'react'
+import Graph, { type PrecomputedLayout } from './components/Graph'
 import Sidebar from './components/Sidebar'
 import CharacterTabs from './components/CharacterTabs'
 import Legend from './components/Legend'
 import SearchBar from './components/SearchBar'
 import useStore from './store'
+import {
+  fetchQuestData, fetchQuestPart, mergeQuestPart, partsForZone,
+  type QuestManifest, type QuestTask,
+} from './utils/questData'
 import './styles.css'
 
 type Quest = {
@@ -23,28 +27,47 @@ type Quest = {
   not_prerequisites?: string[]
   repeatable?: boolean
   priority?: number
+  tasks?: QuestTask[]
 }
 
 type Data = {
+  schema_version?: number
   generated_at: string
   quest_count: number
   edge_count: number
   quests: Quest[]
+  layout?: PrecomputedLayout
 }
 
 export default function App() {
   const [data, setData] = useState<Data | null>(null)
   const [loading, setLoading] = useState(true)
   const [error, setError] = useState<string | null>(null)
+  const [manifest, setManifest] = useState<QuestManifest | null>(null)
+  const requestedParts = useRef(new Set<string>())
 
   useEffect(() => {
-    fetch('/data/quests.json')
-      .then(r => r.json())
-      .then((json: Data) => setData(json))
+    fetchQuestData<Data>()
+      .then(({ data, manifest }) => { setData(data); setManifest(manifest) })
       .catch(e => setError(String(e)))
       .finally(() => setLoading(false))
   }, [])
 
+  // Sortie découpée : champs lourds (tâches, récompenses) chargés pour la zone affichée
+  const loadZone = useCallback((zone: string) => {
+    if (!manifest) return
+    for (const key of partsForZone(manifest, zone)) {
+      if (requestedParts.current.has(key)) continue
+      requestedParts.current.add(key)
+      fetchQuestPart(manifest, key)
+        .then(part => setData(d => (d ? mergeQuestPart(d, part) : d)))
+        .catch(e => {
+          requestedParts.current.delete(key)
+          console.warn(`part ${key} non chargée`, e)
+        })
+    }
+  }, [manifest])
+
   const activeCharacter = useStore(s => s.characters.find(c => c.id === s.activeId))
 
   if (loading) return <div className="center">Chargement…</div>
@@ -58,7 +81,7 @@ export default function App() {
         <CharacterTabs />
       </header>
       <section className="content">
-        <Graph quests={data.quests} />
+        <Graph quests={data.quests} layout={data.layout} onZoneChange={loadZone} />
         <Sidebar />
       </section>
       <footer className="footer">
@@ -20,6 +20,9 @@ type Quest = {
   rewards?: string[]
   prerequisites: string[]
   not_prerequisites?: string[]
+  redundant_prerequisites?: string[]
+  alternative_prerequisites?: string[]
+  depth?: number
   repeatable?: boolean
   priority?: number
 }
@@ -38,6 +41,9 @@ function zoneColor(zoneId?: number|null) {
 }
 
 
+// Layout précalculé par tools/graph_layout.py : layout[direction][zone|'all'][id] = [x, y, bande, priorité]
+export type PrecomputedLayout = Record<string, Record<string, Record<string, [number, number, number, number]>>>
+
 const nodeTypes = { card: NodeCard }
 
 const MiniMapNode = (props: any) => {
@@ -125,11 +131,19 @@ function bandFrom(
 
 
 
-function GraphInner({ quests }: { quests: Quest[] }) {
+type GraphProps = {
+  quests: Quest[]
+  layout?: PrecomputedLayout
+  // zone affichée ('all' = toutes) : le parent charge les données détaillées correspondantes
+  onZoneChange?: (zone: string) => void
+}
+
+function GraphInner({ quests, layout, onZoneChange }: GraphProps) {
   const active = useStore(s => s.characters.find(c => c.id === s.activeId))
   const [direction, setDirection] = useState<'LR'|'TB'>('LR')
   const [onlyTodo, setOnlyTodo] = useState(false)
   const [filterZone, setFilterZone] = useState<string>('all')
+  React.useEffect(() => { onZoneChange?.(filterZone) }, [filterZone, onZoneChange])
   const reactFlow = useReactFlow()
   // Résultat layouté (ELK étant async)
   const [rfNodes, setRfNodes] = React.useState<Node[]>([])
@@ -195,9 +209,15 @@ function GraphInner({ quests }: { quests: Quest[] }) {
     const edgesNeg: Edge[] = []
     const ids = new Set(enriched.map(f=>f.id))
     for (const q of enriched) {
+      // Vue complète : on ne dessine pas les arêtes redondantes (réduction transitive du
+      // convertisseur). En vue par zone l'intermédiaire peut être filtré : on les garde.
+      const redundant = new Set(filterZone === 'all' ? (q.redundant_prerequisites ?? []) : [])
+      // prérequis sous un '||' : une alternative parmi d'autres -> trait pointillé
+      const alternative = new Set(q.alternative_prerequisites ?? [])
       for (const src of q.prerequisites) {
         if (!ids.has(src)) continue
         if (src === q.id) continue
+        if (redundant.has(src)) continue
         edgesPosRaw.push({
           id: `${src}->${q.id}`,
           source: src,
@@ -206,7 +226,9 @@ function GraphInner({ quests }: { quests: Quest[] }) {
           targetHandle: 'l',
           markerEnd: { type: MarkerType.ArrowClosed, width: 16, height: 16 },
           animated: !done.has(q.id),
-          style: { strokeWidth: 1.5, stroke: '#ffffff' },
+          style: alternative.has(src)
+            ? { strokeWidth: 1.5, stroke: '#ffffff', strokeDasharray: '6 4' }
+            : { strokeWidth: 1.5, stroke: '#ffffff' },
         })
       }
       for (const src of (q.not_prerequisites ?? [])) {
@@ -284,6 +306,28 @@ function GraphInner({ quests }: { quests: Quest[] }) {
         return
       }
       const isHorizontal = direction === 'LR'
+
+      // 0) Vue précalculée par le convertisseur : on l'applique telle quelle (pas d'ELK).
+      //    Si un nœud manque (JSON ancien / données différentes), on retombe sur ELK.
+      const pre = layout?.[direction]?.[filterZone]
+      if (pre && nodesRaw.every(n => pre[n.id])) {
+        const laid = nodesRaw.map(n => {
+          const [x, y, band, priority] = pre[n.id]
+          return {
+            ...n,
+            data: { ...(n.data as any), band, priority },
+            position: { x, y },
+            sourcePosition: isHorizontal ? Position.Right : Position.Bottom,
+            targetPosition: isHorizontal ? Position.Left : Position.Top,
+          } as Node
+        })
+        if (!cancelled) {
+          setRfNodes(laid)
+          setRfEdges([...edgesPosRaw, ...edgesNeg])
+        }
+        return
+      }
+
       // 1) Construire nodesRaw / edgesPosRaw (déjà fait au-dessus)
       //    -> enrichir avec priorité + bande
       // Map des successeurs (pour trouver la descendance des LEVEL)
@@ -563,7 +607,7 @@ function GraphInner({ quests }: { quests: Quest[] }) {
       }
     })()
     return () => { cancelled = true }
-  }, [base, direction])
+  }, [base, direction, layout, filterZone])
 
   React.useEffect(() => {
     const handler = (e: any) => {
@@ -571,7 +615,10 @@ function GraphInner({ quests }: { quests: Quest[] }) {
       const query = queryRaw.toLowerCase()
       if (!query) return
       const nodes = reactFlow.getNodes()
-      let target = nodes.find(n => n.id.toLowerCase() === query)
+      // id résolu par l'index de recherche (SearchBar), sinon parcours des nœuds affichés
+      const hitId: string | undefined = e?.detail?.id
+      let target = hitId ? nodes.find(n => n.id === hitId) : undefined
+      if (!target) target = nodes.find(n => n.id.toLowerCase() === query)
       if (!target) {
         target = nodes.find(n => {
           const title = String((n.data as any)?.title ?? '').toLowerCase()
@@ -728,11 +775,11 @@ function GraphInner({ quests }: { quests: Quest[] }) {
   )
 }
 
-export default function Graph({ quests }: { quests: Quest[] }) {
+export default function Graph({ quests, layout, onZoneChange }: GraphProps) {
   // Fournit le contexte React Flow pour GraphInner (où l’on utilise useReactFlow).
   return (
     <ReactFlowProvider>
-      <GraphInner quests={quests} />
+      <GraphInner quests={quests} layout={layout} onZoneChange={onZoneChange} />
     </ReactFlowProvider>
   )
 }
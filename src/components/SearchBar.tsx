@@ -1,7 +1,18 @@
-import React, { useEffect, useState } from 'react'
+import React, { useEffect, useMemo, useRef, useState } from 'react'
+import { fetchSearchIndex, type QuestSearchIndex } from '../utils/searchIndex'
 
 export default function SearchBar() {
   const [q, setQ] = useState('')
+  // index précalculé (null = absent : on retombe sur la recherche dans les nœuds du graphe)
+  const [index, setIndex] = useState<QuestSearchIndex | null>(null)
+  const indexRequested = useRef(false)
+
+  const loadIndex = () => {
+    if (indexRequested.current) return
+    indexRequested.current = true
+    fetchSearchIndex().then(setIndex).catch(() => setIndex(null))
+  }
+
   useEffect(() => {
     const onKey = (e: KeyboardEvent) => {
       if (e.key === 'k' && (e.ctrlKey || e.metaKey)) {
@@ -14,16 +25,23 @@ export default function SearchBar() {
     return () => window.removeEventListener('keydown', onKey)
   }, [])
 
+  const hits = useMemo(() => (index && q.trim() ? index.search(q, 8) : []), [index, q])
+
   const onSubmit = (e: React.FormEvent) => {
     e.preventDefault()
     const query = q.trim()
     if (!query) return
-    window.dispatchEvent(new CustomEvent('focus-node', { detail: { query } }))
+    const exact = hits.find(h => h.id === query)
+    window.dispatchEvent(new CustomEvent('focus-node', { detail: { query, id: (exact ?? hits[0])?.id } }))
   }
 
   return (
     <form onSubmit={onSubmit} className="controls" style={{ justifyContent:'center' }}>
-      <input id="search-input" placeholder="Rechercher une quête (Ctrl/Cmd+K)…" value={q} onChange={e=>setQ(e.target.value)} />
+      <input id="search-input" list="search-hits" placeholder="Rechercher une quête (Ctrl/Cmd+K)…" value={q}
+        onFocus={loadIndex} onChange={e=>setQ(e.target.value)} />
+      <datalist id="search-hits">
+        {hits.map(h => <option key={h.id} value={h.id}>{h.title}</option>)}
+      </datalist>
       <button type="submit">OK</button>
     </form>
   )
@@ -0,0 +1,256 @@
+// Chargement de public/data/quests.json, quel que soit le schéma produit par tools/convert_csv_to_json.py
+//  - schéma 1 (pas de schema_version) : chaque quête embarque ses lignes ObjectiveTasks
+//      quests[].tasks = [{ task_id, data }]
+//  - schéma 2 : table commune dédupliquée, les quêtes ne référencent que des IDs
+//      tasks = { [task_id]: row }   quests[].tasks = [task_id]
+// On ramène tout au schéma 1 pour que les composants n'aient qu'une forme à gérer.
+
+export type TaskRow = Record<string, unknown>
+export type QuestTask = { task_id: string; data?: TaskRow }
+
+export type RawQuestData = {
+  schema_version?: number
+  tasks?: Record<string, TaskRow>
+  quests: Array<Record<string, any>>
+  [key: string]: any
+}
+
+// Tables de chaînes (convert_csv_to_json.py --intern, cf. tools/string_tables.py) : les champs
+// listés dans interned.fields portent un indice dans interned.strings, et les caractères
+// U+E000 + n des chaînes de la table et des textes listés dans interned.texts remplacent
+// le préfixe d'URL interned.prefixes[n]. Les quêtes décodées partagent les mêmes chaînes.
+export type InternedTables = {
+  version: number
+  strings: string[]
+  prefixes: string[]
+  fields: Record<'quest' | 'item_reward' | 'task', string[]>
+  texts: string[]
+}
+
+const INTERN_VERSION = 1
+const PUA = /[\ue000-\uf8ff]/g
+
+export function decodeInterned(json: RawQuestData): RawQuestData {
+  const meta = json.interned as InternedTables | undefined
+  if (!meta) return json
+  if (meta.version !== INTERN_VERSION) throw new Error(`tables de chaînes version ${meta.version} non supportée`)
+  const { prefixes } = meta
+  const expand = (text: string) =>
+    prefixes.length ? text.replace(PUA, c => prefixes[c.charCodeAt(0) - 0xe000]) : text
+  const strings = meta.strings.map(expand)
+  const restore = (fields: string[]) => (rec: Record<string, any>) => {
+    const out = { ...rec }
+    for (const f of fields) if (typeof out[f] === 'number') out[f] = strings[out[f]]
+    return out
+  }
+  const quest = restore(meta.fields.quest ?? [])
+  const itemReward = restore(meta.fields.item_reward ?? [])
+  const task = restore(meta.fields.task ?? [])
+  const quests = json.quests.map(raw => {
+    const q = quest(raw)
+    if (Array.isArray(q.item_rewards)) {
+      q.item_rewards = q.item_rewards.map((it: any) => (it && typeof it === 'object' ? itemReward(it) : it))
+    }
+    for (const f of meta.texts) {
+      if (Array.isArray(q[f])) q[f] = q[f].map((t: unknown) => (typeof t === 'string' ? expand(t) : t))
+    }
+    if (Array.isArray(q.tasks)) {
+      q.tasks = q.tasks.map((t: string | QuestTask) =>
+        typeof t === 'object' && t?.data ? { ...t, data: task(t.data) } : t)
+    }
+    return q
+  })
+  const { interned: _meta, ...rest } = json
+  const data: RawQuestData = { ...rest, quests }
+  if (json.tasks) data.tasks = Object.fromEntries(Object.entries(json.tasks).map(([t, row]) => [t, task(row)]))
+  return data
+}
+
+export function normalizeQuestData<T extends { quests: any[] }>(json: RawQuestData): T {
+  json = decodeInterned(json)
+  const version = Number(json.schema_version ?? 1)
+  if (version < 2) return json as unknown as T
+
+  const table = json.tasks ?? {}
+  const quests = json.quests.map(q => ({
+    ...q,
+    tasks: (Array.isArray(q.tasks) ? q.tasks : []).map((t: string | QuestTask): QuestTask => {
+      if (typeof t !== 'string') return t
+      const data = table[t]
+      return data ? { task_id: t, data } : { task_id: t }
+    }),
+  }))
+  const { tasks: _table, ...rest } = json
+  return { ...rest, quests } as unknown as T
+}
+
+// Sortie découpée (convert_csv_to_json.py --split) : quests.manifest.json ne porte des quêtes
+// que ce qu'affiche le graphe (id, titre, type, zone, niveaux, prérequis…), chacune avec sa
+// `part` ; description, tâches, récompenses… sont dans des fichiers hashés chargés à la
+// demande (zone affichée).
+export type QuestPart = {
+  schema_version?: number
+  part: string
+  quests: Record<string, Record<string, any>>
+  tasks?: Record<string, TaskRow>
+  layout?: Record<string, Record<string, any>>
+}
+
+export type QuestManifest = RawQuestData & {
+  split_by: 'zone' | 'type'
+  parts: Record<string, { file: string; quests: number; bytes: number }>
+  cross_part_edges: Array<[string, string, 'pre' | 'not']>
+}
+
+// Manifest si le build l'a produit, sinon quests.json complet (manifest = null)
+export async function fetchQuestData<T extends { quests: any[] }>(
+  base = '/data'
+): Promise<{ data: T; manifest: QuestManifest | null }> {
+  const res = await fetch(`${base}/quests.manifest.json`)
+  if (res.ok && (res.headers.get('content-type') ?? '').includes('json')) {
+    const manifest = (await res.json()) as QuestManifest
+    return { data: manifest as unknown as T, manifest }
+  }
+  return { data: normalizeQuestData<T>(await fetchFullQuestData(base)), manifest: null }
+}
+
+// Delta entre deux builds (convert_csv_to_json.py --delta-from) : s'applique à la sortie
+// dont le generated_at vaut base.generated_at (cf. tools/quest_delta.py)
+export type QuestDelta = {
+  delta_version: number
+  base: { generated_at: string; schema_version: number; quest_count: number }
+  target: { generated_at: string; schema_version: number; quest_count: number }
+  order: string[] | null
+  added: Array<{ hash: string; quest: Record<string, any> }>
+  removed: string[]
+  changed: Array<{ id: string; hash: string; set: Record<string, any>; unset: string[] }>
+  tasks: { changed: Record<string, TaskRow>; removed: string[] }
+  edges: { added: Array<[string, string, string]>; removed: Array<[string, string, string]> }
+  layout: Record<string, Record<string, { set: Record<string, any>; unset: string[] } | null>>
+  meta: Record<string, any>
+  meta_removed: string[]
+}
+
+export function applyQuestDelta(old: RawQuestData, delta: QuestDelta): RawQuestData {
+  if (old.generated_at !== delta.base.generated_at) throw new Error('delta prévu pour un autre build')
+  if (Number(old.schema_version ?? 1) !== Number(delta.target.schema_version ?? 1)) {
+    throw new Error('delta entre deux schémas différents')
+  }
+  const removed = new Set(delta.removed)
+  const quests = new Map<string, Record<string, any>>()
+  for (const q of old.quests) if (!removed.has(q.id)) quests.set(q.id, { ...q })
+  for (const c of delta.changed) {
+    const q = quests.get(c.id)
+    if (!q) throw new Error(`quête ${c.id} absente de la base`)
+    Object.assign(q, c.set)
+    for (const k of c.unset) delete q[k]
+  }
+  for (const a of delta.added) quests.set(a.quest.id, a.quest)
+
+  const data: RawQuestData = { ...old, quests: [] }
+  for (const k of delta.meta_removed) delete data[k]
+  Object.assign(data, delta.meta, { generated_at: delta.target.generated_at })
+  data.quests = (delta.order ?? Array.from(quests.keys())).map(id => quests.get(id)!)
+  if (Object.keys(delta.layout).length || data.layout) {
+    const layout: Record<string, Record<string, any>> = {}
+    for (const [dir, views] of Object.entries(data.layout ?? {})) layout[dir] = { ...(views as object) }
+    for (const [dir, views] of Object.entries(delta.layout)) {
+      const cur = (layout[dir] ??= {})
+      for (const [view, change] of Object.entries(views)) {
+        if (change === null) { delete cur[view]; continue }
+        const gone = new Set(change.unset)
+        const nodes: Record<string, any> = {}
+        for (const [n, pos] of Object.entries(cur[view] ?? {})) if (!gone.has(n)) nodes[n] = pos
+        cur[view] = Object.assign(nodes, change.set)
+      }
+    }
+    data.layout = layout
+  }
+  if (Number(delta.target.schema_version ?? 1) >= 2) {
+    const gone = new Set(delta.tasks.removed)
+    const table: Record<string, TaskRow> = {}
+    for (const [t, row] of Object.entries(old.tasks ?? {})) if (!gone.has(t)) table[t] = row
+    Object.assign(table, delta.tasks.changed)
+    const ordered: Record<string, TaskRow> = {}
+    for (const q of data.quests) for (const t of q.tasks ?? []) if (t in table && !(t in ordered)) ordered[t] = table[t]
+    data.tasks = ordered
+  }
+  return data
+}
+
+const DATA_CACHE = 'nw-quest-map-data'
+
+async function fetchJson<T>(url: string, init?: RequestInit): Promise<T | null> {
+  const res = await fetch(url, init).catch(() => null)
+  if (!res?.ok || !(res.headers.get('content-type') ?? '').includes('json')) return null
+  return res.json().catch(() => null)
+}
+
+// quests.json complet ; la copie gardée (Cache Storage) d'une visite précédente est mise
+// à jour par le delta quand il part de cette copie (quelques Ko au lieu du fichier entier)
+async function fetchFullQuestData(base: string): Promise<RawQuestData> {
+  const key = `${base}/quests.json`
+  const cache = typeof caches !== 'undefined' ? await caches.open(DATA_CACHE).catch(() => null) : null
+  const stored = cache ? await cache.match(key).then(r => r?.json()).catch(() => null) as RawQuestData | null : null
+  // le delta porte sur les valeurs décodées (la copie gardée peut être la sortie --intern)
+  const cached = stored && decodeInterned(stored)
+  if (cache && cached) {
+    const delta = await fetchJson<QuestDelta>(`${base}/quests.delta.json`, { cache: 'no-cache' })
+    if (delta?.target.generated_at === cached.generated_at) return cached
+    if (delta?.base.generated_at === cached.generated_at) {
+      try {
+        const next = applyQuestDelta(cached, delta)
+        await cache.put(key, new Response(JSON.stringify(next), { headers: { 'content-type': 'application/json' } }))
+        return next
+      } catch (e) {
+        console.warn('delta non applicable, rechargement complet', e)
+      }
+    }
+  }
+  const json = (await (await fetch(key)).json()) as RawQuestData
+  await cache?.put(key, new Response(JSON.stringify(json), { headers: { 'content-type': 'application/json' } }))
+    .catch(() => undefined)
+  return json
+}
+
+// Parts à charger pour afficher une zone ('all' = toutes) : celles de ses quêtes, plus
+// celles des prérequis situés dans une autre part
+export function partsForZone(manifest: QuestManifest, zone: string): string[] {
+  if (zone === 'all') return Object.keys(manifest.parts)
+  const ids = new Set<string>()
+  const keys = new Set<string>()
+  for (const q of manifest.quests) {
+    if (String(q.zone_id) !== zone) continue
+    ids.add(q.id)
+    keys.add(q.part)
+  }
+  const partOf = new Map(manifest.quests.map(q => [q.id as string, q.part as string]))
+  for (const [src, dst] of manifest.cross_part_edges) {
+    if (ids.has(dst) && partOf.has(src)) keys.add(partOf.get(src)!)
+  }
+  return Array.from(keys).filter(k => k in manifest.parts)
+}
+
+export async function fetchQuestPart(manifest: QuestManifest, key: string, base = '/data'): Promise<QuestPart> {
+  return (await fetch(`${base}/${manifest.parts[key].file}`)).json()
+}
+
+// Recopie les champs d'une part dans les quêtes (tâches ramenées au schéma 1) et le layout
+// de la vue de sa zone dans data.layout
+export function mergeQuestPart<T extends { quests: any[]; layout?: Record<string, Record<string, any>> }>(
+  data: T, part: QuestPart
+): T {
+  const heavy = part.quests
+  const quests = data.quests.map(q => (heavy[q.id] ? { ...q, ...heavy[q.id] } : q))
+  const merged = normalizeQuestData<T>({
+    schema_version: part.schema_version,
+    tasks: part.tasks,
+    quests: quests.filter(q => heavy[q.id]),
+  })
+  const byId = new Map(merged.quests.map(q => [q.id, q]))
+  const next = { ...data, quests: quests.map(q => byId.get(q.id) ?? q) }
+  if (!part.layout) return next
+  const layout: Record<string, Record<string, any>> = { ...(data.layout ?? {}) }
+  for (const [dir, views] of Object.entries(part.layout)) layout[dir] = { ...(layout[dir] ?? {}), ...views }
+  return { ...next, layout } as T
+}
@@ -0,0 +1,186 @@
+// Recherche sur l'index précalculé public/data/quests.search.json (convert_csv_to_json.py --search-index)
+// Même algorithme que tools/search_index.py : termes triés (préfixe = recherche
+// dichotomique), postings (écart de quête << 7) | masque de champs, recherche approchée
+// par trigrammes seulement pour un mot sans correspondance exacte ni préfixe.
+
+export type RawSearchIndex = {
+  version: number
+  fields: string[]
+  weights: number[]
+  ids: string[]
+  titles: string[]
+  terms: string[]
+  postings: number[][]
+}
+
+export type SearchHit = { id: string; title: string; score: number }
+
+const INDEX_VERSION = 1
+const FIELD_BITS = 7
+const PREFIX_FACTOR = 0.6
+const FUZZY_FACTOR = 0.3
+const MIN_PREFIX = 3
+const MAX_PREFIX_TERMS = 64
+
+// Mêmes règles que tokenize() de tools/search_index.py (longueur en caractères, pas en
+// unités UTF-16 : un caractère hors BMP reste un mot d'une lettre)
+export function tokenize(text: string): string[] {
+  if (!text) return []
+  const norm = text.normalize('NFKD').replace(/\p{M}/gu, '').toLowerCase()
+  return (norm.match(/[\p{L}\p{N}]+/gu) ?? []).filter(w => !/^.$/su.test(w) || /^\p{N}$/u.test(w))
+}
+
+function trigrams(term: string): Set<string> {
+  const padded = `$${term}$`
+  const out = new Set<string>()
+  for (let i = 0; i + 3 <= padded.length; i++) out.add(padded.slice(i, i + 3))
+  return out
+}
+
+function within(a: string, b: string, k: number): boolean {
+  if (Math.abs(a.length - b.length) > k) return false
+  let prev = Array.from({ length: b.length + 1 }, (_, j) => j)
+  for (let i = 1; i <= a.length; i++) {
+    const cur = [i]
+    for (let j = 1; j <= b.length; j++) {
+      cur.push(Math.min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (a[i - 1] === b[j - 1] ? 0 : 1)))
+    }
+    if (Math.min(...cur) > k) return false
+    prev = cur
+  }
+  return prev[b.length] <= k
+}
+
+const maxTypos = (term: string) => (term.length < 4 ? 0 : term.length < 8 ? 1 : 2)
+
+function lowerBound(arr: string[], x: string, lo = 0, hi = arr.length): number {
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1
+    if (arr[mid] < x) lo = mid + 1
+    else hi = mid
+  }
+  return lo
+}
+
+export class QuestSearchIndex {
+  private raw: RawSearchIndex
+  private decoded = new Map<number, Map<number, number>>()
+  private grams: Map<string, number[]> | null = null
+  private maskWeight: number[]
+
+  constructor(raw: RawSearchIndex) {
+    if (raw.version !== INDEX_VERSION) throw new Error(`version d'index non supportée: ${raw.version}`)
+    this.raw = raw
+    this.maskWeight = Array.from({ length: 1 << FIELD_BITS }, (_, m) =>
+      raw.weights.reduce((best, w, b) => ((m >> b) & 1 ? Math.max(best, w) : best), 0))
+  }
+
+  private termWeights(t: number): Map<number, number> {
+    let got = this.decoded.get(t)
+    if (!got) {
+      got = new Map()
+      let doc = 0
+      const low = (1 << FIELD_BITS) - 1
+      for (const v of this.raw.postings[t]) {
+        doc += v >> FIELD_BITS
+        got.set(doc, this.maskWeight[v & low])
+      }
+      this.decoded.set(t, got)
+    }
+    return got
+  }
+
+  private fuzzyTerms(word: string): number[] {
+    const k = maxTypos(word)
+    if (!k) return []
+    if (!this.grams) {
+      this.grams = new Map()
+      this.raw.terms.forEach((term, t) => {
+        for (const g of trigrams(term)) {
+          const list = this.grams!.get(g)
+          if (list) list.push(t)
+          else this.grams!.set(g, [t])
+        }
+      })
+    }
+    const qgrams = trigrams(word)
+    const counts = new Map<number, number>()
+    for (const g of qgrams) for (const t of this.grams.get(g) ?? []) counts.set(t, (counts.get(t) ?? 0) + 1)
+    const need = Math.max(1, qgrams.size - 3 * k)
+    const out: number[] = []
+    for (const [t, c] of counts) if (c >= need && within(word, this.raw.terms[t], k)) out.push(t)
+    return out
+  }
+
+  expand(word: string, fuzzy = true): Array<[number, number]> {
+    const terms = this.raw.terms
+    let lo = lowerBound(terms, word)
+    const out: Array<[number, number]> = []
+    if (lo < terms.length && terms[lo] === word) out.push([lo++, 1])
+    if (word.length >= MIN_PREFIX) {
+      const hi = lowerBound(terms, word + '\uffff', lo, Math.min(terms.length, lo + MAX_PREFIX_TERMS))
+      for (let t = lo; t < hi; t++) out.push([t, PREFIX_FACTOR])
+    }
+    if (!out.length && fuzzy) return this.fuzzyTerms(word).map(t => [t, FUZZY_FACTOR])
+    return out
+  }
+
+  private wordScores(matches: Array<[number, number]>): Map<number, number> {
+    const [[t0, f0], ...rest] = matches
+    if (f0 === 1 && !rest.length) return this.termWeights(t0)
+    const scores = new Map<number, number>()
+    for (const [doc, w] of this.termWeights(t0)) scores.set(doc, f0 * w)
+    for (const [t, factor] of rest) {
+      for (const [doc, w] of this.termWeights(t)) {
+        if (factor * w > (scores.get(doc) ?? 0)) scores.set(doc, factor * w)
+      }
+    }
+    return scores
+  }
+
+  // Quêtes dont chaque mot de la requête correspond, par score décroissant
+  search(query: string, limit = 20, fuzzy = true): SearchHit[] {
+    const words = Array.from(new Set(tokenize(query))).map(w => this.expand(w, fuzzy))
+    if (limit <= 0 || !words.length || words.some(m => !m.length)) return []
+    const sizes = words.map(m => m.reduce((n, [t]) => n + this.raw.postings[t].length, 0))
+    const order = words.map((_, i) => i).sort((a, b) => sizes[a] - sizes[b])
+    // jamais modifiée en place : le dict partagé du premier mot peut servir tel quel
+    let total = this.wordScores(words[order[0]])
+    for (const i of order.slice(1)) {
+      const next = new Map<number, number>()
+      if (total.size * words[i].length < sizes[i]) {
+        const weights = words[i].map(([t, f]) => [this.termWeights(t), f] as const)
+        for (const [doc, s] of total) {
+          const best = Math.max(...weights.map(([tw, f]) => f * (tw.get(doc) ?? 0)))
+          if (best) next.set(doc, s + best)
+        }
+      } else {
+        const scores = this.wordScores(words[i])
+        for (const [doc, s] of total) {
+          const w = scores.get(doc)
+          if (w !== undefined) next.set(doc, s + w)
+        }
+      }
+      total = next
+      if (!total.size) return []
+    }
+    // sélection des `limit` meilleurs en un passage (à score égal, ordre des postings du
+    // mot le plus sélectif) plutôt qu'un tri de toutes les quêtes trouvées
+    const top: Array<[number, number]> = []
+    for (const entry of total) {
+      if (top.length === limit && entry[1] <= top[limit - 1][1]) continue
+      let i = top.length
+      while (i > 0 && top[i - 1][1] < entry[1]) i--
+      top.splice(i, 0, entry)
+      if (top.length > limit) top.pop()
+    }
+    return top.map(([d, s]) => ({ id: this.raw.ids[d], title: this.raw.titles[d], score: Math.round(s * 1000) / 1000 }))
+  }
+}
+
+// Index absent (build sans --search-index) -> null : la recherche reste le parcours des nœuds
+export async function fetchSearchIndex(base = '/data'): Promise<QuestSearchIndex | null> {
+  const res = await fetch(`${base}/quests.search.json`)
+  if (!res.ok || !(res.headers.get('content-type') ?? '').includes('json')) return null
+  return new QuestSearchIndex(await res.json())
+}
@@ -0,0 +1,140 @@
+# Expressions "Required Achievement Id" (utilisé par convert_csv_to_json.py)
+#
+# Grammaire (priorité croissante) :
+#   or   := and ('||' and)*
+#   and  := not ('&&' not)*
+#   not  := '!' not | '(' or ')' | TOKEN
+# '&' et '|' simples sont acceptés comme '&&' / '||'.
+#
+# AST compact (sérialisable en JSON, repris tel quel dans quests.json) :
+#   "TOKEN" | ["!", x] | ["&", x, y, ...] | ["|", x, y, ...]
+# Les parses et les prédicats compilés sont mémoïsés par chaîne d'expression : beaucoup
+# de quêtes partagent la même condition.
+import re
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, List, Set, Tuple, Union
+
+Ast = Union[str, list]
+
+_TOKEN_RE = re.compile(r"\s*(?:(&&?|\|\|?|!|\(|\))|([A-Za-z0-9_\-]+))")
+
+
+class LogicSyntaxError(ValueError):
+    pass
+
+
+def _tokenize(expr: str) -> List[Tuple[str, str]]:
+    out, pos, n = [], 0, len(expr)
+    while pos < n:
+        m = _TOKEN_RE.match(expr, pos)
+        if not m:
+            rest = expr[pos:].lstrip()
+            if not rest:
+                break
+            pos = n - len(rest)
+            raise LogicSyntaxError(f"caractère inattendu {expr[pos]!r} en position {pos} dans {expr!r}")
+        op, ident = m.groups()
+        if op:
+            out.append(('op', {'&': '&&', '|': '||'}.get(op, op)))
+        else:
+            out.append(('id', ident))
+        pos = m.end()
+    return out
+
+
+@lru_cache(maxsize=None)
+def parse_expr(expr: str) -> Ast:
+    """Expression -> AST compact ; lève LogicSyntaxError si l'expression est invalide."""
+    toks = _tokenize(expr)
+    if not toks:
+        raise LogicSyntaxError("expression vide")
+    pos = 0
+
+    def peek():
+        return toks[pos] if pos < len(toks) else (None, None)
+
+    def take(kind, val=None):
+        nonlocal pos
+        k, v = peek()
+        if k != kind or (val is not None and v != val):
+            raise LogicSyntaxError(f"attendu {val or kind}, trouvé {v!r} dans {expr!r}")
+        pos += 1
+        return v
+
+    def nary(op, sub, sym):
+        items = [sub()]
+        while peek() == ('op', op):
+            take('op', op)
+            items.append(sub())
+        flat = []
+        for it in items:  # a && (b && c) -> ["&", a, b, c]
+            flat.extend(it[1:] if isinstance(it, list) and it[0] == sym else [it])
+        return flat[0] if len(flat) == 1 else [sym] + flat
+
+    def p_or():
+        return nary('||', p_and, '|')
+
+    def p_and():
+        return nary('&&', p_not, '&')
+
+    def p_not():
+        k, v = peek()
+        if (k, v) == ('op', '!'):
+            take('op', '!')
+            inner = p_not()
+            return inner[1] if isinstance(inner, list) and inner[0] == '!' else ['!', inner]
+        if (k, v) == ('op', '('):
+            take('op', '(')
+            inner = p_or()
+            take('op', ')')
+            return inner
+        return take('id')
+
+    ast = p_or()
+    if pos != len(toks):
+        raise LogicSyntaxError(f"jeton en trop {toks[pos][1]!r} dans {expr!r}")
+    return ast
+
+
+def _compile(ast: Ast) -> Callable[[Set[str]], bool]:
+    if isinstance(ast, str):
+        return lambda granted: ast in granted
+    op, args = ast[0], [_compile(a) for a in ast[1:]]
+    if op == '!':
+        inner = args[0]
+        return lambda granted: not inner(granted)
+    if op == '&':
+        return lambda granted: all(f(granted) for f in args)
+    return lambda granted: any(f(granted) for f in args)
+
+
+@lru_cache(maxsize=None)
+def compile_expr(expr: str) -> Callable[[Set[str]], bool]:
+    """Prédicat (ensemble d'achievements obtenus -> bool), mémoïsé par expression."""
+    return _compile(parse_expr(expr))
+
+
+def literals(ast: Ast, negated: bool = False, optional: bool = False) -> Iterable[Tuple[str, bool, bool]]:
+    """
+    (token, négatif, optionnel) pour chaque feuille, dans l'ordre de l'expression.
+    négatif  : sous un nombre impair de '!'
+    optionnel: sous un '||' (une alternative, pas une condition obligatoire)
+    """
+    if isinstance(ast, str):
+        yield ast, negated, optional
+        return
+    op = ast[0]
+    for a in ast[1:]:
+        yield from literals(a, negated ^ (op == '!'), optional or op == '|')
+
+
+def available_quests(quests: List[dict], granted: Set[str]) -> Dict[str, bool]:
+    """Disponibilité (condition d'achievements seule) de chaque quête, en une passe."""
+    out = {}
+    for q in quests:
+        expr = q.get("required_achievements_expr")
+        try:
+            out[q["id"]] = compile_expr(expr)(granted) if expr else True
+        except LogicSyntaxError:
+            out[q["id"]] = False
+    return out
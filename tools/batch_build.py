@@ -0,0 +1,313 @@
+#!/usr/bin/env python3
+# Build groupé de plusieurs jeux de données (live, PTR, anciens patchs) à partir d'un manifeste
+#
+#   python tools/batch_build.py datasets.json                 # tous les jeux, --jobs processus
+#   python tools/batch_build.py datasets.json --only live,ptr --jobs 2
+#
+# Manifeste (JSON ; chemins relatifs au dossier du manifeste) :
+#   {
+#     "out_root": "public/data/datasets",            # optionnel (défaut: celui de --out-root)
+#     "args": ["--gzip", "--search-index"],          # options du convertisseur communes à tous
+#     "datasets": [
+#       {"name": "live", "version": "2026.10",       # version optionnelle (défaut: empreinte des entrées)
+#        "quests_csv": "live/quests.csv", "items_csv": "live/items.csv",
+#        "objective_tasks_path": "live/objectives_tasks", "locale_json": "live/en-us.json",
+#        "poi_dir": "shared/pointofinterestdefinitions", "vitals_json": "shared/vitals.json",
+#        "args": ["--split", "zone"]},               # options propres au jeu, après les communes
+#       ...
+#     ]
+#   }
+#
+# Chaque jeu est un run de convert_csv_to_json.py (processus du pool, sortie dans
+# <out_root>/<name>/<version>/quests.json, journal dans tools/.cache/batch/<name>.log),
+# lancé depuis le dossier courant comme le convertisseur seul (cache tools/.cache et
+# tools/manual_links.json communs à tous les jeux).
+# Les sources partagent le cache disque, indexé par le contenu des fichiers : les fichiers
+# identiques d'un jeu à l'autre (mêmes vitals, mêmes POI, shards inchangés...) sont parsés
+# une seule fois, dans une passe préalable, puis relus depuis le cache par chaque build.
+# Avec --referenced-only, items / POI / vitals / locale sont filtrés par jeu : ces entrées
+# ne sont pas partagées (tâches et quêtes le restent).
+#
+# <out_root>/datasets.json liste la version courante de chaque jeu (chemin, tailles,
+# empreinte de chaque source : deux jeux aux entrées identiques ont la même) ;
+# les dossiers des versions précédentes sont gardés.
+import sys, os, io, re, json, glob, time, hashlib, datetime, argparse, tempfile, traceback
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import redirect_stdout, redirect_stderr
+from typing import Dict, List, Tuple
+
+from build_cache import BuildCache, sha1_file
+
+OUT_ROOT = os.path.join('public', 'data', 'datasets')
+BATCH_DIR = os.path.join('tools', '.cache', 'batch')
+SOURCE_KEYS = ('quests_csv', 'items_csv', 'objective_tasks_path', 'locale_json', 'poi_dir', 'vitals_json')
+# sources dont l'entrée de cache dépend du filtre --referenced-only
+FILTERED_KEYS = ('items_csv', 'locale_json', 'poi_dir', 'vitals_json')
+NAME_RE = re.compile(r'^[A-Za-z0-9._-]+$')
+
+
+# ---------- Manifeste ----------
+def load_manifest(path: str) -> dict:
+    """Manifeste validé, chemins des sources rendus absolus ; ValueError si invalide."""
+    with open(path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    base = os.path.dirname(os.path.abspath(path))
+    datasets = manifest.get('datasets')
+    if not isinstance(datasets, list) or not datasets:
+        raise ValueError("'datasets' doit être une liste non vide")
+    common = manifest.get('args') or []
+    seen = set()
+    for ds in datasets:
+        name = ds.get('name')
+        if not isinstance(name, str) or not NAME_RE.match(name):
+            raise ValueError(f"nom de jeu invalide: {name!r} (lettres, chiffres, '.', '_', '-')")
+        if name in seen:
+            raise ValueError(f"jeu en double: {name}")
+        seen.add(name)
+        if not ds.get('quests_csv'):
+            raise ValueError(f"{name} : 'quests_csv' manquant")
+        # arguments positionnels du convertisseur : pas de trou dans la suite
+        given = [k for k in SOURCE_KEYS if ds.get(k)]
+        if given != list(SOURCE_KEYS[:len(given)]):
+            missing = [k for k in SOURCE_KEYS[:SOURCE_KEYS.index(given[-1])] if not ds.get(k)]
+            raise ValueError(f"{name} : source(s) manquante(s) avant {given[-1]}: {', '.join(missing)}")
+        for k in given:
+            ds[k] = os.path.normpath(os.path.join(base, ds[k]))
+        ds['args'] = [*common, *(ds.get('args') or [])]
+        if '--watch' in ds['args'] or '--out' in ds['args']:
+            raise ValueError(f"{name} : --watch et --out ne s'utilisent pas en build groupé")
+        if 'version' in ds and not NAME_RE.match(str(ds['version'])):
+            raise ValueError(f"{name} : version invalide: {ds['version']!r}")
+    return manifest
+
+
+def source_files(key: str, path: str) -> List[str]:
+    """Fichiers lus pour une source (les dossiers de shards / POI en contiennent plusieurs)."""
+    if key == 'objective_tasks_path':
+        from quest_pipeline import list_objective_task_files
+        return list_objective_task_files(path)
+    if key == 'poi_dir':
+        return sorted(glob.glob(os.path.join(path, "javelindata_poidefinitions_*.json")))
+    return [path] if os.path.isfile(path) else []
+
+
+def fingerprint_inputs(datasets: List[dict]) -> Dict[str, Dict[str, List[str]]]:
+    """nom du jeu -> source -> sha1 de ses fichiers (chaque fichier n'est hashé qu'une fois)."""
+    memo: Dict[str, str] = {}
+    out: Dict[str, Dict[str, List[str]]] = {}
+    for ds in datasets:
+        out[ds['name']] = {}
+        for k in SOURCE_KEYS:
+            if ds.get(k):
+                files = source_files(k, ds[k])
+                for fp in files:
+                    if fp not in memo:
+                        memo[fp] = sha1_file(fp)
+                out[ds['name']][k] = [memo[fp] for fp in files]
+    return out
+
+
+def dataset_version(ds: dict, shas: Dict[str, List[str]]) -> str:
+    """Version du manifeste, sinon empreinte des entrées et des options (stable d'un run à l'autre)."""
+    if ds.get('version'):
+        return str(ds['version'])
+    args = [a for a in ds['args'] if a != '--no-cache']
+    h = hashlib.sha1(json.dumps([shas, args], sort_keys=True).encode('utf-8'))
+    return h.hexdigest()[:12]
+
+
+def shared_sources(datasets: List[dict], shas: Dict[str, Dict[str, List[str]]]) -> Dict[str, List[str]]:
+    """
+    Sources à parser avant les builds : nom du jeu -> sources dont au moins un fichier se
+    retrouve, identique, dans un autre jeu. Chaque contenu partagé est confié au premier
+    jeu qui le contient.
+    """
+    users: Dict[Tuple[str, str], set] = {}
+    for ds in datasets:
+        filtered = '--referenced-only' in ds['args']
+        for k, file_shas in shas[ds['name']].items():
+            if filtered and k in FILTERED_KEYS:
+                continue
+            for sha in file_shas:
+                users.setdefault((k, sha), set()).add(ds['name'])
+    assigned: set = set()
+    plan: Dict[str, List[str]] = {}
+    for ds in datasets:
+        for k, file_shas in shas[ds['name']].items():
+            groups = [(k, sha) for sha in file_shas if len(users.get((k, sha), ())) > 1]
+            if groups and not all(g in assigned for g in groups):
+                plan.setdefault(ds['name'], []).append(k)
+                assigned.update(groups)
+    return plan
+
+
+# ---------- Travail d'un processus ----------
+def _warm_sources(ds: dict, keys: List[str]) -> dict:
+    """Parse les sources `keys` d'un jeu dans le cache partagé (passe préalable)."""
+    from convert_csv_to_json import CACHE_DIR, _cache_salt
+    from quest_pipeline import load_indexes, load_quest_rows
+    t0 = time.perf_counter()
+    cache = BuildCache(CACHE_DIR, salt=_cache_salt())
+    with redirect_stdout(io.StringIO()):
+        if 'quests_csv' in keys:
+            cache.load('quests', ds['quests_csv'], load_quest_rows)
+        load_indexes(*(ds[k] if k in keys else None for k in SOURCE_KEYS[1:]), cache=cache, jobs=1)
+    cache.save()
+    return {'name': ds['name'], 'sources': keys, 'seconds': time.perf_counter() - t0,
+            'parsed': sum(cache.misses.values())}
+
+
+def _build_dataset(ds: dict, out_path: str, log_path: str) -> dict:
+    """Un run du convertisseur ; journal complet dans log_path, résumé en retour."""
+    import convert_csv_to_json
+    res = {'name': ds['name'], 'out': out_path, 'ok': False, 'error': None}
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    with tempfile.TemporaryDirectory(prefix='nwqm-batch-') as work:
+        profile_json = os.path.join(work, 'profile.json')
+        argv = [*(ds[k] for k in SOURCE_KEYS if ds.get(k)), *ds['args'], '--out', out_path,
+                '--profile', '--no-tracemalloc', '--profile-json', profile_json]
+        # un processus par jeu : shards en série sauf --jobs explicite
+        if '--jobs' not in ds['args']:
+            argv += ['--jobs', '1']
+        t0 = time.perf_counter()
+        with open(log_path, 'w', encoding='utf-8') as log, redirect_stdout(log), redirect_stderr(log):
+            try:
+                convert_csv_to_json.main(argv)
+                res['ok'] = True
+            except SystemExit as e:
+                res['error'] = f"arguments refusés (code {e.code})"
+            except Exception as e:
+                traceback.print_exc()
+                res['error'] = f"{type(e).__name__}: {e}"
+        res['seconds'] = time.perf_counter() - t0
+        if res['ok'] and os.path.isfile(profile_json):
+            with open(profile_json, 'r', encoding='utf-8') as f:
+                summary = json.load(f)
+            res.update(counts=summary.get('counts') or {}, cache=summary.get('cache') or {},
+                       peak_rss_bytes=summary.get('peak_rss_bytes'),
+                       outputs=[o for o in summary.get('outputs', []) if os.path.isfile(o['path'])])
+    return res
+
+
+# ---------- Rapport ----------
+def format_summary(results: List[dict]) -> str:
+    lines = [f"{'jeu':<12} {'version':<14} {'temps':>8} {'quêtes':>8} {'arêtes':>8} {'fichiers':>8} "
+             f"{'octets':>13} {'cache':>9}"]
+    for r in results:
+        if not r['ok']:
+            lines.append(f"{r['name']:<12} {r['version']:<14} {r['seconds']:>7.2f}s  ÉCHEC: {r['error']}")
+            continue
+        c, cache = r.get('counts', {}), r.get('cache', {})
+        hits = f"{cache.get('hits', 0)}/{cache.get('hits', 0) + cache.get('misses', 0)}" if cache.get('enabled') else '-'
+        lines.append(f"{r['name']:<12} {r['version']:<14} {r['seconds']:>7.2f}s {c.get('quests', '-'):>8} "
+                     f"{c.get('edges', '-'):>8} {len(r['outputs']):>8} {sum(o['bytes'] for o in r['outputs']):>13,} "
+                     f"{hits:>9}")
+    return "\n".join(lines)
+
+
+def write_datasets_index(out_root: str, results: List[dict]):
+    """<out_root>/datasets.json : version courante de chaque jeu (les jeux en échec gardent la précédente)."""
+    path = os.path.join(out_root, 'datasets.json')
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+    entries = index.get('datasets') or {}
+    for r in results:
+        if not r['ok']:
+            continue
+        entries[r['name']] = {
+            'version': r['version'],
+            'path': os.path.relpath(r['out'], out_root).replace(os.sep, '/'),
+            'built_at': r['built_at'],
+            'quests': r.get('counts', {}).get('quests'),
+            'bytes': {os.path.basename(o['path']): o['bytes'] for o in r['outputs']},
+            'inputs': r['inputs'],
+        }
+    index = {'generated_at': datetime.datetime.utcnow().isoformat() + "Z", 'datasets': entries}
+    tmp = path + '.tmp'
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+# ---------- CLI ----------
+def parse_args(argv=None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Build groupé de plusieurs jeux de données (manifeste JSON)")
+    ap.add_argument('manifest', help="manifeste des jeux de données (cf. en-tête de tools/batch_build.py)")
+    ap.add_argument('--only', help="noms des jeux à construire, séparés par des virgules")
+    ap.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                    help="jeux construits en parallèle (défaut: nb de CPU)")
+    ap.add_argument('--out-root', help=f"dossier des sorties versionnées (défaut: out_root du manifeste, "
+                                       f"sinon {OUT_ROOT})")
+    ap.add_argument('--no-cache', action='store_true',
+                    help="sans cache disque : chaque jeu re-parse toutes ses sources (rien n'est partagé)")
+    args = ap.parse_args(argv)
+    try:
+        args.manifest_data = load_manifest(args.manifest)
+    except (OSError, ValueError) as e:
+        ap.error(f"manifeste {args.manifest}: {e}")
+    if args.only:
+        wanted = {n.strip() for n in args.only.split(',') if n.strip()}
+        unknown = wanted - {ds['name'] for ds in args.manifest_data['datasets']}
+        if unknown:
+            ap.error(f"jeu(x) inconnu(s) dans --only: {', '.join(sorted(unknown))}")
+        args.manifest_data['datasets'] = [ds for ds in args.manifest_data['datasets'] if ds['name'] in wanted]
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    manifest = args.manifest_data
+    datasets = manifest['datasets']
+    out_root = args.out_root or manifest.get('out_root') or OUT_ROOT
+    if not args.out_root and manifest.get('out_root'):
+        out_root = os.path.join(os.path.dirname(os.path.abspath(args.manifest)), out_root)
+    if args.no_cache:
+        for ds in datasets:
+            ds['args'] = [*ds['args'], '--no-cache']
+
+    t0 = time.perf_counter()
+    shas = fingerprint_inputs(datasets)
+    plan = {} if args.no_cache else shared_sources(datasets, shas)
+    jobs = max(1, min(args.jobs, len(datasets)))
+    by_name = {ds['name']: ds for ds in datasets}
+    results: List[dict] = []
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        if plan:
+            n_files = len({(k, sha) for name, keys in plan.items() for k in keys for sha in shas[name][k]})
+            warm = [pool.submit(_warm_sources, by_name[name], keys) for name, keys in plan.items()]
+            warmed = [f.result() for f in warm]
+            print(f"[OK] Sources partagées: {n_files} fichier(s) de {len(plan)} jeu(x) parsé(s) une fois "
+                  f"({sum(w['parsed'] for w in warmed)} entrée(s) de cache écrite(s)) "
+                  f"en {time.perf_counter() - t0:.1f}s")
+        futures = []
+        for ds in datasets:
+            version = dataset_version(ds, shas[ds['name']])
+            out_path = os.path.join(out_root, ds['name'], version, 'quests.json')
+            log_path = os.path.join(BATCH_DIR, ds['name'] + '.log')
+            futures.append((ds, version, log_path, pool.submit(_build_dataset, ds, out_path, log_path)))
+        for ds, version, log_path, fut in futures:
+            try:
+                r = fut.result()
+            except Exception as e:  # processus du pool perdu (mémoire, signal)
+                r = {'name': ds['name'], 'ok': False, 'error': f"{type(e).__name__}: {e}", 'seconds': 0.0}
+            r.update(version=version, log=log_path, built_at=datetime.datetime.utcnow().isoformat() + "Z",
+                     inputs={k: hashlib.sha1("".join(v).encode('utf-8')).hexdigest()[:12]
+                             for k, v in shas[ds['name']].items()})
+            print(f"[{'OK' if r['ok'] else 'WARN'}] {ds['name']} ({version}) en {r['seconds']:.1f}s"
+                  + ("" if r['ok'] else f" — {r['error']}, journal: {log_path}"))
+            results.append(r)
+
+    os.makedirs(out_root, exist_ok=True)
+    write_datasets_index(out_root, results)
+    print(format_summary(results))
+    print(f"[INFO] {sum(r['ok'] for r in results)}/{len(results)} jeu(x) en {time.perf_counter() - t0:.1f}s "
+          f"({jobs} processus) -> {os.path.join(out_root, 'datasets.json')} ; journaux dans {BATCH_DIR}")
+    if not all(r['ok'] for r in results):
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,279 @@
+#!/usr/bin/env python3
+# Benchmark du convertisseur sur des données synthétiques de taille croissante
+#
+#   python tools/bench.py                          # échelles par défaut, résultat JSON horodaté
+#   python tools/bench.py --scales 730,20000,100000 --repeat 3
+#   python tools/bench.py -- --no-layout           # arguments passés tels quels au convertisseur
+#   python tools/bench.py --compare A.json B.json  # comparaison de deux résultats (commits)
+#   python tools/bench.py --placeholders           # phase placeholders seule : référence vs compilée
+#
+# Chaque run est un processus séparé (RSS max propre à l'échelle) lancé dans un dossier
+# temporaire, sans cache, avec --profile --no-tracemalloc : temps par phase + RSS max,
+# repris du résumé JSON du profileur. Les jeux générés sont conservés dans
+# tools/.cache/bench/data (régénérés si la version du générateur ou la graine change).
+# --placeholders mesure en processus les descriptions de toutes les tâches visibles :
+# Indexes.apply_placeholders (un str.replace par placeholder) contre render_placeholders
+# (chaînes compilées, valeurs mémorisées), à froid puis mémos gardés ; sorties comparées.
+import sys, os, json, time, datetime, platform, argparse, subprocess, shutil, tempfile
+from typing import List, Optional
+
+from bench_data import GENERATOR_VERSION, generate
+from quest_pipeline import _is_hidden_task, load_indexes
+
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+CONVERTER = os.path.join(TOOLS_DIR, 'convert_csv_to_json.py')
+BENCH_DIR = os.path.join(TOOLS_DIR, '.cache', 'bench')
+DEFAULT_SCALES = (730, 2500, 10000, 30000, 100000)
+RESULT_VERSION = 1
+ARG_ORDER = ('quests_csv', 'items_csv', 'objective_tasks_path', 'locale_json', 'poi_dir', 'vitals_json')
+
+
+def _git(*args: str) -> str:
+    try:
+        return subprocess.run(['git', *args], cwd=TOOLS_DIR, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def git_info() -> dict:
+    return {'commit': _git('rev-parse', 'HEAD'), 'subject': _git('log', '-1', '--format=%s'),
+            'dirty': bool(_git('status', '--porcelain', '--', TOOLS_DIR))}
+
+
+def ensure_dataset(data_dir: str, n_quests: int, seed: int) -> dict:
+    """Jeu synthétique de n_quests (réutilisé s'il a été généré avec les mêmes paramètres)."""
+    out_dir = os.path.abspath(os.path.join(data_dir, f"q{n_quests}_s{seed}"))
+    manifest_path = os.path.join(out_dir, 'manifest.json')
+    key = {'generator_version': GENERATOR_VERSION, 'quests': n_quests, 'seed': seed}
+    if os.path.isfile(manifest_path):
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        if manifest.get('key') == key:
+            return manifest
+    shutil.rmtree(out_dir, ignore_errors=True)
+    t0 = time.perf_counter()
+    manifest = generate(out_dir, n_quests, seed)
+    manifest['key'] = key
+    manifest['bytes'] = sum(os.path.getsize(os.path.join(d, f)) for d, _, fs in os.walk(out_dir) for f in fs)
+    with open(manifest_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    print(f"[OK] Données synthétiques: {n_quests:,} quêtes, {manifest['counts']['task_rows']:,} lignes de tâches, "
+          f"{manifest['bytes'] / (1 << 20):.1f} Mo en {time.perf_counter() - t0:.1f}s -> {out_dir}")
+    return manifest
+
+
+def run_converter(manifest: dict, extra_args: List[str], jobs: int, timeout: Optional[float]) -> dict:
+    """Un run du convertisseur dans un dossier jetable ; retourne le résumé du profileur."""
+    with tempfile.TemporaryDirectory(prefix='nwqm-bench-') as work:
+        profile_json = os.path.join(work, 'profile.json')
+        cmd = [sys.executable, CONVERTER, *(manifest['paths'][k] for k in ARG_ORDER),
+               '--no-cache', '--profile', '--no-tracemalloc', '--profile-json', profile_json,
+               '--jobs', str(jobs), *extra_args]
+        t0 = time.perf_counter()
+        proc = subprocess.run(cmd, cwd=work, capture_output=True, text=True, timeout=timeout,
+                              env={**os.environ, 'PYTHONHASHSEED': '0'})
+        wall = time.perf_counter() - t0
+        if proc.returncode != 0 or not os.path.isfile(profile_json):
+            raise RuntimeError(f"convertisseur en échec (code {proc.returncode}):\n{proc.stderr[-2000:]}")
+        with open(profile_json, 'r', encoding='utf-8') as f:
+            summary = json.load(f)
+    summary['wall_seconds'] = round(wall, 4)
+    return summary
+
+
+def bench_scale(n_quests: int, args) -> dict:
+    manifest = ensure_dataset(args.data_dir, n_quests, args.seed)
+    runs = []
+    for i in range(args.repeat):
+        s = run_converter(manifest, args.converter_args, args.jobs, args.timeout)
+        runs.append(s)
+        print(f"[INFO] {n_quests:>7,} quêtes  run {i + 1}/{args.repeat}: {s['wall_seconds']:.2f}s, "
+              f"RSS max {s['peak_rss_bytes'] / (1 << 20):.0f} Mo")
+    best = min(runs, key=lambda s: s['total_seconds'])
+    return {
+        'quests': n_quests,
+        'inputs': {'counts': manifest['counts'], 'bytes': manifest['bytes']},
+        'outputs': best.get('outputs', []),
+        'runs': [{'wall_seconds': s['wall_seconds'], 'total_seconds': s['total_seconds'],
+                  'peak_rss_bytes': s['peak_rss_bytes']} for s in runs],
+        # meilleur run (temps total minimal) : détail par phase
+        'total_seconds': best['total_seconds'],
+        'peak_rss_bytes': max(s['peak_rss_bytes'] or 0 for s in runs),
+        'phases': {p['name']: {'seconds': p['seconds'], 'peak_rss_bytes': p['peak_rss_bytes'],
+                               **({'items': p['items'], 'per_second': p['per_second']} if 'items' in p else {})}
+                   for p in best['phases']},
+        'counts': best.get('counts', {}),
+    }
+
+
+def bench_placeholders(n_quests: int, args) -> dict:
+    """Phase placeholders seule (meilleur de args.repeat) : référence vs chaînes compilées."""
+    manifest = ensure_dataset(args.data_dir, n_quests, args.seed)
+    p = manifest['paths']
+    ix = load_indexes(p['items_csv'], p['objective_tasks_path'], p['locale_json'], p['poi_dir'], p['vitals_json'])
+    # mêmes entrées que Indexes._task_text_of
+    work = []
+    for row in ix.task_index.values():
+        tag = str(row.get('TP_DescriptionTag') or '').strip()
+        if tag and not _is_hidden_task(row):
+            work.append((ix.locale_get(tag) if ix.locale else tag, row))
+
+    def run(render, reset):
+        best, out = float('inf'), None
+        for _ in range(max(1, args.repeat)):
+            reset()
+            t0 = time.perf_counter()
+            out = [render(txt, row) for txt, row in work]
+            best = min(best, time.perf_counter() - t0)
+        return best, out
+
+    def reset_compiled():
+        ix._templates.clear()
+        ix.reset_placeholder_values()
+
+    t_ref, ref = run(ix.apply_placeholders, lambda: None)
+    t_new, new = run(ix.render_placeholders, reset_compiled)
+    # second rendu, chaînes compilées et valeurs gardées (watch après modification de tâches)
+    t_warm, _ = run(ix.render_placeholders, lambda: None)
+    mismatches = sum(a != b for a, b in zip(ref, new))
+    res = {'quests': n_quests, 'descriptions': len(work), 'templates': len(ix._templates),
+           'values': len(ix._poi_values) + len(ix._item_values) + len(ix._vc_values),
+           'reference_seconds': round(t_ref, 4), 'compiled_seconds': round(t_new, 4),
+           'warm_seconds': round(t_warm, 4), 'mismatches': mismatches}
+    print(f"[INFO] {n_quests:>7,} quêtes  {len(work):,} descriptions ({res['templates']:,} chaînes, "
+          f"{res['values']:,} valeurs) : référence {t_ref * 1000:.1f} ms, compilée {t_new * 1000:.1f} ms, "
+          f"mémos gardés {t_warm * 1000:.1f} ms")
+    if mismatches:
+        print(f"[WARN] {mismatches:,} description(s) différente(s) entre les deux rendus")
+    return res
+
+
+def format_placeholders(results: List[dict]) -> str:
+    lines = [f"{'quêtes':>9} {'descr.':>9} {'référence':>11} {'compilée':>11} {'gain':>7} {'mémos':>11} {'gain':>7}"]
+    for r in results:
+        ref = r['reference_seconds']
+        gains = [f"{ref / r[k]:.2f}x" if r[k] > 0 else '-' for k in ('compiled_seconds', 'warm_seconds')]
+        lines.append(f"{r['quests']:>9,} {r['descriptions']:>9,} {ref * 1000:>8.1f} ms "
+                     f"{r['compiled_seconds'] * 1000:>8.1f} ms {gains[0]:>7} {r['warm_seconds'] * 1000:>8.1f} ms {gains[1]:>7}")
+    return "\n".join(lines)
+
+
+def format_table(result: dict) -> str:
+    phases: List[str] = []
+    for sc in result['scales']:
+        phases += [p for p in sc['phases'] if p not in phases]
+    lines = [f"{'phase':<14}" + "".join(f"{sc['quests']:>12,}" for sc in result['scales'])]
+    for p in phases:
+        lines.append(f"{p:<14}" + "".join(f"{sc['phases'][p]['seconds']:>11.2f}s" if p in sc['phases'] else f"{'-':>12}"
+                                          for sc in result['scales']))
+    lines.append(f"{'total':<14}" + "".join(f"{sc['total_seconds']:>11.2f}s" for sc in result['scales']))
+    lines.append(f"{'RSS max':<14}" + "".join(f"{sc['peak_rss_bytes'] / (1 << 20):>9.0f} Mo" for sc in result['scales']))
+    return "\n".join(lines)
+
+
+def compare(path_a: str, path_b: str) -> str:
+    """Tableau B vs A (temps et RSS) pour les échelles communes."""
+    with open(path_a, 'r', encoding='utf-8') as f:
+        a = json.load(f)
+    with open(path_b, 'r', encoding='utf-8') as f:
+        b = json.load(f)
+
+    def label(r):
+        g = r.get('git') or {}
+        return (g.get('commit') or '?')[:8] + ('+' if g.get('dirty') else '')
+
+    lines = [f"A = {label(a)} {path_a}", f"B = {label(b)} {path_b}"]
+    a_scales = {sc['quests']: sc for sc in a['scales']}
+    for sb in b['scales']:
+        sa = a_scales.get(sb['quests'])
+        if sa is None:
+            continue
+        lines.append(f"\n{sb['quests']:,} quêtes{'' if sa['inputs'] == sb['inputs'] else '  [WARN] entrées différentes'}")
+        lines.append(f"  {'phase':<14} {'A':>9} {'B':>9} {'B/A':>7}")
+        rows = [(p, sa['phases'][p]['seconds'], sb['phases'][p]['seconds'])
+                for p in sb['phases'] if p in sa['phases']]
+        rows.append(('total', sa['total_seconds'], sb['total_seconds']))
+        for name, ta, tb in rows:
+            ratio = f"{tb / ta:.2f}x" if ta > 0 else '-'
+            lines.append(f"  {name:<14} {ta:>8.2f}s {tb:>8.2f}s {ratio:>7}")
+        ra, rb = sa['peak_rss_bytes'], sb['peak_rss_bytes']
+        lines.append(f"  {'RSS max':<14} {ra / (1 << 20):>6.0f} Mo {rb / (1 << 20):>6.0f} Mo"
+                     f" {rb / ra if ra else 0:>6.2f}x")
+    return "\n".join(lines)
+
+
+def _pandas_version() -> str:
+    try:
+        import pandas as pd
+        return pd.__version__
+    except ImportError:
+        return ""
+
+
+def parse_args(argv=None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(description="Benchmark du convertisseur sur données synthétiques",
+                                 usage="python tools/bench.py [options] [-- ARGS_CONVERTISSEUR...]")
+    ap.add_argument('--scales', default=",".join(map(str, DEFAULT_SCALES)),
+                    help="nombres de quêtes, séparés par des virgules (défaut: %(default)s)")
+    ap.add_argument('--repeat', type=int, default=1, help="runs par échelle, on garde le plus rapide")
+    ap.add_argument('--seed', type=int, default=0, help="graine du générateur")
+    ap.add_argument('--jobs', type=int, default=1,
+                    help="--jobs du convertisseur (défaut 1 : mesures comparables d'une machine à l'autre)")
+    ap.add_argument('--timeout', type=float, help="secondes max par run")
+    ap.add_argument('--data-dir', default=os.path.join(BENCH_DIR, 'data'), help="jeux générés (défaut: %(default)s)")
+    ap.add_argument('--out', help="fichier résultat (défaut: tools/.cache/bench/results/<date>_<commit>.json)")
+    ap.add_argument('--compare', nargs=2, metavar=('A_JSON', 'B_JSON'), help="compare deux résultats et sort")
+    ap.add_argument('--placeholders', action='store_true',
+                    help="mesure seulement la phase placeholders (référence vs compilée) et sort")
+    ap.add_argument('converter_args', nargs='*', help="après '--' : arguments ajoutés au convertisseur")
+    return ap.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    if args.compare:
+        print(compare(*args.compare))
+        return
+    scales = [int(s) for s in args.scales.split(',') if s.strip()]
+    if args.placeholders:
+        results = [bench_placeholders(n, args) for n in scales]
+        print(format_placeholders(results))
+        if any(r['mismatches'] for r in results):
+            sys.exit(1)
+        return
+    git = git_info()
+    result = {
+        'result_version': RESULT_VERSION,
+        'generated_at': datetime.datetime.utcnow().isoformat() + 'Z',
+        'git': git,
+        'python': platform.python_version(),
+        'pandas': _pandas_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'generator_version': GENERATOR_VERSION,
+        'seed': args.seed,
+        'jobs': args.jobs,
+        'converter_args': args.converter_args,
+        'scales': [],
+    }
+    out = args.out or os.path.join(
+        BENCH_DIR, 'results',
+        f"{datetime.datetime.now():%Y%m%d-%H%M%S}_{(git['commit'] or 'nogit')[:8]}{'-dirty' if git['dirty'] else ''}.json")
+    for n in scales:
+        try:
+            result['scales'].append(bench_scale(n, args))
+        except (RuntimeError, subprocess.TimeoutExpired) as e:
+            print(f"[WARN] Échelle {n:,} abandonnée: {e}")
+            break
+        # écrit après chaque échelle : un run long interrompu garde les échelles terminées
+        os.makedirs(os.path.dirname(out) or '.', exist_ok=True)
+        with open(out, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+    if result['scales']:
+        print(format_table(result))
+        print(f"[OK] Résultats -> {out}")
+
+
+if __name__ == '__main__':
+    main()
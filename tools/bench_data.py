@@ -0,0 +1,257 @@
+# Générateur de données de jeu synthétiques pour le benchmark (tools/bench.py)
+#
+# Produit, pour un nombre de quêtes donné, un jeu d'entrées complet au format des exports :
+#   quests.csv, items.csv, objectives_tasks/ObjectiveTasksDataManager_B*.csv,
+#   en-us.json, pointofinterestdefinitions/javelindata_poidefinitions_*.json,
+#   javelindata_vitalscategories.json
+#
+# Les proportions sont calquées sur le patch actuel (730 quêtes) :
+#  - ~84 % des quêtes ont une "Required Achievement Id" ; ~86 % de ces expressions ont un
+#    seul jeton, quelques-unes des listes de `!Archetype_*`, ~7 % un '||', ~2 % des
+#    parenthèses. Les prérequis visent surtout les quêtes récentes de la même zone, avec
+#    des quêtes « pivots » référencées par beaucoup d'autres (fan-in réaliste).
+#  - une tâche racine par quête (conteneur Consecutive/Simple) avec 2 à 5 sous-tâches,
+#    parfois un conteneur imbriqué, des tâches communes à plusieurs quêtes, des lignes
+#    non référencées, et quelques TaskID redéfinis par un shard ultérieur.
+#  - descriptions de tâches avec {POITags} / {itemName} / {targetName}.
+# Les référentiels (POI, vitals, locale) croissent moins vite que les quêtes : un patch
+# qui double les quêtes n'ajoute pas autant de créatures.
+#
+# Déterministe pour (n_quests, seed).
+import os, csv, json, random
+from typing import Dict, List
+
+GENERATOR_VERSION = 1
+
+QUEST_COLUMNS = ["ID", "Title", "Description", "Type", "Icon", "Difficulty Level", "Required Level",
+                 " Exclusive Territory ", "Achievement Id", "Required Achievement Id", "Universal Exp Amount",
+                 "Azoth Reward", "Currency Reward", "Territory Standing", "Faction Influence Amount",
+                 "Faction Reputation", "Faction Tokens", "Item Reward", "Item Reward Name", "Item Reward Qty",
+                 "Task", "Schedule Id"]
+TASK_COLUMNS = ["TaskID", "Type", "StayActive", "TargetQty", "ItemName", "ItemDropVC", "ItemDropProbability",
+                "ChestDropProbability", "TerritoryID", "POITag", "KillEnemyType", "TP_TargetTag",
+                "TP_DescriptionTag", "IsHidden", "HideChildren"]
+SUBTASK_SLOTS = 5
+TASK_ROWS_PER_SHARD = 1500
+
+QUEST_TYPES = [("Journey", 56), ("Main Story Quest", 25), ("Mount Race", 4), ("Skill Progression", 3),
+               ("Faction Story  Covenant", 2), ("Faction Story  Marauders", 2), ("Faction Story  Syndicate", 2),
+               ("Event", 2), ("Artifact Quest", 2), ("Mission", 2)]
+LEAF_TYPES = ["TaskKillContribution", "TaskHaveAndReturnItems", "TaskGoToPOITag", "TaskTriggerArea",
+              "TaskGameEvent", "TaskUnlockAchievement"]
+ARCHETYPES = ["Archetype_Mercenary", "Archetype_Warmonger", "Archetype_Tracker", "Archetype_Musketeer",
+              "Archetype_Occultist", "Archetype_Theurgist", "Archetype_Wanderer"]
+DESC_TEMPLATES = ["Go to {POITags}", "Collect {itemName}", "Defeat {targetName}",
+                  "Bring {itemName} back from {POITags}", "Defeat {targetName} near {POITags}",
+                  "Speak with the quartermaster", "Collect {itemName} from {targetName}"]
+RARITIES = ["Common", "Uncommon", "Rare", "Epic", "Legendary"]
+
+
+def scaled_counts(n_quests: int) -> Dict[str, int]:
+    """Tailles des référentiels pour n_quests (730 = patch actuel)."""
+    s = max(n_quests, 1) / 730.0
+    return {
+        'quests': n_quests,
+        'zones': max(4, round(12 * s ** 0.5)),
+        'items': max(200, round(1.5 * n_quests)),
+        'poi_records': max(100, round(1203 * s ** 0.75)),
+        'poi_files': max(4, round(24 * s ** 0.5)),
+        'vitals': max(500, round(8131 * s ** 0.5)),
+        'desc_tags': max(100, round(2.5 * n_quests)),
+        'locale_filler': max(1000, round(40 * n_quests)),
+    }
+
+
+def _weighted(rng: random.Random, pairs):
+    return rng.choices([p[0] for p in pairs], weights=[p[1] for p in pairs])[0]
+
+
+def _write_csv(path: str, header: List[str], rows):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        w = csv.writer(f)
+        w.writerow(header)
+        w.writerows(rows)
+
+
+def _write_json(path: str, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def _required_expr(rng: random.Random, zone_quests: List[int], hubs: List[int],
+                   all_quests: List[int]) -> str:
+    """Expression "Required Achievement Id" (références vers des quêtes déjà générées)."""
+    def pick() -> str:
+        r = rng.random()
+        if hubs and r < 0.25:
+            src = rng.choice(hubs[-4:])
+        elif zone_quests and r < 0.9:
+            src = rng.choice(zone_quests[-6:])
+        elif all_quests:
+            src = rng.choice(all_quests)  # lien inter-zones
+        else:
+            return f"ext_flag_{rng.randrange(50)}"
+        return f"bq_ach_{src}"
+
+    if not all_quests or rng.random() < 0.16:
+        return ""
+    r = rng.random()
+    if r < 0.80:
+        return pick()
+    if r < 0.88:
+        return f"{pick()} && {pick()}"
+    if r < 0.93:
+        return f"{pick()} || {pick()}"
+    if r < 0.95:
+        return f"({pick()} || {pick()}) && {pick()}"
+    if r < 0.97:
+        return f"{pick()} && !{pick()}"
+    return pick() + "".join(f" && !{a}" for a in ARCHETYPES)
+
+
+def generate(out_dir: str, n_quests: int, seed: int = 0) -> Dict[str, object]:
+    """
+    Écrit un jeu d'entrées synthétique dans out_dir.
+    Retourne {'paths': {...arguments du convertisseur...}, 'counts': {...}}.
+    """
+    rng = random.Random(f"{seed}:{n_quests}")
+    counts = scaled_counts(n_quests)
+    tasks_dir = os.path.join(out_dir, 'objectives_tasks')
+    poi_dir = os.path.join(out_dir, 'pointofinterestdefinitions')
+    os.makedirs(tasks_dir, exist_ok=True)
+    os.makedirs(poi_dir, exist_ok=True)
+    locale: Dict[str, str] = {}
+
+    # ----- référentiels -----
+    zones = [1000 + 100 * z for z in range(counts['zones'])]
+    items = [(f"Bench Item {k}", f"BenchItem{k:06d}T{k % 5 + 1}", f"lyshineui/images/icons/items/bench_{k % 97}.webp",
+              rng.choice(RARITIES)) for k in range(counts['items'])]
+    _write_csv(os.path.join(out_dir, 'items.csv'), ["Name", "Item ID", "Icon Path", "Rarity"], items)
+
+    poi_tags: List[str] = []
+    per_file = -(-counts['poi_records'] // counts['poi_files'])
+    for f in range(counts['poi_files']):
+        recs = []
+        for k in range(f * per_file, min((f + 1) * per_file, counts['poi_records'])):
+            tags = [f"bench_poi_{k}"] + ([f"bench_poi_{k}_alt"] if k % 7 == 0 else [])
+            poi_tags.extend(tags)
+            key = f"ui_poi_bench_{k}"
+            if k % 10:
+                locale[key] = f"Bench Point {k}"
+            recs.append({"TerritoryID": rng.choice(zones) + k % 50, "NameLocalizationKey": f"@{key}",
+                         "IsPOI": True, "MapIcon": f"lyshineui/images/map/icon/pois/bench_{k % 13}.webp",
+                         "POITag": tags, "DevName": f"bench {k}"})
+        _write_json(os.path.join(poi_dir, f"javelindata_poidefinitions_b{f:03d}.json"), recs)
+
+    vitals = []
+    for k in range(counts['vitals']):
+        vid = f"BenchVC_{k}"
+        if k % 9:
+            locale[f"VC_{vid}"] = f"Bench Creature {k}"
+        vitals.append({"VitalsCategoryID": vid, "DisplayName": f"@VC_{vid}", "GroupVitalsCategoryId": "BASE",
+                       "IsNamed": k % 25 == 0, "IsDynamicPoiTarget": False, "LootDropChanceOverride": 0})
+    _write_json(os.path.join(out_dir, 'javelindata_vitalscategories.json'), vitals)
+
+    desc_tags = [f"bench_task_desc_{k}" for k in range(counts['desc_tags'])]
+    for k, tag in enumerate(desc_tags):
+        if k % 20:
+            locale[tag] = rng.choice(DESC_TEMPLATES) + f" ({k})"
+
+    # ----- tâches -----
+    task_rows: List[list] = []
+
+    def leaf(tid: str) -> list:
+        kind = rng.choice(LEAF_TYPES)
+        return [tid, kind, 1, rng.choice([1, 1, 3, 5, 10]), rng.choice(items)[0] if rng.random() < 0.6 else "",
+                f"BenchVC_{rng.randrange(counts['vitals'])}" if rng.random() < 0.5 else "",
+                rng.choice(["", "", 0.25, 0.5, 1]),
+                "", rng.choice(zones), rng.choice(poi_tags) if rng.random() < 0.5 else "",
+                rng.choice(["Undead", "Beast", "Ancient", ""]), "",
+                f"@{rng.choice(desc_tags)}" if rng.random() < 0.85 else "", 1 if rng.random() < 0.05 else "", ""]
+
+    def container(tid: str, children: List[str]) -> list:
+        row = [tid, rng.choice(["ConsecutiveTaskContainer", "SimpleTaskContainer"]), 1] + [""] * (len(TASK_COLUMNS) - 3)
+        return row + children + [""] * (SUBTASK_SLOTS - len(children))
+
+    shared = [f"BQ_shared_{k}" for k in range(max(10, n_quests // 50))]
+    for tid in shared:
+        task_rows.append(leaf(tid) + [""] * SUBTASK_SLOTS)
+
+    quest_rows: List[list] = []
+    zone_quests: Dict[int, List[int]] = {z: [] for z in zones}
+    zone_hubs: Dict[int, List[int]] = {z: [] for z in zones}
+    done: List[int] = []
+    for i in range(n_quests):
+        zone = zones[min(len(zones) - 1, int(len(zones) * (i + rng.random() * 40) / max(n_quests, 1)))]
+        root = f"BQ{i:06d}_root"
+        children = []
+        for c in range(rng.randint(2, 5)):
+            tid = f"BQ{i:06d}_t{c}"
+            if rng.random() < 0.2:  # conteneur imbriqué
+                subs = [f"{tid}_{s}" for s in range(rng.randint(1, 3))]
+                for s in subs:
+                    task_rows.append(leaf(s) + [""] * SUBTASK_SLOTS)
+                task_rows.append(container(tid, subs))
+            else:
+                task_rows.append(leaf(tid) + [""] * SUBTASK_SLOTS)
+            children.append(tid)
+        if len(children) < SUBTASK_SLOTS and rng.random() < 0.3:
+            children.append(rng.choice(shared))
+        task_rows.append(container(root, children))
+        if rng.random() < 0.3:  # lignes non référencées (tâches de test, retirées, etc.)
+            task_rows.append(leaf(f"BQ{i:06d}_unused") + [""] * SUBTASK_SLOTS)
+        task_field = root if rng.random() < 0.9 else f"{root}, {rng.choice(shared)}, BQ_missing_{i}"
+
+        qtype = _weighted(rng, QUEST_TYPES)
+        qid = f"bq{i:06d}_z{zone}"
+        expr = _required_expr(rng, zone_quests[zone], zone_hubs[zone], done)
+        item = rng.choice(items) if rng.random() < 0.4 else None
+        quest_rows.append([
+            qid, f"Bench Quest {i}", f"Synthetic quest {i}", qtype, f"lyshineui/images/icons/quests/q{i % 31}.webp",
+            rng.randint(1, 65), rng.choice(["", "", "", rng.randint(1, 60)]), zone if rng.random() < 0.7 else "",
+            f"bq_ach_{i}", expr, rng.randrange(0, 5000, 10), rng.choice(["", 25, 50]), rng.choice(["", 100, 250]),
+            rng.choice(["", 10, 50]), "", "", "", item[1] if item and rng.random() < 0.5 else "",
+            item[1] if item else "", rng.choice(["", 1, 2, 5]) if item else "", task_field,
+            rng.choice(["", "", "", "", "Daily_1", "hourly"])])
+        zone_quests[zone].append(i)
+        if i % 25 == 0:
+            zone_hubs[zone].append(i)
+        done.append(i)
+
+    # quelques lignes exclues par le convertisseur (tests, artefacts)
+    for k in range(max(5, n_quests // 100)):
+        quest_rows.append([f"S_bench_{k}", "x", "", "Journey"] + [""] * (len(QUEST_COLUMNS) - 4))
+    rng.shuffle(quest_rows)
+    _write_csv(os.path.join(out_dir, 'quests.csv'), QUEST_COLUMNS, quest_rows)
+
+    # Les shards pairs nomment les sous-tâches "SubTask1", les impairs "Sub Task 1" (les deux existent)
+    n_shards = max(1, -(-len(task_rows) // TASK_ROWS_PER_SHARD))
+    redefined = 0
+    for s in range(n_shards):
+        chunk = task_rows[s * TASK_ROWS_PER_SHARD:(s + 1) * TASK_ROWS_PER_SHARD]
+        if s > 0:  # TaskID redéfinis par un shard ultérieur (la dernière occurrence gagne)
+            prev = task_rows[(s - 1) * TASK_ROWS_PER_SHARD:s * TASK_ROWS_PER_SHARD]
+            extra = [list(r) for r in rng.sample(prev, min(len(prev), len(prev) // 50))]
+            for r in extra:
+                r[3] = rng.randint(1, 20)  # TargetQty
+            chunk = chunk + extra
+            redefined += len(extra)
+        subtask = [f"SubTask{k + 1}" if s % 2 == 0 else f"Sub Task {k + 1}" for k in range(SUBTASK_SLOTS)]
+        _write_csv(os.path.join(tasks_dir, f"ObjectiveTasksDataManager_B{s:04d}.csv"), TASK_COLUMNS + subtask, chunk)
+
+    for k in range(counts['locale_filler']):
+        locale[f"bench_filler_{k}"] = f"Filler string {k}"
+    _write_json(os.path.join(out_dir, 'en-us.json'), locale)
+
+    counts.update({'task_rows': len(task_rows) + redefined, 'task_shards': n_shards, 'locale_keys': len(locale)})
+    return {
+        'paths': {
+            'quests_csv': os.path.join(out_dir, 'quests.csv'),
+            'items_csv': os.path.join(out_dir, 'items.csv'),
+            'objective_tasks_path': tasks_dir,
+            'locale_json': os.path.join(out_dir, 'en-us.json'),
+            'poi_dir': poi_dir,
+            'vitals_json': os.path.join(out_dir, 'javelindata_vitalscategories.json'),
+        },
+        'counts': counts,
+    }
@@ -0,0 +1,206 @@
+# Cache disque des sources parsées par convert_csv_to_json.py (tools/.cache/)
+#
+# Chaque source (CSV de quêtes, items.csv, shard ObjectiveTasks, locale, fichier POI,
+# vitals) est stockée sous forme pickle, indexée par l'empreinte du fichier :
+# (taille, mtime, sha1 du contenu). Si taille+mtime n'ont pas bougé on ne re-hashe pas ;
+# sinon on compare le sha1 (un simple `touch` reste donc un hit).
+import os, pickle, hashlib, glob
+from typing import Any, Callable, Dict, Optional, Tuple
+
+Fingerprint = Tuple[int, int, str]  # (size, mtime_ns, sha1)
+
+INDEX_NAME = "index.pkl"
+
+
+def sha1_file(path: str, bufsize: int = 1 << 20) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(bufsize)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class BuildCache:
+    """
+    Cache pickle des sources parsées.
+    - `salt` invalide tout le cache quand le code du convertisseur change.
+    - `enabled=False` (--no-cache) : on parse tout, on ne lit ni n'écrit rien.
+    """
+
+    def __init__(self, root: str, salt: str = "", enabled: bool = True):
+        self.root = root
+        self.salt = salt
+        self.enabled = enabled
+        self.hits: Dict[str, int] = {}
+        self.misses: Dict[str, int] = {}
+        self._index: Dict[str, Fingerprint] = {}
+        self._prev_sha: Dict[str, str] = {}  # chemin -> sha1 du run précédent (si changé)
+        if enabled:
+            self._load_index()
+
+    # ----- index chemin -> empreinte -----
+    def _load_index(self):
+        fp = os.path.join(self.root, INDEX_NAME)
+        try:
+            with open(fp, "rb") as f:
+                saved = pickle.load(f)
+        except Exception:
+            saved = None
+        if isinstance(saved, dict) and saved.get("salt") == self.salt:
+            self._index = saved.get("files") or {}
+        elif saved is not None:
+            # code différent : on repart de zéro
+            self.clear()
+
+    def clear(self):
+        for fp in glob.glob(os.path.join(self.root, "*", "*.pkl")):
+            try:
+                os.remove(fp)
+            except OSError:
+                pass
+        self._index = {}
+
+    def fingerprint(self, path: str) -> Fingerprint:
+        key = os.path.abspath(path)
+        st = os.stat(path)
+        old = self._index.get(key)
+        if old and old[0] == st.st_size and old[1] == st.st_mtime_ns:
+            return old
+        fp = (st.st_size, st.st_mtime_ns, sha1_file(path))
+        if not old or old[2] != fp[2]:
+            # '' = fichier jamais vu (nouveau shard, 1er run)
+            self._prev_sha.setdefault(key, old[2] if old else "")
+        self._index[key] = fp
+        return fp
+
+    # ----- entrées -----
+    def _entry_path(self, kind: str, sha: str, deps: str) -> str:
+        name = sha + (("-" + hashlib.sha1(deps.encode("utf-8")).hexdigest()[:12]) if deps else "")
+        return os.path.join(self.root, kind, name + ".pkl")
+
+    def _read(self, fp: str):
+        with open(fp, "rb") as f:
+            return pickle.load(f)
+
+    def _write(self, fp: str, obj: Any):
+        os.makedirs(os.path.dirname(fp), exist_ok=True)
+        # suffixe par processus : plusieurs builds peuvent partager le cache (batch_build.py)
+        tmp = f"{fp}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(obj, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, fp)
+
+    def lookup(self, kind: str, path: str, deps: str = "") -> Tuple[bool, Any]:
+        """(True, données) si l'entrée existe pour l'empreinte courante, sinon (False, None)."""
+        if not self.enabled:
+            return False, None
+        entry = self._entry_path(kind, self.fingerprint(path)[2], deps)
+        if os.path.isfile(entry):
+            try:
+                data = self._read(entry)
+                self.hits[kind] = self.hits.get(kind, 0) + 1
+                return True, data
+            except Exception:
+                pass
+        return False, None
+
+    def store(self, kind: str, path: str, data: Any, deps: str = ""):
+        """Enregistre le résultat d'un parse (compté comme miss)."""
+        if not self.enabled:
+            return
+        self.misses[kind] = self.misses.get(kind, 0) + 1
+        self._write(self._entry_path(kind, self.fingerprint(path)[2], deps), data)
+
+    def load(self, kind: str, path: str, parse: Callable[[str], Any], deps: str = "") -> Any:
+        """
+        Retourne parse(path), depuis le cache si l'empreinte (et `deps`, ex. sha de la
+        locale pour les sources qui en dépendent) n'a pas changé.
+        """
+        hit, data = self.lookup(kind, path, deps)
+        if hit:
+            return data
+        data = parse(path)
+        self.store(kind, path, data, deps)
+        return data
+
+    def has_changed(self, path: str) -> bool:
+        """Vrai si le fichier est nouveau ou a changé depuis le run précédent (après fingerprint())."""
+        return self.enabled and os.path.abspath(path) in self._prev_sha
+
+    def previous(self, kind: str, path: str, deps: str = "") -> Optional[Any]:
+        """Version parsée lors du run précédent, si le fichier a changé depuis (pour les diffs)."""
+        sha = self._prev_sha.get(os.path.abspath(path))
+        if not self.enabled or not sha:
+            return None
+        try:
+            return self._read(self._entry_path(kind, sha, deps))
+        except Exception:
+            return None
+
+    def known_paths(self, prefix: str) -> list:
+        """Chemins indexés sous `prefix` (détecte les shards supprimés depuis le run précédent)."""
+        base = os.path.abspath(prefix)
+        return [p for p in self._index if p == base or p.startswith(base + os.sep)]
+
+    def drop(self, kind: str, path: str, deps: str = "") -> Optional[Any]:
+        """Oublie un fichier disparu ; retourne sa dernière version parsée (None si inconnue)."""
+        key = os.path.abspath(path)
+        old = self._index.pop(key, None)
+        if not self.enabled or not old:
+            return None
+        self._prev_sha.setdefault(key, old[2])
+        try:
+            return self._read(self._entry_path(kind, old[2], deps))
+        except Exception:
+            return None
+
+    # ----- blobs nommés (état dérivé, ex. descriptions de quêtes) -----
+    def get_blob(self, name: str) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        try:
+            return self._read(os.path.join(self.root, "blobs", name + ".pkl"))
+        except Exception:
+            return None
+
+    def put_blob(self, name: str, obj: Any):
+        if self.enabled:
+            self._write(os.path.join(self.root, "blobs", name + ".pkl"), obj)
+
+    # ----- fin de run -----
+    def save(self):
+        if not self.enabled:
+            return
+        # empreintes écrites entre-temps par un autre build (autres chemins) conservées
+        files = {}
+        try:
+            saved = self._read(os.path.join(self.root, INDEX_NAME))
+            if isinstance(saved, dict) and saved.get("salt") == self.salt:
+                files = saved.get("files") or {}
+        except Exception:
+            pass
+        for key in self._prev_sha:
+            if key not in self._index:
+                files.pop(key, None)
+        files.update(self._index)
+        # purge des entrées périmées (sha plus référencé par aucun fichier indexé, y compris
+        # par les autres builds : tools/batch_build.py en lance plusieurs sur le même cache)
+        live = {fp[2] for fp in files.values()}
+        for old in {sha for sha in self._prev_sha.values() if sha} - live:
+            for fp in glob.glob(os.path.join(self.root, "*", old + "*.pkl")):
+                try:
+                    os.remove(fp)
+                except OSError:
+                    pass
+        self._write(os.path.join(self.root, INDEX_NAME), {"salt": self.salt, "files": files})
+
+    def report(self) -> str:
+        if not self.enabled:
+            return "[CACHE] désactivé (--no-cache)"
+        kinds = sorted(set(self.hits) | set(self.misses))
+        parts = [f"{k}: {self.hits.get(k, 0)} hit / {self.misses.get(k, 0)} miss" for k in kinds]
+        total_h, total_m = sum(self.hits.values()), sum(self.misses.values())
+        return f"[CACHE] {total_h} hit(s), {total_m} miss(es) — " + (", ".join(parts) or "rien")
@@ -1,649 +1,425 @@
 #!/usr/bin/env python3
 # Re-génère public/data/quests.json à partir d'un CSV exporté
-import sys, os, json, re, datetime, glob
-import pandas as pd
-import numpy as np
-from typing import Dict, List, Set
-
-if len(sys.argv) < 2:
-    print("Usage: python tools/convert_csv_to_json.py <QUESTS_CSV> [ITEMS_CSV] [OBJECTIVE_TASKS_PATH] [LOCALE_JSON] [POI_DIR] [VITALS_JSON]")
-    sys.exit(1)
-
-csv_path = sys.argv[1]
-out_path = os.path.join('public', 'data', 'quests.json')
-df = pd.read_csv(csv_path, encoding='utf-8', low_memory=False)
-df.columns = [c.strip() for c in df.columns]
-EXCLUDE_RE = re.compile(r"(^01_|^S_|^Quest_|AC_Test|devworld|_alt|EnterZone_SM|_EG|_RW|^9806_|^9809_|^9812_" \
-                        r"|(_soldier|_destroyer|_ranger|_musketeer|_occultist|_mystic|_swordsman)$)")
-TYPE_EXCLUDE_RE = re.compile(r"\b(Artifact|Mission|Community Goal)\b", re.IGNORECASE)
-MANUAL_PATH = os.path.join('tools', 'manual_links.json')
-
-
-
-# ----- items.csv (optionnel) -------------------------------------------------
-# Colonnes attendues: "Name", "Item ID", "Icon Path", "Rarity"
-items_path = None
-if len(sys.argv) >= 3:
-    items_path = sys.argv[2]
-else:
-    # chemin par défaut
-    cand = os.path.join('tools', 'items.csv')
-    if os.path.isfile(cand):
-        items_path = cand
-
-items_by_id = {}
-items_by_name = {}
-if items_path and os.path.isfile(items_path):
-    try:
-        idf = pd.read_csv(items_path, encoding='utf-8', low_memory=False)
-        idf.columns = [c.strip() for c in idf.columns]
-        for _, ir in idf.iterrows():
-            name = str(ir.get('Name', '') or '').strip()
-            iid  = str(ir.get('Item ID', '') or '').strip()
-            icon = str(ir.get('Icon Path', '') or '').strip()
-            rarity = str(ir.get('Rarity', '') or '').strip()
-            if iid:
-                items_by_id[iid] = {'id': iid, 'name': name or iid, 'icon': icon, 'rarity': rarity}
-            if name:
-                items_by_name[name.lower()] = {'id': iid, 'name': name, 'icon': icon, 'rarity': rarity}
-    except Exception as ex:
-        print(f"[items.csv] lecture impossible: {ex}")
-
-
-############################################
-# Chargement des ObjectiveTasks (fusion)
-############################################
-
-# 2ᵉ/3ᵉ arguments optionnels
-items_csv_path = sys.argv[2] if len(sys.argv) >= 3 and sys.argv[2] else None
-# Peut être un CSV unique OU un dossier contenant des ObjectiveTasksDataManager_*.csv
-objective_tasks_path = sys.argv[3] if len(sys.argv) >= 4 and sys.argv[3] else "ObjectiveTasksDataManager.csv"
-
-
-# Si tu avais déjà un chargement des items via sys.argv[2], garde-le tel quel.
-# Ici on s'assure juste de ne pas écraser ta variable existante si elle est déjà définie plus haut.
-try:
-    _ = items_csv_path  # no-op, juste pour clarifier
-except NameError:
-    items_csv_path = None
-
-def load_objective_tasks_many(path_or_csv: str) -> Dict[str, dict]:
+# (CLI : arguments, cache disque, profil et écriture ; le pipeline est dans quest_pipeline.py)
+import os, glob, argparse, hashlib
+from typing import Dict, List, Optional, Set
+
+from build_cache import BuildCache, sha1_file
+from graph_analysis import format_summary
+from output_formats import BINARY_FORMATS, format_report, write_outputs
+from profiler import PhaseProfiler
+from quest_delta import compute_delta, delta_paths, delta_summary, format_changelog, read_output, remove_delta
+from quest_pipeline import (QUEST_CHUNK_ROWS, SCHEMA_VERSION, build_locale_variants, build_quests, iter_quest_rows,
+                            load_indexes, load_quest_rows, locale_lang, locale_output_path)
+from quest_stream import stream_quests
+from search_index import build_search_index
+from split_output import SPLIT_KEYS, remove_split, remove_stale_parts, split_paths, write_split
+from sqlite_export import format_counts, write_sqlite
+from unlock_index import build_unlock_index
+from watch_mode import WatchSession, snapshot_sources
+
+OUT_PATH = os.path.join('public', 'data', 'quests.json')
+CACHE_DIR = os.path.join('tools', '.cache')
+
+
+# ---------- CLI ----------
+def parse_args(argv=None) -> argparse.Namespace:
+    ap = argparse.ArgumentParser(
+        description="Re-génère public/data/quests.json à partir d'un CSV exporté",
+        usage="python tools/convert_csv_to_json.py <QUESTS_CSV> [ITEMS_CSV] [OBJECTIVE_TASKS_PATH] "
+              "[LOCALE_JSON] [POI_DIR] [VITALS_JSON] [options]")
+    ap.add_argument('quests_csv')
+    ap.add_argument('items_csv', nargs='?')
+    # Peut être un CSV unique OU un dossier contenant des ObjectiveTasksDataManager_*.csv
+    ap.add_argument('objective_tasks_path', nargs='?')
+    ap.add_argument('locale_json', nargs='?')
+    ap.add_argument('poi_dir', nargs='?')
+    ap.add_argument('vitals_json', nargs='?')
+    ap.add_argument('--out', default=OUT_PATH,
+                    help="fichier de sortie (défaut: %(default)s) ; les sorties annexes (.gz, index, delta, "
+                         "langues, --split) sont écrites à côté")
+    ap.add_argument('--schema', type=int, choices=(1, 2), default=SCHEMA_VERSION,
+                    help="1 = lignes de tâches recopiées dans chaque quête (ancien format) ; "
+                         "2 = table 'tasks' commune référencée par ID (défaut)")
+    ap.add_argument('--minify', action='store_true', help="JSON compact (sans indentation)")
+    ap.add_argument('--gzip', action='store_true', help="écrit aussi quests.json.gz (servi tel quel par l'hébergeur)")
+    ap.add_argument('--brotli', action='store_true', help="écrit aussi quests.json.br (nécessite le module brotli)")
+    ap.add_argument('--binary', choices=BINARY_FORMATS,
+                    help="variante binaire quests.msgpack / quests.cbor (nécessite msgpack / cbor2)")
+    ap.add_argument('--intern', action='store_true',
+                    help="quests.json (et variantes) avec tables de chaînes partagées : valeurs répétées (type, "
+                         "icônes, rareté, Type des tâches…) remplacées par un indice, préfixes d'URL des jetons "
+                         "codés sur un caractère ; décodé sans perte par le front")
+    ap.add_argument('--split', choices=SPLIT_KEYS,
+                    help="écrit aussi public/data/quests.manifest.json (quêtes allégées, graphe, layout) et une "
+                         "part par zone (ou par type) dans public/data/quests/ avec tâches, descriptions et "
+                         "récompenses ; noms hashés par contenu (cache long), le front ne charge que les zones vues")
+    ap.add_argument('--search-index', action='store_true',
+                    help="écrit aussi public/data/quests.search.json : index inversé (id, titre, description, "
+                         "tâches, objets, créatures, POI) pour la recherche préfixe / approchée du front")
+    ap.add_argument('--unlock-index', action='store_true',
+                    help="écrit aussi public/data/quests.unlock.json : indice dense par quête, fermeture des "
+                         "prérequis en bitsets et récompenses cumulées (requêtes de progression, cf. "
+                         "tools/unlock_index.py)")
+    ap.add_argument('--sqlite', metavar='PATH',
+                    help="écrit aussi une base SQLite (quêtes, tâches et sous-tâches, arêtes, récompenses, jetons "
+                         "résolus ; index sur zone, niveaux, achievement, ItemName, ItemDropVC, POITag) pour les "
+                         "requêtes ponctuelles, cf. tools/sqlite_export.py")
+    ap.add_argument('--delta-from', metavar='PREV_JSON',
+                    help="sortie d'un build précédent (quests.json ou .json.gz, peut être la sortie actuelle, "
+                         "lue avant d'être remplacée) : écrit aussi quests.delta.json (quêtes, tâches, arêtes et "
+                         "vues de layout modifiées) et quests.changelog.md")
+    ap.add_argument('--format-report', action='store_true',
+                    help="compare taille et temps de décodage des fichiers écrits")
+    ap.add_argument('--no-analysis', action='store_true',
+                    help="saute l'analyse du graphe (cycles, réduction transitive, profondeur)")
+    ap.add_argument('--drop-cycles', action='store_true',
+                    help="retire les prérequis qui ferment un cycle (sinon simple avertissement)")
+    ap.add_argument('--no-layout', action='store_true',
+                    help="n'écrit pas le layout précalculé (le front relance alors ELK)")
+    ap.add_argument('--profile', action='store_true',
+                    help="temps / mémoire (RSS, tracemalloc) / débit par phase + résumé JSON")
+    ap.add_argument('--profile-json', default=os.path.join(CACHE_DIR, 'profile.json'),
+                    help="résumé JSON du profil (défaut: %(default)s)")
+    ap.add_argument('--no-tracemalloc', action='store_true',
+                    help="avec --profile : temps et RSS seulement (tracemalloc ralentit nettement les phases)")
+    ap.add_argument('--cprofile', metavar='PSTATS',
+                    help="avec --profile : dump cProfile du run (lisible avec python -m pstats)")
+    ap.add_argument('--no-cache', action='store_true',
+                    help=f"ignore le cache des sources parsées ({CACHE_DIR}) : tout est re-parsé")
+    ap.add_argument('--jobs', type=int, default=os.cpu_count() or 1,
+                    help="processus pour parser les shards ObjectiveTasks (1 = série ; défaut: nb de CPU)")
+    ap.add_argument('--referenced-only', action='store_true',
+                    help="ne garde des items, POI, vitals et locales que les clés référencées par les quêtes "
+                         "et les tâches (mémoire et temps réduits sur les exports complets du jeu ; sortie identique)")
+    ap.add_argument('--locales', nargs='+', default=[], metavar='LOCALE_JSON',
+                    help="autres langues : écrit aussi public/data/quests.<lang>.json par fichier (lang = nom "
+                         "du fichier, ex. fr-fr.json -> quests.fr-fr.json) ; graphe et layout calculés une "
+                         "seule fois, locales traitées en parallèle (--jobs)")
+    ap.add_argument('--watch', action='store_true',
+                    help="reste actif : surveille les entrées (et manual_links.json) et ne reconstruit que ce qui change")
+    ap.add_argument('--watch-interval', type=float, default=0.5, metavar='SECONDES',
+                    help="période de scrutation de --watch (défaut: %(default)s)")
+    ap.add_argument('--shard-report', action='store_true',
+                    help="détail par shard ObjectiveTasks : temps, source (cache/parse), TaskID écrasés")
+    ap.add_argument('--stream', action='store_true',
+                    help="mémoire bornée : CSV des quêtes lu par blocs, quêtes écrites au fil de l'eau (quêtes "
+                         "principales d'abord, comme le build normal) ; sans analyse du graphe ni layout")
+    ap.add_argument('--stream-chunk', type=int, default=QUEST_CHUNK_ROWS, metavar='LIGNES',
+                    help="lignes du CSV des quêtes lues par bloc avec --stream (défaut: %(default)s)")
+    args = ap.parse_args(argv)
+    if args.stream:
+        # ces sorties ont besoin de toutes les quêtes en mémoire
+        needs_all = [opt for opt, on in (('--split', args.split), ('--search-index', args.search_index),
+                                         ('--unlock-index', args.unlock_index), ('--sqlite', args.sqlite),
+                                         ('--delta-from', args.delta_from), ('--locales', args.locales),
+                                         ('--watch', args.watch), ('--intern', args.intern),
+                                         ('--binary', args.binary)) if on]
+        if needs_all:
+            ap.error(f"--stream incompatible avec {', '.join(needs_all)}")
+    return args
+
+def search_index_path(out_path: str) -> str:
+    # quests.json -> quests.search.json, quests.fr-fr.json -> quests.fr-fr.search.json
+    return os.path.splitext(out_path)[0] + '.search.json'
+
+def unlock_index_path(out_path: str) -> str:
+    return os.path.splitext(out_path)[0] + '.unlock.json'
+
+def remove_outputs(paths) -> List[str]:
+    # sorties d'une option non demandée à ce build (et leurs .gz/.br) : laissées en place,
+    # le front chargerait un index qui ne correspond plus à quests.json
+    removed = []
+    for stale in paths:
+        for path in (stale, stale + '.gz', stale + '.br'):
+            if os.path.isfile(path):
+                os.remove(path)
+                removed.append(path)
+    return removed
+
+# suffixes des sorties annexes (<sortie>.<suffixe>.json) : pas des locales
+_NOT_LOCALE = ('search', 'unlock', 'manifest', 'delta')
+
+def locale_outputs(out_path: str) -> List[str]:
+    """Langues des sorties de locale (<sortie>.<lang>.json) présentes à côté de out_path."""
+    base = os.path.splitext(out_path)[0]
+    langs = []
+    for fp in glob.glob(glob.escape(base) + '.*.json'):
+        lang = fp[len(base) + 1:-len('.json')]
+        if '.' not in lang and lang not in _NOT_LOCALE:
+            langs.append(lang)
+    return sorted(langs)
+
+def remove_stale_outputs(out_path: str, split: bool = False, delta: bool = False, search_index: bool = False,
+                         unlock_index: bool = False, langs=()):
     """
-    Charge un ou plusieurs ObjectiveTasksDataManager_*.csv et fusionne en:
-      dict[TaskID] = row(dict)
-    - Si path_or_csv est un dossier: on prend tous les fichiers
-      ObjectiveTasksDataManager*.csv dedans.
-    - Sinon: on traite path_or_csv comme un seul CSV.
+    Supprime les sorties des options non demandées à ce build (et celles des locales absentes
+    de `langs`) : laissées en place, le front continuerait de les charger (il préfère le
+    manifest à quests.json, applique le delta à sa copie…).
     """
-    files: List[str] = []
-    if path_or_csv and os.path.isdir(path_or_csv):
-        # Tous les CSV “ObjectiveTasksDataManager*.csv” du dossier
-        files = sorted(glob.glob(os.path.join(path_or_csv, "ObjectiveTasksDataManager*.csv")))
-    elif path_or_csv and os.path.isfile(path_or_csv):
-        files = [path_or_csv]
-    else:
-        # Fallback: tenter un fichier simple dans CWD
-        if os.path.isfile("ObjectiveTasksDataManager.csv"):
-            files = ["ObjectiveTasksDataManager.csv"]
-
-    if not files:
-        print(f"[WARN] Aucun ObjectiveTasksDataManager*.csv trouvé à partir de: {path_or_csv}")
-        return {}
-
-    idx: Dict[str, dict] = {}
-    total_rows = 0
-    for fp in files:
-        try:
-            df_tasks = pd.read_csv(fp, encoding='utf-8', low_memory=False)
-        except Exception as e:
-            print(f"[WARN] Lecture impossible: {fp} ({e})")
-            continue
-        df_tasks.columns = [c.strip() for c in df_tasks.columns]
-        if "TaskID" not in df_tasks.columns:
-            print(f"[WARN] Colonne 'TaskID' absente dans {os.path.basename(fp)} — ignoré")
-            continue
-        for _, row in df_tasks.iterrows():
-            tid = str(row.get("TaskID","")).strip()
-            if not tid:
-                continue
-            # dernière occurrence gagne (OK pour nous)
-            idx[tid] = {k: (None if (isinstance(v,float) and np.isnan(v)) else v) for k,v in row.to_dict().items()}
-            total_rows += 1
-    print(f"[OK] ObjectiveTasks chargés: {len(idx)} (fusion de {len(files)} fichier(s), {total_rows} lignes lues)")
-    return idx
-
-
-
-# Construit les index
-task_index = load_objective_tasks_many(objective_tasks_path)
-
-# ---------- Optional: load locale (en-us.json) ----------
-locale_map: Dict[str, str] = {}
-locale_path = None
-if len(sys.argv) >= 5:
-    locale_path = sys.argv[4]
-    try:
-        with open(locale_path, "r", encoding="utf-8") as f:
-            locale_map = json.load(f)
-        print(f"[OK] Locale chargé: {len(locale_map):,} entrées depuis {locale_path}")
-    except Exception as e:
-        print(f"[WARN] Impossible de charger le fichier locale {locale_path}: {e}")
-        locale_map = {}
-
-# ---------- Helpers: recursive collection of TP_DescriptionTag ----------
-SUBTASK_COL_RE = re.compile(r'^\s*sub\s*task', re.IGNORECASE)
-
-def _is_hidden_task(row: dict) -> bool:
-    v = row.get('IsHidden', 0)
-    try:
-        return int(v) == 1
-    except Exception:
-        return str(v).strip().lower() in ('1', 'true', 'yes')
-
-def _iter_subtask_ids(row: dict) -> list[str]:
-    ids: list[str] = []
-    for k, v in row.items():
-        if not isinstance(k, str):
-            continue
-        if not SUBTASK_COL_RE.match(k):
-            continue
-        if v is None or (isinstance(v, float) and np.isnan(v)) or str(v).strip() == '':
-            continue
-        for tok in re.split(r'[,\|; \t]+', str(v).strip()):
-            tid = tok.strip()
-            if tid and tid in task_index:
-                ids.append(tid)
-    return ids
-
-def _format_percent(p) -> str:
-    """Normalise un pourcentage : 0.25 -> '25%', 25 -> '25%'."""
+    stale_langs = [lang for lang in locale_outputs(out_path) if lang not in langs]
+    for lang in stale_langs:
+        path = locale_output_path(out_path, lang)
+        for removed in remove_outputs([path, search_index_path(path), split_paths(out_path, lang)[0]]):
+            print(f"[INFO] Locale périmée supprimée: {removed}")
+    if not split:
+        for path in remove_split(out_path):
+            print(f"[INFO] Sortie découpée périmée supprimée: {path}")
+    elif stale_langs:
+        remove_stale_parts(out_path)
+    if not delta:
+        for path in remove_delta(out_path):
+            print(f"[INFO] Delta périmé supprimé: {path}")
+    if not search_index:
+        # y compris ceux des locales (quests.<lang>.search.json)
+        stale = [search_index_path(locale_output_path(out_path, lang)) for lang in locale_outputs(out_path)]
+        for path in remove_outputs([search_index_path(out_path)] + stale):
+            print(f"[INFO] Index de recherche périmé supprimé: {path}")
+    if not unlock_index:
+        for path in remove_outputs([unlock_index_path(out_path)]):
+            print(f"[INFO] Index de déblocage périmé supprimé: {path}")
+
+def _desc_blob_name(out_path: str) -> str:
+    # descriptions mémorisées par sortie : plusieurs jeux de données (tools/batch_build.py)
+    # partagent le même cache sans s'invalider l'un l'autre
+    if os.path.abspath(out_path) == os.path.abspath(OUT_PATH):
+        return 'task_desc_texts'
+    return 'task_desc_texts-' + hashlib.sha1(os.path.abspath(out_path).encode('utf-8')).hexdigest()[:12]
+
+def _cache_salt() -> str:
+    # le cache est invalidé dès que le pipeline (ou pandas) change ; version lue sans importer pandas
+    from importlib import metadata
     try:
-        if p is None or (isinstance(p, float) and np.isnan(p)):
-            return ""
-        v = float(p)
-        if v <= 1.0:
-            v = v * 100.0
-        # pas d'arrondi agressif, gardons 0 décimale si entier
-        if abs(v - round(v)) < 1e-6:
-            return f"{int(round(v))}%"
-        return f"{v:.1f}%"
-    except Exception:
-        s = str(p).strip()
-        return s if s.endswith('%') else (s + '%')
-
-def _apply_placeholders(txt: str, row: dict) -> str:
-    """
-    Remplace {POITags}, {itemName}, {targetName} dans 'txt' à partir des colonnes de 'row'.
-    Pour {itemName}, on injecte un token spécial lisible par le front :
-      {{ITEM::icon=<url>::name=<nom>::drop=<xx%>}}
-    """
-    if not isinstance(txt, str) or not txt:
-        return txt
-    out = txt
-
-    # {POITags}
-    poi_tag = str(row.get('POITag') or '').strip()
-    if '{POITags}' in out and poi_tag:
-        # si plusieurs tags sont listés, on prend le 1er résolu
-        candidates = [t.strip() for t in re.split(r'[,\|\s]+', poi_tag) if t.strip()] or [poi_tag]
-        token_or_text = None
-        for t in candidates:
-            rec = poi_tag_to_def.get(t)
-            if rec and (rec.get("name") or rec.get("icon") or rec.get("territoryId") is not None):
-                name = rec.get("name") or t
-                icon = rec.get("icon") or ""
-                tid  = rec.get("territoryId")
-                # Token POI consommé par le front (affiche un badge + lien NWDB zone/tid)
-                token_or_text = f"{{{{POI::icon={icon}::name={name}::tid={tid}}}}}"
-                break
-        if not token_or_text:
-            # fallback: tentative directe via locale, sinon garder le tag brut
-            token_or_text = _locale_get(candidates[0]) or candidates[0]
-        out = out.replace('{POITags}', token_or_text)
-
-    # {itemName} -> token ITEM
-    if '{itemName}' in out:
-        item_raw = str(row.get('ItemName') or '').strip()
-        icon, disp, rarity = "", "", ""
-        if item_raw:
-            # résolution via items.csv (par nom, puis par ID)
-            rec = items_by_name.get(item_raw.lower()) or items_by_id.get(item_raw)
-            if rec:
-                icon = rec.get('icon') or ''
-                disp = rec.get('name') or item_raw
-                rarity = (rec.get('rarity') or '').lower()
-            else:
-                disp = item_raw
-        drop = _format_percent(row.get('ItemDropProbability') if row.get('ItemDropProbability') not in (None, '') else row.get('ChestDropProbability'))
-        token = f"{{{{ITEM::icon={icon}::name={disp}::drop={drop}::rarity={rarity}}}}}"
-        out = out.replace('{itemName}', token)
-
-    # {targetName} -> "qty × {{VC::name=...::qty=...::named=0|1}}"
-    if '{targetName}' in out:
-        raw_qty = row.get('TargetQty')
-        try:
-            if raw_qty is None or (isinstance(raw_qty, float) and np.isnan(raw_qty)):
-                qty_val = ''
-            else:
-                qf = float(raw_qty)
-                qty_val = int(qf) if abs(qf - int(qf)) < 1e-6 else qf
-        except Exception:
-            qty_val = str(raw_qty).strip()
-
-        vc_id = str(row.get('ItemDropVC') or '').strip()
-        vc_rec = vitals_by_id.get(vc_id) or vitals_by_id.get(vc_id.lower()) if vc_id else None
-        if vc_rec:
-            vc_name = vc_rec.get("name") or vc_id
-            named   = "1" if vc_rec.get("isNamed") else "0"
-        else:
-            # fallback KillEnemyType (non nommé)
-            vc_name = str(row.get('KillEnemyType') or '').strip() or 'Target'
-            named   = "0"
-        qty_str = f"{qty_val}" if str(qty_val) != '' else ""
-        vc_url = f"https://nwdb.info/db/creature/{vc_id}" if vc_id else ""
-        token = f"{{{{VC::name={vc_name}::qty={qty_str}::named={named}::id={vc_id}::url={vc_url}}}}}"
-        out = out.replace('{targetName}', token)
-    return out
-
-def _collect_desc_texts(row: dict, visited: set[str]) -> list[str]:
-    """
-    Récupère récursivement les descriptions (locale résolue) en appliquant les placeholders.
-    Ignore IsHidden == 1.
-    """
-    out: list[str] = []
-    tid = str(row.get('TaskID') or row.get('Task Id') or row.get('ID') or '').strip()
-    if tid:
-        if tid in visited:
-            return out
-        visited.add(tid)
-    if not _is_hidden_task(row):
-        tag = str(row.get('TP_DescriptionTag') or '').strip()
-        if tag:
-            base = _locale_get(tag) if locale_map else tag
-            out.append(_apply_placeholders(base, row))
-    for cid in _iter_subtask_ids(row):
-        child = task_index.get(cid)
-        if child:
-            out.extend(_collect_desc_texts(child, visited))
-    return out
-
-# ---------- Locale helpers ----------
-def _desc_key_from_tag(tag: str) -> str:
-    """
-    Convertit un tag de la forme @\"KEY\" ou @"KEY" ou "KEY" en 'KEY'
-    """
-    s = str(tag).strip()
-    if s.startswith('@'):
-        s = s[1:].strip()
-    # retire guillemets simples/doubles entourant la clé
-    if (s.startswith('"') and s.endswith('"')) or (s.startswith("'") and s.endswith("'")):
-        s = s[1:-1]
-    return s
-
-def _locale_get(key: str) -> str:
-    """
-    Lookup insensible à la casse dans le fichier de locale.
-    Retourne la clé brute si non trouvée.
-    """
-    if not isinstance(key, str) or not key.strip():
-        return ""
-    k = _desc_key_from_tag(key)
-    return locale_map.get(k) or locale_map.get(k.lower()) or k
-
-# ---------- POI definitions (javelindata_poidefinitions_*.json) ----------
-# On construit un mapping: poi_tag -> {"name": <nom localisé>, "icon": <url absolue>, "territoryId": <int>}
-def load_poi_defs(dir_path: str) -> Dict[str, dict]:
-    mapping: Dict[str, dict] = {}
-    if not dir_path or not os.path.isdir(dir_path):
-        return mapping
-    files = sorted(glob.glob(os.path.join(dir_path, "javelindata_poidefinitions_*.json")))
-    total = 0
-    cdn_prefix = "https://cdn.nw-buddy.de/nw-data/live/"
-
-    for fp in files:
-        try:
-            with open(fp, "r", encoding="utf-8") as f:
-                arr = json.load(f)
-        except Exception as e:
-            print(f"[WARN] Impossible de lire {os.path.basename(fp)}: {e}")
-            continue
-        if not isinstance(arr, list):
-            continue
-        for rec in arr:
-            total += 1
-            tags = rec.get("POITag")
-            name_key = rec.get("NameLocalizationKey")
-            map_icon = rec.get("MapIcon") or ""
-            territory_id = rec.get("TerritoryID")
-            # URL absolue vers l'icône (si fournie)
-            icon_url = (cdn_prefix + map_icon) if map_icon else ""
-            if not tags or not name_key:
-                continue
-            # POITag est un tableau; on mappe chaque tag vers le nom localisé
-            try:
-                for t in tags:
-                    t_str = str(t).strip()
-                    if t_str and t_str not in mapping:
-                        mapping[t_str] = {
-                            "name": _locale_get(name_key),   # enlève @ et résout via locale
-                            "icon": icon_url,
-                            "territoryId": territory_id
-                        }
-            except Exception:
-                # si jamais ce n'est pas un tableau
-                t_str = str(tags).strip()
-                if t_str and t_str not in mapping:
-                    mapping[t_str] = {
-                        "name": _locale_get(name_key),
-                        "icon": icon_url,
-                        "territoryId": territory_id
-                    }
-    print(f"[OK] POI defs chargés: {len(mapping)} tags (depuis {len(files)} fichiers, {total} entrées)")
-    return mapping
-
-# chemin du dossier contenant les javelindata_poidefinitions_*.json
-poi_dir = None
-if len(sys.argv) >= 6 and sys.argv[5]:
-    poi_dir = sys.argv[5]
-else:
-    # défaut: tools/pointofinterestdefinitions
-    cand = os.path.join("tools", "pointofinterestdefinitions")
-    poi_dir = cand if os.path.isdir(cand) else None
-poi_tag_to_def: Dict[str, dict] = load_poi_defs(poi_dir) if poi_dir else {}
-
-# ---------- Vitals categories (javelindata_vitalscategories.json) ----------
-# Map: id -> {"name": <localisé>, "isNamed": bool}
-def load_vitals_categories(path: str) -> Dict[str, dict]:
-    mapping: Dict[str, dict] = {}
-    if not path or not os.path.isfile(path):
-        return mapping
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            arr = json.load(f)
-    except Exception as e:
-        print(f"[WARN] Impossible de lire {os.path.basename(path)}: {e}")
-        return mapping
-    if not isinstance(arr, list):
-        return mapping
-    for rec in arr:
-        vc_id = str(rec.get("VitalsCategoryID") or "").strip()
-        disp  = rec.get("DisplayName")
-        is_named = bool(rec.get("IsNamed", False))
-        if not vc_id:
-            continue
-        # Résolution via locale (enlève @, insensible à la casse)
-        name = _locale_get(str(disp) or "") if disp else vc_id
-        mapping[vc_id] = {"name": name, "isNamed": is_named}
-        # Accès tolérant à la casse
-        mapping.setdefault(vc_id.lower(), {"name": name, "isNamed": is_named})
-    print(f"[OK] VitalsCategories chargés: {len(mapping)} entrées depuis {path}")
-    return mapping
-
-# chemin du fichier javelindata_vitalscategories.json
-vitals_path = sys.argv[6] if len(sys.argv) >= 7 and sys.argv[6] else None
-if not vitals_path:
-    cand = os.path.join("tools", "javelindata_vitalscategories.json")
-    vitals_path = cand if os.path.isfile(cand) else None
-vitals_by_id: Dict[str, dict] = load_vitals_categories(vitals_path) if vitals_path else {}
-
-
-# Helper pour récupérer l'ID de tâche dans une ligne brute (clé "Task ID"/"ID", etc.)
-def task_id_from_row(row: dict) -> str:
-    for k in row.keys():
-        if re.match(r'^\s*(Task\s*ID|ID|TaskId|TaskID)\s*$', str(k), re.I):
-            val = str(row.get(k) or "").strip()
-            if val:
-                return val
-    return ""
-
-def to_int_safe(x):
-    try:
-        if x is None or (isinstance(x, float) and np.isnan(x)): return None
-        if isinstance(x, bool): return int(x)
-        s = str(x).strip()
-        if s.lower() in ('true','false','nan','none',''): return None
-        return int(float(s))
-    except Exception:
-        return None
-
-def get(row, col, default=None):
-    return row[col] if col in row and pd.notna(row[col]) else default
-
-# 1) Construire la liste des quêtes conservées (on exclut ici)
-rows = []
-for _, r in df.iterrows():
-    qid = str(get(r, 'ID', '')).strip()
-    if not qid or EXCLUDE_RE.search(qid):
-        continue
-    t = str(get(r, 'Type', '') or '')
-    if TYPE_EXCLUDE_RE.search(t):
-        continue
-    rows.append(r)
-
-# 2) Index achievement -> questId uniquement sur les quêtes conservées
-ach_to_q = {}
-for r in rows:
-    ach = str(get(r, 'Achievement Id', '')).strip()
-    qid = str(get(r, 'ID', '')).strip()
-    if ach:
-        ach_to_q.setdefault(ach, set()).add(qid)
-
-token_re = re.compile(r"[A-Za-z0-9_\\-]+")
-
-# Support : !TOKEN, TOKEN, opérateurs &&, ||, parenthèses (on considère le ! immédiat)
-def parse_logic(expr: str):
-    out = []
-    if not isinstance(expr, str) or not expr.strip():
-        return out
-    for raw in re.findall(r'!?[A-Za-z0-9_\\-]+', expr):
-        is_neg = raw.startswith('!')
-        tok = raw[1:] if is_neg else raw
-        out.append((tok, is_neg))
-    return out
-
-quests = []
-edges = []
-for r in rows:
-    qid = str(get(r, 'ID', '')).strip()
-    if not qid: 
-        continue
-    q = {
-        "id": qid,
-        "title": str(get(r, 'Title', '')).strip(),
-        "description": str(get(r, 'Description', '')).strip(),
-        "type": str(get(r, 'Type', '')).strip(),
-        "icon": str(get(r, 'Icon', '')).strip(),
-        "recommended_level": to_int_safe(get(r, 'Difficulty Level', None)),
-        "required_level": to_int_safe(get(r, 'Required Level', None)),
-        "zone_id": to_int_safe(get(r, 'Exclusive Territory', None)),
-        "rewards": [],
-        "achievement_id": str(get(r, 'Achievement Id', '')).strip() or None,
-        "required_achievements_expr": str(get(r, 'Required Achievement Id', '')).strip() or None,
-        "prerequisites": [],
-        "not_prerequisites": [],
-        "repeatable": False,
-        "priority": 1,
-        "tasks": []
-    }
-
-    # Rewards
-    exp = to_int_safe(get(r, 'Universal Exp Amount', None)) or 0
-    az  = to_int_safe(get(r, 'Azoth Reward', None)) or 0
-    coin = to_int_safe(get(r, 'Currency Reward', None)) or 0
-    standing = to_int_safe(get(r, 'Territory Standing', None)) or 0
-    faction_influence  = to_int_safe(get(r, 'Faction Influence Amount', None)) or 0
-    faction_reputation  = to_int_safe(get(r, 'Faction Reputation', None)) or 0
-    faction_tokens  = to_int_safe(get(r, 'Faction Tokens', None)) or 0
-    q["experience_reward"] = exp
-    q["azoth_reward"] = az
-    q["currency_reward"] = coin
-    q["territory_standing"] = standing
-    q["faction_influence"] = faction_influence
-    q["faction_reputation"] = faction_reputation
-    q["faction_tokens"] = faction_tokens
-    if exp > 0: q["rewards"].append(f"XP +{exp}")
-    if az  > 0: q["rewards"].append(f"Azoth +{az}")
-    if coin> 0: q["rewards"].append(f"Coin +{coin}")
-    if standing > 0: q["rewards"].append(f"Territory Standing +{standing}")
-    # ---- Items de récompense (peuvent être 0, 1 ou 2) ----
-    item_id_raw   = str(get(r, 'Item Reward', '')).strip()
-    item2_name_raw = str(get(r, 'Item Reward Name', '')).strip()
-    item2_qty      = to_int_safe(get(r, 'Item Reward Qty', None)) or 0  # qty liée au *Name* seulement
-
-    # Résolutions
-    resolved_by_id = items_by_id.get(item_id_raw) if item_id_raw else None
-    # "Item Reward Name" contient en réalité un *ID* d'item : on essaie par ID d'abord, puis par nom en fallback
-    resolved_item2 = (
-        items_by_id.get(item2_name_raw) or
-        (items_by_name.get(item2_name_raw.lower()) if item2_name_raw else None)
-    ) if item2_name_raw else None
-
-    # Nouveau format : liste d’objets item_rewards
-    q["item_rewards"] = []
-    if item_id_raw:
-        q["item_rewards"].append({
-            "id": item_id_raw,
-            "name": (resolved_by_id.get("name") if resolved_by_id else item_id_raw),
-            "icon": (resolved_by_id.get("icon") if resolved_by_id else None),
-            "rarity": (resolved_by_id.get("rarity") if resolved_by_id else None),
-            "qty": None  # pas de quantité liée à "Item Reward" (ID)
+        pandas_version = metadata.version('pandas')
+    except metadata.PackageNotFoundError:
+        pandas_version = ""
+    here = os.path.dirname(os.path.abspath(__file__))
+    return "|".join([sha1_file(os.path.join(here, 'convert_csv_to_json.py')),
+                     sha1_file(os.path.join(here, 'quest_pipeline.py')),
+                     sha1_file(os.path.join(here, 'json_stream.py')), pandas_version])
+
+def _main_stream(args, ix, cache: BuildCache, prof: PhaseProfiler, csv_path: str, out_path: str):
+    if not (args.no_analysis and args.no_layout):
+        print("[INFO] --stream : ni analyse du graphe ni layout précalculé (le front relance ELK)")
+    written, stats = stream_quests(csv_path, ix, out_path, schema=args.schema, chunksize=args.stream_chunk,
+                                   minify=args.minify, gz=args.gzip, br=args.brotli, prof=prof)
+    # --split, --delta-from, index et --locales refusés avec --stream : leurs sorties sont périmées
+    remove_stale_outputs(out_path)
+    cache.save()
+    prof.stop()
+    print(f"Écrit {out_path} en flux (quests={stats['quest_count']}, edges={stats['edge_count']}, "
+          f"dont {stats['main_story']} quête(s) principale(s))"
+          + (f", {stats['tasks']} tâche(s) distincte(s) dans la table" if stats['tasks'] is not None else ""))
+    if len(written) > 1 or args.format_report:
+        print("[INFO] Sorties: " + ", ".join(f"{os.path.basename(w['path'])} ({w['bytes']:,} o)" for w in written))
+    if args.format_report:
+        print(format_report(written))
+    if args.profile:
+        print(prof.report())
+        prof.write_json(args.profile_json, extra={
+            'inputs': {'quests_csv': csv_path, 'stream_chunk': args.stream_chunk},
+            'outputs': [{'path': w['path'], 'bytes': w['bytes']} for w in written],
         })
-    if item2_name_raw:
-        q["item_rewards"].append({
-            "id":    (resolved_item2.get("id")    if resolved_item2 else None),
-            "name":  (resolved_item2.get("name")  if resolved_item2 else item2_name_raw),
-            "icon":  (resolved_item2.get("icon")  if resolved_item2 else None),
-            "rarity":(resolved_item2.get("rarity")if resolved_item2 else None),
-            "qty":   (item2_qty if item2_qty and item2_qty > 1 else None)
+        print(f"[PROFILE] résumé JSON -> {args.profile_json}")
+
+def main(argv=None):
+    args = parse_args(argv)
+    prof = PhaseProfiler(enabled=args.profile, cprofile_path=args.cprofile,
+                         trace_alloc=not args.no_tracemalloc)
+    prof.start()
+    cache = BuildCache(CACHE_DIR, salt=_cache_salt(), enabled=not args.no_cache)
+
+    csv_path = args.quests_csv
+    out_path = args.out
+    rows = None
+    if not args.stream:
+        with prof.phase('quest_rows') as ph:
+            rows = cache.load('quests', csv_path, load_quest_rows)
+            ph.count(len(rows), 'lignes')
+
+    # chemins par défaut des sources optionnelles
+    items_path = args.items_csv
+    if items_path is None:
+        cand = os.path.join('tools', 'items.csv')
+        if os.path.isfile(cand):
+            items_path = cand
+    # Peut être un CSV unique OU un dossier contenant des ObjectiveTasksDataManager_*.csv
+    objective_tasks_path = args.objective_tasks_path or "ObjectiveTasksDataManager.csv"
+    locale_path = args.locale_json
+    poi_dir = args.poi_dir
+    if not poi_dir:
+        # défaut: tools/pointofinterestdefinitions
+        cand = os.path.join("tools", "pointofinterestdefinitions")
+        poi_dir = cand if os.path.isdir(cand) else None
+    vitals_path = args.vitals_json
+    if not vitals_path:
+        cand = os.path.join("tools", "javelindata_vitalscategories.json")
+        vitals_path = cand if os.path.isfile(cand) else None
+
+    sources = {'quests_csv': csv_path, 'items_csv': items_path, 'objective_tasks_path': objective_tasks_path,
+               'locale_json': locale_path, 'poi_dir': poi_dir, 'vitals_json': vitals_path, 'locales': args.locales}
+    # état des fichiers avant lecture : une modification pendant le 1er build sera vue
+    watch_snapshot = snapshot_sources(sources) if args.watch else None
+
+    changed_tids: Set[str] = set()
+    shards: Optional[Dict[str, Dict[str, dict]]] = {} if args.watch else None
+    ix = load_indexes(items_path, objective_tasks_path, locale_path, poi_dir, vitals_path, cache=cache,
+                      jobs=args.jobs, changed=changed_tids, shard_report=args.shard_report, prof=prof,
+                      shards=shards, referenced_only=args.referenced_only,
+                      rows=rows if rows is not None else iter_quest_rows(csv_path, args.stream_chunk))
+    if args.stream:
+        return _main_stream(args, ix, cache, prof, csv_path, out_path)
+
+    # Descriptions déjà résolues au run précédent : valides si items/locale/POI/vitals
+    # sont identiques et qu'aucune tâche dont elles dépendent n'a changé.
+    blob = cache.get_blob(_desc_blob_name(out_path))
+    desc_memo: Optional[Dict[str, tuple]] = None
+    if cache.enabled:
+        desc_memo = {}
+        if blob and blob.get('context') == ix.source_key:
+            desc_memo = {qid: m for qid, m in blob['entries'].items() if not (m[1] & changed_tids)}
+    if args.watch and desc_memo is None:
+        desc_memo = {}
+    layout_memo: Optional[Dict[tuple, tuple]] = {} if args.watch else None
+
+    stats: dict = {}
+    build_opts = dict(schema=args.schema, analysis=not args.no_analysis, drop_cycles=args.drop_cycles,
+                      layout=not args.no_layout)
+    write_opts = dict(minify=args.minify, gz=args.gzip, br=args.brotli, binary=args.binary,
+                      intern=args.intern)
+    split_opts = dict(minify=args.minify, gz=args.gzip, br=args.brotli)
+    data = build_quests(rows, ix, desc_memo=desc_memo, prof=prof, stats=stats, layout_memo=layout_memo,
+                        **build_opts)
+    quests = data["quests"]
+    if "graph" in data:
+        for line in format_summary(data["graph"]):
+            print(line)
+    if "layout" in data:
+        print(f"[OK] Layout précalculé: {sum(len(v) for v in data['layout'].values())} vue(s) "
+              f"en {stats['layout_seconds']:.1f}s")
+
+    previous = None
+    if args.delta_from:
+        if os.path.isfile(args.delta_from):
+            previous = read_output(args.delta_from)
+        else:
+            print(f"[WARN] --delta-from : {args.delta_from} introuvable — pas de delta")
+
+    with prof.phase('json_write') as ph:
+        written = write_outputs(data, out_path, **write_opts)
+        ph.count(len(quests), 'quêtes')
+    split_written = []
+    if args.split:
+        with prof.phase('split') as ph:
+            split_written = write_split(data, out_path, by=args.split, **split_opts)
+            ph.count(len(split_written), 'fichiers')
+        print(f"[OK] Sortie découpée ({args.split}): {split_written[0]['path']} ({split_written[0]['bytes']:,} o) "
+              f"+ {sum(w['path'].endswith('.json') for w in split_written[1:])} part(s)")
+
+    delta_written = []
+    if previous is not None:
+        with prof.phase('delta') as ph:
+            delta = compute_delta(previous, data)
+            delta_path, changelog_path = delta_paths(out_path)
+            delta_written = write_outputs(delta, delta_path, minify=args.minify, gz=args.gzip, br=args.brotli)
+            with open(changelog_path, 'w', encoding='utf-8') as f:
+                f.write(format_changelog(delta, previous, data))
+            ph.count(len(delta['added']) + len(delta['removed']) + len(delta['changed']), 'quêtes')
+        print(f"[OK] Delta depuis {args.delta_from}: {delta_summary(delta)} -> {delta_path} "
+              f"({delta_written[0]['bytes']:,} o), {changelog_path}")
+
+    search_written = []
+    if args.search_index:
+        with prof.phase('search_index') as ph:
+            index = build_search_index(quests)
+            search_written = write_outputs(index, search_index_path(out_path), minify=True, gz=args.gzip,
+                                           br=args.brotli)
+            ph.count(len(index['terms']), 'termes')
+        print(f"[OK] Index de recherche: {len(index['terms']):,} termes -> {search_written[0]['path']} "
+              f"({search_written[0]['bytes']:,} o)")
+
+    unlock_written = []
+    if args.unlock_index:
+        # ids, prérequis et récompenses ne dépendent pas de la langue : un seul index (titres
+        # de la langue par défaut, pour l'affichage)
+        with prof.phase('unlock_index') as ph:
+            unlock = build_unlock_index(quests)
+            unlock_written = write_outputs(unlock, unlock_index_path(out_path), minify=True, gz=args.gzip,
+                                           br=args.brotli)
+            ph.count(len(unlock['ids']), 'quêtes')
+        print(f"[OK] Index de déblocage: {len(unlock['ids']):,} quêtes -> {unlock_written[0]['path']} "
+              f"({unlock_written[0]['bytes']:,} o)")
+
+    sqlite_written = []
+    if args.sqlite:
+        with prof.phase('sqlite') as ph:
+            counts = write_sqlite(data, args.sqlite, ix)
+            sqlite_written = [{'path': args.sqlite, 'bytes': os.path.getsize(args.sqlite)}]
+            ph.count(sum(counts.values()), 'lignes')
+        print(f"[OK] SQLite: {args.sqlite} ({sqlite_written[0]['bytes']:,} o) — {format_counts(counts)}")
+
+    locale_written = []
+    if args.locales:
+        with prof.phase('locales') as ph:
+            locales = {locale_lang(p): p for p in args.locales}
+            variants = build_locale_variants(data, ix, locales, jobs=args.jobs)
+            for lang, variant in variants.items():
+                path = locale_output_path(out_path, lang)
+                locale_written += write_outputs(variant, path, **write_opts)
+                if args.search_index:
+                    locale_written += write_outputs(build_search_index(variant['quests']), search_index_path(path),
+                                                    minify=True, gz=args.gzip, br=args.brotli)
+                if args.split:
+                    # parts identiques d'une langue à l'autre partagées (même nom hashé)
+                    locale_written += write_split(variant, out_path, by=args.split, lang=lang, **split_opts)
+                print(f"Écrit {path} (locale {locales[lang]})")
+            ph.count(len(variants), 'locales')
+    remove_stale_outputs(out_path, split=bool(args.split), delta=previous is not None,
+                         search_index=args.search_index, unlock_index=args.unlock_index,
+                         langs=variants if args.locales else ())
+
+    if desc_memo is not None:
+        cache.put_blob(_desc_blob_name(out_path), {'context': ix.source_key, 'entries': desc_memo})
+    cache.save()
+    prof.stop()
+
+    recomputed = stats['recomputed']
+    print(f"Écrit {out_path} (quests={len(quests)}, edges={data['edge_count']})")
+    print(f"[INFO] ObjectiveTasks source: {objective_tasks_path}")
+    if locale_path:
+        print(f"[INFO] Locale utilisé: {locale_path}")
+    print(f"[INFO] Tasks résolus: {sum(len(q.get('tasks',[])) for q in quests)} (quêtes={len(quests)})"
+          + (f", {len(data['tasks'])} tâche(s) distincte(s) dans la table (schéma {args.schema})"
+             if args.schema >= 2 else ""))
+    if cache.enabled:
+        print(cache.report() + f" — descriptions recalculées: {recomputed}/{len(quests)} quête(s)")
+    if len(written) > 1 or args.format_report:
+        extra = ", ".join(f"{os.path.basename(w['path'])} ({w['bytes']:,} o)" for w in written[1:])
+        print(f"[INFO] Sorties: {os.path.basename(out_path)} ({written[0]['bytes']:,} o)"
+              + (", " + extra if extra else ""))
+    if args.format_report:
+        print(format_report(written))
+    if args.profile:
+        print(prof.report())
+        prof.write_json(args.profile_json, extra={
+            'inputs': {'quests_csv': csv_path, 'objective_tasks': objective_tasks_path,
+                       'locale': locale_path, 'poi_dir': poi_dir, 'vitals': vitals_path},
+            'counts': {'quests': len(quests), 'edges': data['edge_count'], 'tasks': len(ix.task_index),
+                       'descriptions_recomputed': recomputed},
+            'outputs': [{'path': w['path'], 'bytes': w['bytes']}
+                        for w in written + split_written + delta_written + search_written + unlock_written
+                        + sqlite_written + locale_written],
+            'cache': {'enabled': cache.enabled, 'hits': sum(cache.hits.values()),
+                      'misses': sum(cache.misses.values())},
         })
-
-    # Fallback compat’ avec l’existant (on privilégie l’item par *Name* s’il existe)
-    chosen = (q["item_rewards"][1] if len(q["item_rewards"]) > 1 else (q["item_rewards"][0] if q["item_rewards"] else None))
-    q["item_reward"]                 = (chosen.get("id") if chosen else (item_id_raw or ""))
-    q["item_reward_name"]            = (item2_name_raw or "")
-    q["item_reward_qty"]             = (item2_qty or 0)
-    q["item_reward_resolved_name"]   = (chosen.get("name") if chosen else (item2_name_raw or item_id_raw))
-    q["item_reward_icon"]            = (chosen.get("icon") if chosen else None)
-    q["item_reward_rarity"]          = (chosen.get("rarity") if chosen else None)
-
-    # Texte récap dans q["rewards"] (laisser simple)
-    if q["item_rewards"]:
-        for it in q["item_rewards"]:
-            label = it["name"]
-            if it.get("qty"):
-                label += f" x{it['qty']}"
-            q["rewards"].append(label)
-
-    task_field = str(get(r, 'Task', '') or '').strip()
-    if task_field:
-        tokens = re.split(r'[,\|; \t]+', task_field)
-        seen_tids: Set[str] = set()
-        for tok in tokens:
-            tid = tok.strip()
-            if not tid or tid in seen_tids:
-                continue
-            seen_tids.add(tid)
-
-            # Lookup direct par TaskID dans l’index fusionné
-            if tid in task_index:
-                q["tasks"].append({"task_id": tid, "data": task_index[tid]})
-            else:
-                # rien trouvé → on garde l’ID brut pour debug/affichage
-                q["tasks"].append({"task_id": tid})
-
-    # ----- Descriptions finales (avec placeholders appliqués) -----
-    desc_texts: list[str] = []
-    visited_ids: set[str] = set()
-    for t in q["tasks"]:
-        row = t.get("data")
-        if isinstance(row, dict):
-            desc_texts.extend(_collect_desc_texts(row, visited_ids))
-    # de-dupe en préservant l'ordre
-    seen_txt: set[str] = set()
-    flat_txt: list[str] = []
-    for s in desc_texts:
-        if s not in seen_txt:
-            seen_txt.add(s)
-            flat_txt.append(s)
-    q["task_desc_texts"] = flat_txt
-
-    # Repeatable via "Schedule Id" (Hourly/Daily)
-    sched = str(get(r, 'Schedule Id', '') or '')
-    if isinstance(sched, str) and ('hourly' in sched.lower() or 'daily' in sched.lower()):
-        q["repeatable"] = True
-
-    # Prérequis logiques (tokens positifs ET négatifs)
-    req = q["required_achievements_expr"]
-    if req:
-        seen_pos, seen_neg = set(), set()
-        for tok, is_neg in parse_logic(req):
-            if tok in ach_to_q:
-                for src in ach_to_q[tok]:
-                    if src == qid:
-                        continue  # pas d'auto-lien
-                    if is_neg:
-                        if src not in seen_neg:
-                            q["not_prerequisites"].append(src)
-                            edges.append((src, qid, True))   # True = négatif
-                            seen_neg.add(src)
-                    else:
-                        if src not in seen_pos:
-                            q["prerequisites"].append(src)
-                            edges.append((src, qid, False))  # False = positif
-                            seen_pos.add(src)
-
-    quests.append(q)
-
-for q in quests:
-    if q["type"].strip().lower() == "main story quest":
-        q["priority"] = 0
-
-quests.sort(key=lambda x: x["priority"])
-
-id_to_q = {q["id"]: q for q in quests}
-if os.path.isfile(MANUAL_PATH):
-    try:
-        with open(MANUAL_PATH, 'r', encoding='utf-8') as f:
-            manual = json.load(f)
-        for link in (manual.get("links") or []):
-            src = str(link.get("source", "")).strip()
-            tgt = str(link.get("target", "")).strip()
-            kind = str(link.get("type", "requires")).strip().lower()  # default = requires
-            if not src or not tgt or src == tgt:
-                continue
-            if src not in id_to_q or tgt not in id_to_q:
-                print(f"[manual_links] ignoré (id absent): {src} -> {tgt}")
-                continue
-            target_q = id_to_q[tgt]
-            # initialise les listes si besoin
-            target_q.setdefault("prerequisites", [])
-            target_q.setdefault("not_prerequisites", [])
-            if kind in ("not", "negative", "forbid"):
-                if src not in target_q["not_prerequisites"]:
-                    target_q["not_prerequisites"].append(src)
-                    edges.append((src, tgt, True))   # True = négatif
-            else:
-                if src not in target_q["prerequisites"]:
-                    target_q["prerequisites"].append(src)
-                    edges.append((src, tgt, False))  # False = positif
-    except Exception as ex:
-        print(f"[manual_links] erreur de lecture {MANUAL_PATH}: {ex}")
-
-
-data = {
-    "generated_at": datetime.datetime.utcnow().isoformat()+"Z",
-    "quest_count": len(quests),
-    "edge_count": len(edges),
-    "quests": quests
-}
-
-os.makedirs(os.path.dirname(out_path), exist_ok=True)
-with open(out_path, 'w', encoding='utf-8') as f:
-    json.dump(data, f, ensure_ascii=False, indent=2)
-
-print(f"Écrit {out_path} (quests={len(quests)}, edges={len(edges)})")
-print(f"[INFO] ObjectiveTasks source: {objective_tasks_path}")
-if locale_path:
-    print(f"[INFO] Locale utilisé: {locale_path}")
-print(f"[INFO] Tasks résolus: {sum(len(q.get('tasks',[])) for q in quests)} (quêtes={len(quests)})")
-
+        print(f"[PROFILE] résumé JSON -> {args.profile_json}")
+    if args.watch:
+        session = WatchSession(sources, rows, ix, shards, out_path, build_opts, write_opts, desc_memo=desc_memo,
+                               layout_memo=layout_memo, last_data=data, split_by=args.split,
+                               search_index=args.search_index, unlock_index=args.unlock_index,
+                               sqlite_path=args.sqlite, locales={locale_lang(p): p for p in args.locales},
+                               jobs=args.jobs)
+        session.run(watch_snapshot, args.watch_interval)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,180 @@
+# Analyse du graphe de prérequis (utilisé par convert_csv_to_json.py)
+#
+#  - composantes fortement connexes (Tarjan itératif) -> cycles de prérequis positifs
+#  - option : suppression des arêtes qui ferment un cycle (--drop-cycles)
+#  - réduction transitive des arêtes positives (sur le graphe condensé) : A->C est
+#    redondante si C est déjà atteignable via un autre prérequis obligatoire de A
+#    (pas via une alternative d'un '||')
+#  - profondeur topologique (plus long chemin depuis une racine) par quête
+#
+# Les arêtes négatives (not_prerequisites) ne sont pas concernées : ce sont des
+# exclusions, souvent réciproques, pas des dépendances.
+from typing import Dict, List, Set, Tuple
+
+
+def strongly_connected_components(nodes: List[str], succ: Dict[str, List[str]]) -> List[List[str]]:
+    """Tarjan itératif ; composantes émises en ordre topologique inverse."""
+    index: Dict[str, int] = {}
+    low: Dict[str, int] = {}
+    on_stack: Set[str] = set()
+    stack: List[str] = []
+    comps: List[List[str]] = []
+    counter = 0
+    for root in nodes:
+        if root in index:
+            continue
+        index[root] = low[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(succ.get(root, ())))]
+        while work:
+            v, it = work[-1]
+            w = next(it, None)
+            if w is not None:
+                if w not in index:
+                    index[w] = low[w] = counter
+                    counter += 1
+                    stack.append(w)
+                    on_stack.add(w)
+                    work.append((w, iter(succ.get(w, ()))))
+                elif w in on_stack:
+                    low[v] = min(low[v], index[w])
+                continue
+            work.pop()
+            if work:
+                u = work[-1][0]
+                low[u] = min(low[u], low[v])
+            if low[v] == index[v]:
+                comp = []
+                while True:
+                    x = stack.pop()
+                    on_stack.discard(x)
+                    comp.append(x)
+                    if x == v:
+                        break
+                comps.append(comp)
+    return comps
+
+
+def _cycle_closing_edges(comp: List[str], succ: Dict[str, List[str]], order: Dict[str, int]) -> List[Tuple[str, str]]:
+    """Arêtes retour d'un DFS (ordre du fichier) limité à la composante : les retirer casse ses cycles."""
+    members = set(comp)
+    state: Dict[str, int] = {}
+    back: List[Tuple[str, str]] = []
+    for root in sorted(comp, key=order.__getitem__):
+        if root in state:
+            continue
+        state[root] = 1
+        work = [(root, iter([w for w in succ.get(root, ()) if w in members]))]
+        while work:
+            v, it = work[-1]
+            w = next(it, None)
+            if w is None:
+                state[v] = 2
+                work.pop()
+            elif state.get(w) == 1:
+                back.append((v, w))
+            elif w not in state:
+                state[w] = 1
+                work.append((w, iter([x for x in succ.get(w, ()) if x in members])))
+    return back
+
+
+def analyze_graph(quests: List[dict], edges: list, drop_cycles: bool = False) -> dict:
+    """
+    Analyse les prérequis positifs des quêtes (modifie `quests` et `edges` sur place) :
+      - q["depth"]                     profondeur topologique (0 = racine)
+      - q["redundant_prerequisites"]   prérequis impliqués transitivement (si non vide)
+      - drop_cycles : retire de q["prerequisites"] et de `edges` les arêtes fermant un cycle
+    Retourne le résumé écrit dans la sortie (clé "graph").
+    """
+    ids = [q["id"] for q in quests]
+    order = {qid: i for i, qid in enumerate(ids)}
+    by_id = {q["id"]: q for q in quests}
+    succ: Dict[str, List[str]] = {qid: [] for qid in ids}
+    for q in quests:
+        for src in q.get("prerequisites") or []:
+            if src in succ and src != q["id"]:
+                succ[src].append(q["id"])
+
+    comps = strongly_connected_components(ids, succ)
+    cycles = [sorted(c, key=order.__getitem__) for c in comps if len(c) > 1]
+    cycles.sort(key=lambda c: order[c[0]])
+
+    dropped: List[Tuple[str, str]] = []
+    if drop_cycles and cycles:
+        for comp in cycles:
+            dropped.extend(_cycle_closing_edges(comp, succ, order))
+        gone = set(dropped)
+        for src, tgt in dropped:
+            by_id[tgt]["prerequisites"].remove(src)
+            succ[src].remove(tgt)
+        edges[:] = [e for e in edges if e[2] or (e[0], e[1]) not in gone]
+        comps = strongly_connected_components(ids, succ)
+
+    # Graphe condensé (une composante = un nœud), en ordre topologique
+    comps.reverse()
+    comp_of = {qid: ci for ci, comp in enumerate(comps) for qid in comp}
+    csucc: List[Set[int]] = [set() for _ in comps]
+    for v, ws in succ.items():
+        for w in ws:
+            if comp_of[v] != comp_of[w]:
+                csucc[comp_of[v]].add(comp_of[w])
+
+    # Profondeur : plus long chemin depuis une racine
+    cdepth = [0] * len(comps)
+    for ci in range(len(comps)):
+        for cj in csucc[ci]:
+            cdepth[cj] = max(cdepth[cj], cdepth[ci] + 1)
+
+    # Atteignabilité en bitsets (entiers Python), en ordre topologique inverse
+    reach = [0] * len(comps)
+    for ci in range(len(comps) - 1, -1, -1):
+        r = 0
+        for cj in csucc[ci]:
+            r |= reach[cj] | (1 << cj)
+        reach[ci] = r
+
+    redundant = 0
+    for q in quests:
+        q["depth"] = cdepth[comp_of[q["id"]]]
+        cq = comp_of[q["id"]]
+        # prérequis (hors composante de q) déjà impliqués par un autre prérequis de q
+        srcs = [s for s in q.get("prerequisites") or [] if s in comp_of and comp_of[s] != cq]
+        # seul un prérequis obligatoire rend un autre redondant : une alternative sous '||'
+        # peut être remplie sans passer par s (A || B avec A -> ... -> B : A reste un chemin)
+        alternatives = set(q.get("alternative_prerequisites") or ())
+        required = [o for o in srcs if o not in alternatives]
+        extra = []
+        for s in srcs:
+            cs = comp_of[s]
+            if any(comp_of[o] != cs and (reach[cs] >> comp_of[o]) & 1 for o in required if o != s):
+                # s précède déjà un prérequis obligatoire de q : s -> ... -> o -> q
+                extra.append(s)
+        if extra:
+            q["redundant_prerequisites"] = extra
+            redundant += len(extra)
+        else:
+            q.pop("redundant_prerequisites", None)
+
+    return {
+        "cycles": cycles,
+        "dropped_cycle_edges": [list(e) for e in dropped],
+        "redundant_edge_count": redundant,
+        "max_depth": max(cdepth, default=0),
+    }
+
+
+def format_summary(summary: dict, limit: int = 5) -> List[str]:
+    lines = []
+    cycles = summary["cycles"]
+    if cycles:
+        lines.append(f"[WARN] {len(cycles)} cycle(s) de prérequis détecté(s)"
+                     + (f", {len(summary['dropped_cycle_edges'])} arête(s) retirée(s) (--drop-cycles)"
+                        if summary["dropped_cycle_edges"] else " (utiliser --drop-cycles pour les casser)"))
+        for c in cycles[:limit]:
+            lines.append(f"       - {' -> '.join(c[:6])}{' …' if len(c) > 6 else ''} ({len(c)} quêtes)")
+    lines.append(f"[OK] Graphe: {summary['redundant_edge_count']} arête(s) redondante(s) (réduction transitive), "
+                 f"profondeur max {summary['max_depth']}")
+    return lines
@@ -0,0 +1,467 @@
+# Layout précalculé de la carte (utilisé par convert_csv_to_json.py)
+#
+# Reprend côté Python ce que fait src/components/Graph.tsx au chargement :
+#   - nœuds LEVEL_XX + arêtes (quêtes sans prérequis mais avec niveau requis, chaînage des niveaux)
+#   - priorités / bandes (mêmes règles que computePriority / bandFrom + MSQ "après niveau")
+#   - layout en couches (équivalent simplifié d'ELK 'layered' : cassage de cycles,
+#     couches, ordre barycentrique, placement par médianes)
+#   - post-traitements (alignement parent→enfant, chaînes 1→1, empilement des bandes,
+#     rangée des LEVEL)
+# Le front applique ces positions telles quelles pour les vues par défaut (LR/TB, toutes
+# zones ou une zone) et ne relance ELK que si la vue n'est pas dans le fichier.
+import bisect
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# mêmes constantes que Graph.tsx
+DEFAULT_RANKSEP = 160   # LR: horizontal | TB: vertical
+DEFAULT_NODESEP = 170   # LR: vertical   | TB: horizontal
+NODE_WIDTH = 240
+EST_NODE_BASE_H = 160
+EST_LINE_H = 16
+SIBLING_STEP = 250
+BAND_GAP = 100
+EDGE_SPACING = 20       # épaisseur d'un point de passage d'arête longue (elk.spacing.edgeNode)
+ORDER_SWEEPS = 8
+PLACE_SWEEPS = 4
+
+DIRECTIONS = ('LR', 'TB')
+
+
+def _js_len(s: str) -> int:
+    # String.length côté JS = unités UTF-16
+    return len(s.encode('utf-16-le')) // 2
+
+
+def _locale_key(s: str):
+    # approximation de String.localeCompare (insensible à la casse au 1er niveau)
+    return (s.casefold(), s)
+
+
+def estimate_node_height(data: dict) -> float:
+    """Hauteur estimée d'une carte (cf. estimateNodeHeight)."""
+    title = str(data.get('title') or '')
+    desc = str(data.get('description') or '')
+    extra_title = max(0, _js_len(title) - 28) * 0.6
+    desc_lines = -(-_js_len(desc) // 90)
+    h = EST_NODE_BASE_H + desc_lines * EST_LINE_H + extra_title
+    return max(EST_NODE_BASE_H, min(360, h))
+
+
+def compute_priority(qtype: Optional[str], qid: str) -> int:
+    t = (qtype or '').lower()
+    if qid.startswith('LEVEL_'): return 7
+    if 'main story' in t: return 10
+    if 'objective' in t: return 9
+    if 'journey' in t: return 8
+    if 'skill progression' in t: return 6
+    if 'season quest' in t: return 5
+    if 'faction story' in t: return 4
+    if 'mount unlock' in t: return 3
+    if 'mount race' in t: return 2
+    if 'event' in t: return 1
+    return 0
+
+
+def band_from(qtype: Optional[str], qid: str, reachable_from_level: bool,
+              reachable_from_msq: bool, req_level: int) -> int:
+    t = (qtype or '').lower()
+    is_msq = 'main story' in t
+    if qid.startswith('LEVEL_'):
+        return 90
+    if is_msq and req_level > 0 and not reachable_from_msq:
+        return 89
+    if is_msq:
+        return 100
+    if reachable_from_msq:
+        return 95
+    if reachable_from_level:
+        return 89
+    p = compute_priority(qtype, qid)
+    return p * 10 - 20 if p > 0 else 0
+
+
+# ---------- Vue (nœuds + arêtes) telle que construite par Graph.tsx ----------
+def build_view(quests: List[dict], manual_levels: Dict[str, int], zone: Optional[str] = None):
+    """
+    Nœuds (dicts de données, quêtes puis LEVEL_XX) et arêtes positives (id, source, target)
+    pour la zone `zone` (None = toutes).
+    """
+    nodes: List[dict] = []
+    for q in quests:
+        if zone is not None and str(q.get('zone_id')) != zone:
+            continue
+        n = dict(q)
+        n['required_level'] = q.get('required_level') or manual_levels.get(q['id']) or 0
+        nodes.append(n)
+
+    level_parents: Dict[int, List[str]] = {}
+    for n in nodes:
+        has_prereq = bool(n.get('prerequisites')) or bool(n.get('not_prerequisites'))
+        if not has_prereq and (n['required_level'] or 0) > 0:
+            level_parents.setdefault(int(n['required_level']), []).append(n['id'])
+    levels = sorted(level_parents)  # Object.keys() : clés numériques triées
+    for lvl in levels:
+        nodes.append({'id': f'LEVEL_{lvl}', 'title': f'Level {lvl}', 'type': 'Level',
+                      'description': f'Atteindre le niveau {lvl}', 'required_level': lvl})
+
+    ids = {n['id'] for n in nodes if not n['id'].startswith('LEVEL_')}
+    edges: List[Tuple[str, str, str]] = []
+    for n in nodes:
+        # vue complète : arêtes redondantes (réduction transitive) non dessinées ; en vue
+        # par zone le chemin intermédiaire peut être filtré, on les garde
+        skip = set(n.get('redundant_prerequisites') or ()) if zone is None else set()
+        for src in n.get('prerequisites') or []:
+            if src in ids and src != n['id'] and src not in skip:
+                edges.append((f"{src}->{n['id']}", src, n['id']))
+    for lvl in levels:
+        for t in level_parents[lvl]:
+            edges.append((f'LEVEL_{lvl}->{t}', f'LEVEL_{lvl}', t))
+    for a, b in zip(levels, levels[1:]):
+        edges.append((f'LEVEL_{a}->LEVEL_{b}', f'LEVEL_{a}', f'LEVEL_{b}'))
+    return nodes, edges
+
+
+def _reach(succ: Dict[str, List[str]], roots: Iterable[str], skip_level: bool) -> set:
+    seen: set = set()
+    queue = list(roots)
+    for cur in queue:
+        for to in succ.get(cur, ()):
+            if to not in seen and not (skip_level and to.startswith('LEVEL_')):
+                seen.add(to)
+                queue.append(to)
+    return seen
+
+
+def assign_bands(nodes: List[dict], edges: List[Tuple[str, str, str]]) -> Tuple[Dict[str, int], Dict[str, int]]:
+    """(priorité, bande) par nœud, selon computePriority / bandFrom + MSQ après niveau."""
+    succ: Dict[str, List[str]] = {}
+    for _, s, t in edges:
+        succ.setdefault(s, []).append(t)
+    is_msq = {n['id']: 'main story' in str(n.get('type') or '').lower() for n in nodes}
+    from_msq = _reach(succ, [i for i, m in is_msq.items() if m], skip_level=True)
+    from_level = _reach(succ, [n['id'] for n in nodes if n['id'].startswith('LEVEL_')], skip_level=True)
+
+    prio, band = {}, {}
+    for n in nodes:
+        nid, req = n['id'], int(n.get('required_level') or 0)
+        prio[nid] = compute_priority(n.get('type'), nid)
+        band[nid] = band_from(n.get('type'), nid, nid in from_level, nid in from_msq, req)
+
+    level_roots = [n['id'] for n in nodes
+                   if is_msq[n['id']] and int(n.get('required_level') or 0) > 0 and n['id'] not in from_msq]
+    after_level = _reach(succ, level_roots, skip_level=False)
+    for nid, m in is_msq.items():
+        if m and nid in after_level:
+            band[nid] = 89
+    return prio, band
+
+
+# ---------- Layout en couches ----------
+def _count_crossings(upper_pos: Dict[str, int], lower_pos: Dict[str, int],
+                     pairs: List[Tuple[str, str]]) -> int:
+    seq = sorted((upper_pos[u], lower_pos[v]) for u, v in pairs)
+    seen: List[int] = []
+    crossings = 0
+    for _, lp in seq:
+        crossings += len(seen) - bisect.bisect_right(seen, lp)
+        bisect.insort(seen, lp)
+    return crossings
+
+
+def layered_layout(order: List[str], sizes: Dict[str, Tuple[float, float]],
+                   edges: List[Tuple[str, str]], horizontal: bool) -> Dict[str, Tuple[float, float]]:
+    """
+    Positions (coin haut-gauche) d'un graphe orienté, en couches dans la direction du flux.
+    `order` et `edges` donnent l'ordre du modèle (départage à égalité, comme considerModelOrder).
+    """
+    rank = {nid: i for i, nid in enumerate(order)}
+    out: Dict[str, List[str]] = {nid: [] for nid in order}
+    pairs = list(dict.fromkeys((s, t) for s, t in edges if s != t and s in rank and t in rank))
+
+    # 1) cassage de cycles : DFS dans l'ordre du modèle, arêtes retour inversées
+    adj: Dict[str, List[str]] = {nid: [] for nid in order}
+    for s, t in pairs:
+        adj[s].append(t)
+    state: Dict[str, int] = {}
+    reversed_edges = set()
+    for root in order:
+        if root in state:
+            continue
+        state[root] = 1
+        stack = [(root, iter(adj[root]))]
+        while stack:
+            nid, it = stack[-1]
+            nxt = next(it, None)
+            if nxt is None:
+                state[nid] = 2
+                stack.pop()
+            elif state.get(nxt) == 1:
+                reversed_edges.add((nid, nxt))
+            elif nxt not in state:
+                state[nxt] = 1
+                stack.append((nxt, iter(adj[nxt])))
+    dag = list(dict.fromkeys((t, s) if (s, t) in reversed_edges else (s, t) for s, t in pairs))
+    preds: Dict[str, List[str]] = {nid: [] for nid in order}
+    for s, t in dag:
+        out[s].append(t)
+        preds[t].append(s)
+
+    # 2) couches : plus long chemin, puis racines rapprochées de leurs successeurs
+    indeg = {nid: len(preds[nid]) for nid in order}
+    topo = [nid for nid in order if indeg[nid] == 0]
+    for nid in topo:
+        for t in out[nid]:
+            indeg[t] -= 1
+            if indeg[t] == 0:
+                topo.append(t)
+    layer: Dict[str, int] = {}
+    for nid in topo:
+        layer[nid] = max((layer[p] + 1 for p in preds[nid]), default=0)
+    for nid in reversed(topo):
+        if not preds[nid] and out[nid]:
+            layer[nid] = min(layer[t] for t in out[nid]) - 1
+    low = min(layer.values(), default=0)
+    for nid in layer:
+        layer[nid] -= low
+    nlayers = max(layer.values(), default=-1) + 1
+
+    # 3) points de passage pour les arêtes qui sautent des couches
+    layers: List[List[str]] = [[] for _ in range(nlayers)]
+    for nid in order:
+        layers[layer[nid]].append(nid)
+    down: Dict[str, List[str]] = {nid: [] for nid in order}
+    up: Dict[str, List[str]] = {nid: [] for nid in order}
+    dummy_size: Dict[str, float] = {}
+    for k, (s, t) in enumerate(dag):
+        prev = s
+        for li in range(layer[s] + 1, layer[t]):
+            d = f'\x00{k}:{li}'
+            dummy_size[d] = EDGE_SPACING
+            layers[li].append(d)
+            down[d], up[d] = [], []
+            down[prev].append(d)
+            up[d].append(prev)
+            prev = d
+        down[prev].append(t)
+        up[t].append(prev)
+
+    # 4) ordre dans les couches : barycentres (balayages descendants / montants)
+    pos: Dict[str, int] = {}
+    for lay in layers:
+        for i, nid in enumerate(lay):
+            pos[nid] = i
+
+    def total_crossings() -> int:
+        return sum(_count_crossings(pos, pos, [(u, v) for u in layers[li] for v in down[u]])
+                   for li in range(nlayers - 1))
+
+    def sweep(downward: bool):
+        rng = range(1, nlayers) if downward else range(nlayers - 2, -1, -1)
+        for li in rng:
+            lay = layers[li]
+            nbrs = up if downward else down
+            def key(nid):
+                ns = nbrs[nid]
+                bary = sum(pos[x] for x in ns) / len(ns) if ns else pos[nid]
+                return (bary, pos[nid])
+            lay.sort(key=key)
+            for i, nid in enumerate(lay):
+                pos[nid] = i
+
+    best = total_crossings()
+    best_layers = [list(lay) for lay in layers]
+    for i in range(ORDER_SWEEPS):
+        if best == 0:
+            break
+        sweep(downward=(i % 2 == 0))
+        c = total_crossings()
+        if c < best:
+            best, best_layers = c, [list(lay) for lay in layers]
+    layers = best_layers
+
+    # 5) coordonnée dans la couche : médiane des voisins, sans chevauchement
+    def thick(nid):  # épaisseur dans l'axe de la couche
+        if nid in dummy_size:
+            return dummy_size[nid]
+        w, h = sizes[nid]
+        return h if horizontal else w
+
+    def gap(a, b):
+        return EDGE_SPACING if (a in dummy_size or b in dummy_size) else DEFAULT_NODESEP
+
+    coord: Dict[str, float] = {}
+    for lay in layers:
+        c = 0.0
+        for i, nid in enumerate(lay):
+            if i:
+                c += thick(lay[i - 1]) + gap(lay[i - 1], nid)
+            coord[nid] = c
+
+    def place(lay, nbrs):
+        want = []
+        for nid in lay:
+            ns = sorted(coord[x] + thick(x) / 2 for x in nbrs[nid])
+            want.append(ns[len(ns) // 2] - thick(nid) / 2 if ns else coord[nid])
+        for i, nid in enumerate(lay):
+            c = want[i]
+            if i:
+                prev = lay[i - 1]
+                c = max(c, coord[prev] + thick(prev) + gap(prev, nid))
+            coord[nid] = c
+
+    for i in range(PLACE_SWEEPS):
+        if i % 2 == 0:
+            for li in range(1, nlayers):
+                place(layers[li], up)
+        else:
+            for li in range(nlayers - 2, -1, -1):
+                place(layers[li], down)
+    low = min(coord.values(), default=0.0)
+
+    # 6) coordonnée de couche
+    result: Dict[str, Tuple[float, float]] = {}
+    offset = 0.0
+    for lay in layers:
+        real = [nid for nid in lay if nid not in dummy_size]
+        depth = max(((sizes[n][0] if horizontal else sizes[n][1]) for n in real), default=0.0)
+        for nid in real:
+            c = coord[nid] - low
+            result[nid] = (offset, c) if horizontal else (c, offset)
+        offset += depth + DEFAULT_RANKSEP
+    return result
+
+
+# ---------- Post-traitements (identiques à Graph.tsx) ----------
+def post_process(nodes: List[dict], edges: List[Tuple[str, str, str]], positions: Dict[str, list],
+                 prio: Dict[str, int], band: Dict[str, int], heights: Dict[str, float]):
+    children: Dict[str, List[str]] = {}
+    indeg: Dict[str, int] = {}
+    outdeg: Dict[str, int] = {}
+    for _, s, t in edges:
+        if s.startswith('LEVEL_'):
+            continue
+        children.setdefault(s, []).append(t)
+        indeg[t] = indeg.get(t, 0) + 1
+        outdeg[s] = outdeg.get(s, 0) + 1
+    for k in children:
+        children[k].sort(key=lambda c: (prio.get(c, 1), _locale_key(c)))
+
+    ordered = sorted((n['id'] for n in nodes), key=lambda nid: positions[nid][0])
+    seen = set()
+
+    def align_from_parent(nid: str):
+        # itératif : seule la descendance du 1er enfant est suivie (cf. alignFromParent)
+        while nid not in seen:
+            seen.add(nid)
+            if nid.startswith('LEVEL_'):
+                return
+            kids = [k for k in children.get(nid, ()) if band.get(k, 0) == band.get(nid, 0)]
+            if not kids:
+                return
+            py = positions[nid][1]
+            positions[kids[0]][1] = py
+            for i, k in enumerate(kids[1:], start=1):
+                positions[k][1] = py + i * SIBLING_STEP
+            nid = kids[0]
+
+    for nid in ordered:
+        align_from_parent(nid)
+
+    # chaînes 1→1 redressées
+    visited = set()
+    for nid in ordered:
+        if nid in visited or outdeg.get(nid, 0) != 1 or indeg.get(nid, 0) == 1:
+            continue
+        b = band.get(nid, 0)
+        chain, cur = [nid], nid
+        while True:
+            k = (children.get(cur) or [None])[0]
+            if not k or indeg.get(k, 0) != 1 or outdeg.get(k, 0) > 1 or band.get(k, 0) != b:
+                break
+            chain.append(k)
+            cur = k
+        if len(chain) > 1:
+            base_y = positions[chain[0]][1]
+            for cid in chain:
+                visited.add(cid)
+                positions[cid][1] = base_y
+
+    # empilement des bandes (la plus haute en haut)
+    by_band: Dict[int, List[str]] = {}
+    for nid in ordered:
+        by_band.setdefault(band.get(nid, 0), []).append(nid)
+    top_ids = by_band.get(100) or ordered
+    cursor_y = min(positions[i][1] for i in top_ids)
+    for b in sorted(by_band, reverse=True):
+        ids = by_band[b]
+        min_y = min(positions[i][1] for i in ids)
+        dy = cursor_y - min_y
+        if abs(dy) > 0.5:
+            for i in ids:
+                positions[i][1] += dy
+        for i in ids:
+            align_from_parent(i)
+        cursor_y = max(positions[i][1] + heights[i] for i in ids) + BAND_GAP
+
+    level_ids = [i for i in ordered if i.startswith('LEVEL_')]
+    if level_ids:
+        y_levels = min(positions[i][1] for i in level_ids)
+        for i in level_ids:
+            positions[i][1] = y_levels
+
+
+def layout_view(quests: List[dict], manual_levels: Dict[str, int], direction: str = 'LR',
+                zone: Optional[str] = None) -> Dict[str, list]:
+    """{id: [x, y, bande, priorité]} pour une vue (direction + zone)."""
+    nodes, edges = build_view(quests, manual_levels, zone)
+    if not nodes:
+        return {}
+    prio, band = assign_bands(nodes, edges)
+    heights = {n['id']: estimate_node_height(n) for n in nodes}
+    order = sorted((n['id'] for n in nodes), key=lambda nid: (-prio[nid], _locale_key(nid)))
+    edge_order = sorted(edges, key=lambda e: (-prio.get(e[1], 0), _locale_key(e[0])))
+    laid = layered_layout(order, {nid: (NODE_WIDTH, h) for nid, h in heights.items()},
+                          [(s, t) for _, s, t in edge_order], horizontal=(direction == 'LR'))
+    positions = {nid: list(laid[nid]) for nid in (n['id'] for n in nodes)}
+    post_process(nodes, edges, positions, prio, band, heights)
+    return {nid: [round(x), round(y), band[nid], prio[nid]] for nid, (x, y) in positions.items()}
+
+
+def view_signature(quests: List[dict], manual_levels: Dict[str, int], zone: Optional[str] = None) -> tuple:
+    """Tout ce que lit layout_view() pour une vue : deux signatures égales donnent le même layout."""
+    sig = []
+    for q in quests:
+        if zone is not None and str(q.get('zone_id')) != zone:
+            continue
+        sig.append((q['id'], q.get('title'), q.get('description'), q.get('type'),
+                    q.get('required_level') or manual_levels.get(q['id']) or 0,
+                    tuple(q.get('prerequisites') or ()), bool(q.get('not_prerequisites')),
+                    tuple(q.get('redundant_prerequisites') or ()) if zone is None else ()))
+    return tuple(sig)
+
+
+def compute_layouts(quests: List[dict], manual_levels: Dict[str, int],
+                    directions: Iterable[str] = DIRECTIONS,
+                    memo: Optional[Dict[tuple, tuple]] = None) -> Dict[str, Dict[str, dict]]:
+    """
+    Layouts des vues par défaut : {direction: {'all' | zone_id: {id: [x, y, bande, priorité]}}}.
+    Les clés de zone sont String(zone_id), comme le filtre du front.
+    `memo` ((direction, vue) -> (signature, layout)) : une vue dont la signature n'a pas
+    changé depuis l'appel précédent est reprise telle quelle (rebuilds de --watch).
+    """
+    zones = sorted({q.get('zone_id') for q in quests if q.get('zone_id') is not None})
+    keys = [('all', None)] + [(str(z), str(z)) for z in zones]
+    sigs = {key: view_signature(quests, manual_levels, zone) for key, zone in keys} if memo is not None else {}
+    out: Dict[str, Dict[str, dict]] = {}
+    for d in directions:
+        views = {}
+        for key, zone in keys:
+            hit = memo.get((d, key)) if memo is not None else None
+            if hit is not None and hit[0] == sigs[key]:
+                views[key] = hit[1]
+                continue
+            views[key] = layout_view(quests, manual_levels, d, zone)
+            if memo is not None:
+                memo[(d, key)] = (sigs[key], views[key])
+        out[d] = views
+    return out
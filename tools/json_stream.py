@@ -0,0 +1,163 @@
+# Lecture en flux des gros fichiers JSON du jeu, sans construire l'arbre complet
+#
+# Les javelindata_* sont des tableaux d'objets, les locales un objet plat clé -> texte.
+# Le fichier est lu par blocs ; les éléments complets d'un bloc sont décodés ensemble
+# (json.loads jusqu'à la dernière virgule qui termine un élément) puis réduits aux champs
+# utiles et éventuellement filtrés : la mémoire reste celle d'un bloc + du résultat
+# projeté, quelle que soit la taille du fichier. Quand la coupure tombe mal (virgule
+# dans une valeur imbriquée, élément plus gros qu'un bloc), on repasse élément par
+# élément (raw_decode) jusqu'à la dépasser.
+import json, re
+from typing import Any, Iterable, Iterator, Optional, Tuple
+
+CHUNK_SIZE = 1 << 20  # caractères lus par bloc
+_WS = re.compile(r'[ \t\n\r]*')
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """Tampon glissant sur un fichier texte : caractères de structure + valeurs JSON complètes."""
+
+    def __init__(self, f, chunk_size: int = CHUNK_SIZE):
+        self.f = f
+        self.chunk_size = chunk_size
+        self.buf = ''
+        self.pos = 0
+        self.eof = False
+        self.slow_until = 0  # pas de décodage groupé avant cette position (coupure ratée)
+
+    def _fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.f.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buf = self.buf[self.pos:] + chunk
+        self.slow_until = max(0, self.slow_until - self.pos)
+        self.pos = 0
+        return True
+
+    def peek(self) -> Optional[str]:
+        """Prochain caractère hors blancs (None en fin de fichier)."""
+        while True:
+            pos = self.pos = _WS.match(self.buf, self.pos).end()
+            if pos < len(self.buf):
+                return self.buf[pos]
+            if not self._fill():
+                return None
+
+    def expect(self, chars: str) -> str:
+        c = self.peek()
+        if c is None or c not in chars:
+            raise ValueError(f"JSON invalide : attendu {' ou '.join(repr(x) for x in chars)}, "
+                             f"trouvé {c!r}")
+        self.pos += 1
+        return c
+
+    def value(self) -> Any:
+        """Décode la valeur suivante, en relisant un bloc tant qu'elle est tronquée."""
+        self.peek()
+        while True:
+            try:
+                obj, end = _decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # un nombre en fin de tampon peut continuer dans le bloc suivant ("1" | ".5")
+            if not self.eof and (end == len(self.buf) or self.buf[end] in '.eE+-0123456789') \
+                    and self._fill():
+                continue
+            self.pos = end
+            return obj
+
+    def batch(self, closing: str, wrap: str) -> Optional[Any]:
+        """
+        Décode d'un coup les éléments du tampon jusqu'à la dernière virgule précédée de
+        `closing` ('}' : fin d'objet, '"' : fin de texte non échappée), entourés de
+        `wrap` ('[]' ou '{}'). None s'il n'y a pas de coupure sûre.
+        """
+        buf, start = self.buf, self.pos
+        if start < self.slow_until:
+            return None
+        end = len(buf)
+        for _ in range(16):
+            i = buf.rfind(',', start, end)
+            if i < 0:
+                return None
+            end = i
+            j = _last_non_ws(buf, start, i)
+            if j < 0 or buf[j] != closing:
+                continue
+            if closing == '"':
+                k = j
+                while k > start and buf[k - 1] == '\\':
+                    k -= 1
+                if (j - k) % 2:
+                    continue  # guillemet échappé : la virgule est dans le texte
+            try:
+                obj = json.loads(wrap[0] + buf[start:i] + wrap[1])
+            except ValueError:
+                self.slow_until = i + 1
+                return None
+            self.pos = i + 1
+            return obj
+        return None
+
+
+def _last_non_ws(buf: str, start: int, i: int) -> int:
+    j = i - 1
+    while j >= start and buf[j] in ' \t\n\r':
+        j -= 1
+    return j
+
+
+def iter_array(path: str, fields: Optional[Iterable[str]] = None,
+               chunk_size: int = CHUNK_SIZE) -> Iterator[dict]:
+    """
+    Objets d'un fichier dont la racine est un tableau, réduits à `fields` (clé absente
+    -> None, comme rec.get). Rien si la racine n'est pas un tableau ; les éléments qui
+    ne sont pas des objets sont ignorés.
+    """
+    fields = tuple(fields) if fields is not None else None
+    with open(path, 'r', encoding='utf-8') as f:
+        r = _Reader(f, chunk_size)
+        if r.peek() != '[':
+            return
+        r.pos += 1
+        if r.peek() == ']':
+            return
+        while True:
+            recs = r.batch('}', '[]')
+            if recs is None:
+                recs = [r.value()]
+                last = r.expect(',]') == ']'
+            else:
+                last = False
+            for rec in recs:
+                if isinstance(rec, dict):
+                    yield rec if fields is None else {k: rec.get(k) for k in fields}
+            if last:
+                return
+
+
+def iter_object_items(path: str, chunk_size: int = CHUNK_SIZE) -> Iterator[Tuple[str, Any]]:
+    """Paires (clé, valeur) d'un fichier dont la racine est un objet (ex. locale), dans l'ordre du fichier."""
+    with open(path, 'r', encoding='utf-8') as f:
+        r = _Reader(f, chunk_size)
+        r.expect('{')
+        if r.peek() == '}':
+            return
+        while True:
+            part = r.batch('"', '{}')
+            if part is not None:
+                yield from part.items()
+                continue
+            key = r.value()
+            if not isinstance(key, str):
+                raise ValueError(f"JSON invalide : clé attendue, trouvé {key!r}")
+            r.expect(':')
+            yield key, r.value()
+            if r.expect(',}') == '}':
+                return
@@ -0,0 +1,168 @@
+# Écriture de public/data/quests.json et de ses variantes (utilisé par convert_csv_to_json.py)
+#
+#  - JSON indenté (défaut, lisible / diffable) ou minifié (--minify)
+#  - frères pré-compressés quests.json.gz / quests.json.br, servis tels quels par un
+#    hébergeur statique (nginx gzip_static / brotli_static, Netlify, etc.)
+#  - variante binaire optionnelle quests.msgpack / quests.cbor
+#  - tables de chaînes partagées (--intern, cf. string_tables.py) pour toutes ces variantes
+#
+# brotli, msgpack et cbor2 sont optionnels : si le module manque on saute la variante
+# avec un [WARN] au lieu d'échouer.
+import os, json, gzip, time
+from typing import Any, Callable, List, Optional, Tuple
+
+from string_tables import encode_interned
+
+BINARY_FORMATS = ('msgpack', 'cbor')
+
+
+def encode_json(data: Any, minify: bool = False) -> bytes:
+    if minify:
+        return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return json.dumps(data, ensure_ascii=False, indent=2).encode('utf-8')
+
+
+def write_atomic(path: str, payload: bytes):
+    """Écrit via un fichier temporaire + rename : un lecteur ne voit jamais de fichier partiel."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp = path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(payload)
+    os.replace(tmp, path)
+
+
+def _gzip(raw: bytes) -> bytes:
+    # mtime=0 : sortie reproductible d'un build à l'autre
+    return gzip.compress(raw, compresslevel=9, mtime=0)
+
+
+def _brotli() -> Optional[Any]:
+    try:
+        import brotli  # type: ignore
+        return brotli
+    except ImportError:
+        return None
+
+
+def _binary_codec(fmt: str) -> Optional[Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]]:
+    """(encode, decode) pour msgpack/cbor, ou None si la lib n'est pas installée."""
+    try:
+        if fmt == 'msgpack':
+            import msgpack  # type: ignore
+            return (lambda d: msgpack.packb(d, use_bin_type=True),
+                    lambda b: msgpack.unpackb(b, raw=False, strict_map_key=False))
+        if fmt == 'cbor':
+            import cbor2  # type: ignore
+            return cbor2.dumps, cbor2.loads
+    except ImportError:
+        return None
+    raise ValueError(f"format binaire inconnu: {fmt}")
+
+
+def write_outputs(data: Any, out_path: str, minify: bool = False, gz: bool = False, br: bool = False,
+                  binary: Optional[str] = None, raw: Optional[bytes] = None, intern: bool = False) -> List[dict]:
+    """
+    Écrit out_path et les variantes demandées.
+    Retourne [{format, path, bytes, decode}] ; `decode` (bytes -> objet) sert au rapport.
+    `raw` : encodage JSON de data déjà calculé (évite de le refaire).
+    `intern` : sortie de build_quests écrite avec ses tables de chaînes (ignoré si `raw`).
+    """
+    if intern and raw is None:
+        data = encode_interned(data)
+    if raw is None:
+        raw = encode_json(data, minify)
+    write_atomic(out_path, raw)
+    written = [{'format': 'json (minifié)' if minify else 'json (indenté)', 'path': out_path,
+                'bytes': len(raw), 'decode': lambda b: json.loads(b)}]
+
+    if gz:
+        payload = _gzip(raw)
+        write_atomic(out_path + '.gz', payload)
+        written.append({'format': 'json.gz', 'path': out_path + '.gz', 'bytes': len(payload),
+                        'decode': lambda b: json.loads(gzip.decompress(b))})
+    if br:
+        brotli = _brotli()
+        if brotli is None:
+            print("[WARN] --brotli : module 'brotli' absent (pip install brotli) — .br non généré")
+        else:
+            payload = brotli.compress(raw, quality=11)
+            write_atomic(out_path + '.br', payload)
+            written.append({'format': 'json.br', 'path': out_path + '.br', 'bytes': len(payload),
+                            'decode': lambda b: json.loads(brotli.decompress(b))})
+    if binary:
+        codec = _binary_codec(binary)
+        if codec is None:
+            lib = 'msgpack' if binary == 'msgpack' else 'cbor2'
+            print(f"[WARN] --binary {binary} : module '{lib}' absent (pip install {lib}) — variante ignorée")
+        else:
+            encode, decode = codec
+            payload = encode(data)
+            path = os.path.splitext(out_path)[0] + '.' + binary
+            write_atomic(path, payload)
+            written.append({'format': binary, 'path': path, 'bytes': len(payload), 'decode': decode})
+
+    remove_stale_variants(out_path, written)
+    return written
+
+
+def remove_stale_variants(out_path: str, written: List[dict]):
+    # variantes d'un build précédent non regénérées : on les retire, sinon l'hébergeur
+    # servirait un .gz/.br périmé à la place du JSON à jour
+    stale = [out_path + '.gz', out_path + '.br'] + [os.path.splitext(out_path)[0] + '.' + b for b in BINARY_FORMATS]
+    current = {w['path'] for w in written}
+    for path in stale:
+        if path not in current and os.path.isfile(path):
+            os.remove(path)
+            print(f"[INFO] Variante périmée supprimée: {path}")
+
+
+def compress_file_variants(out_path: str, gz: bool = False, br: bool = False,
+                           block: int = 1 << 20) -> List[dict]:
+    """
+    .gz / .br d'un fichier déjà écrit (sortie --stream), compressés par blocs : mémoire
+    bornée quelle que soit la taille du JSON. Même retour que write_outputs.
+    """
+    size = os.path.getsize(out_path)
+    written = [{'format': 'json', 'path': out_path, 'bytes': size, 'decode': lambda b: json.loads(b)}]
+    brotli = _brotli() if br else None
+    if br and brotli is None:
+        print("[WARN] --brotli : module 'brotli' absent (pip install brotli) — .br non généré")
+    targets = []
+    if gz:
+        targets.append(('json.gz', out_path + '.gz', lambda b: json.loads(gzip.decompress(b))))
+    if brotli is not None:
+        targets.append(('json.br', out_path + '.br', lambda b: json.loads(brotli.decompress(b))))
+    for fmt, path, decode in targets:
+        tmp = path + '.tmp'
+        with open(out_path, 'rb') as src, open(tmp, 'wb') as dst:
+            if fmt == 'json.gz':
+                # mtime=0 et pas de nom de fichier : sortie reproductible, comme _gzip
+                with gzip.GzipFile(filename='', mode='wb', fileobj=dst, compresslevel=9, mtime=0) as z:
+                    for chunk in iter(lambda: src.read(block), b''):
+                        z.write(chunk)
+            else:
+                comp = brotli.Compressor(quality=11)
+                for chunk in iter(lambda: src.read(block), b''):
+                    dst.write(comp.process(chunk))
+                dst.write(comp.finish())
+        os.replace(tmp, path)
+        written.append({'format': fmt, 'path': path, 'bytes': os.path.getsize(path), 'decode': decode})
+    remove_stale_variants(out_path, written)
+    return written
+
+
+def format_report(written: List[dict], repeat: int = 3) -> str:
+    """Tableau taille / temps de décodage (meilleur de `repeat`) pour chaque fichier écrit."""
+    base = written[0]['bytes'] if written else 0
+    lines = [f"{'format':<16} {'octets':>12} {'ratio':>7} {'décodage':>10}  fichier"]
+    for w in written:
+        with open(w['path'], 'rb') as f:
+            payload = f.read()
+        best = float('inf')
+        for _ in range(max(1, repeat)):
+            t0 = time.perf_counter()
+            w['decode'](payload)
+            best = min(best, time.perf_counter() - t0)
+        ratio = f"{w['bytes'] / base:.1%}" if base else '-'
+        lines.append(f"{w['format']:<16} {w['bytes']:>12,} {ratio:>7} {best * 1000:>8.1f} ms  {w['path']}")
+    return "\n".join(lines)
@@ -0,0 +1,155 @@
+# Instrumentation par phase du convertisseur (--profile)
+#
+# Pour chaque phase : temps réel, RSS max du processus à la fin de la phase, pic et solde
+# des allocations Python de la phase (tracemalloc) avec les lignes qui retiennent le plus,
+# plus un débit (éléments/s) quand la phase déclare un nombre d'éléments traités.
+# Désactivé, PhaseProfiler.phase() ne coûte qu'un context manager vide.
+#
+# tracemalloc n'est actif que pendant chaque phase (start/snapshot/stop) : analyser un
+# snapshot pendant que le traçage tourne est ~10x plus lent, et les allocations hors
+# phase n'encombrent pas les suivantes. Il ne voit pas les processus du pool de parse
+# des shards ; le RSS max est celui du processus principal. Sans tracemalloc
+# (trace_alloc=False, --no-tracemalloc) les temps ne sont pas gonflés : c'est le mode
+# utilisé par tools/bench.py.
+import os, sys, json, time, datetime, platform, tracemalloc, cProfile, contextlib
+from contextlib import contextmanager
+from typing import List, Optional
+
+try:
+    import resource  # Unix uniquement
+except ImportError:  # Windows
+    resource = None
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """RSS max du processus depuis son démarrage (None si indisponible)."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == 'darwin' else peak * 1024  # macOS: octets, Linux: Ko
+    try:
+        import psutil  # type: ignore
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', None) or info.rss
+    except ImportError:
+        return None
+
+
+# allocations du profileur lui-même (tracemalloc, context manager de phase)
+_NOISE_FILTERS = [tracemalloc.Filter(False, tracemalloc.__file__),
+                  tracemalloc.Filter(False, contextlib.__file__)]
+
+
+def _mb(n: Optional[int]) -> str:
+    return f"{n / (1 << 20):.1f} Mo" if n is not None else "?"
+
+
+class Phase:
+    def __init__(self, name: str):
+        self.name = name
+        self.seconds = 0.0
+        self.items: Optional[int] = None
+        self.unit = ''
+        self.peak_rss: Optional[int] = None
+        self.traced_peak: Optional[int] = None  # pic des allocations faites pendant la phase
+        self.traced_net: Optional[int] = None   # encore allouées en fin de phase
+        self.top: List[dict] = []
+
+    def count(self, n: int, unit: str = 'éléments'):
+        """Nombre d'éléments traités (sert au débit)."""
+        self.items, self.unit = n, unit
+
+    def to_dict(self) -> dict:
+        d = {'name': self.name, 'seconds': round(self.seconds, 4), 'peak_rss_bytes': self.peak_rss}
+        if self.traced_peak is not None:
+            d['traced_peak_bytes'] = self.traced_peak
+            d['traced_net_bytes'] = self.traced_net
+        if self.items is not None:
+            d['items'] = self.items
+            d['unit'] = self.unit
+            d['per_second'] = round(self.items / self.seconds, 1) if self.seconds > 0 else None
+        if self.top:
+            d['top_allocations'] = self.top
+        return d
+
+
+class PhaseProfiler:
+    def __init__(self, enabled: bool = False, top: int = 5, cprofile_path: Optional[str] = None,
+                 trace_alloc: bool = True):
+        self.enabled = enabled
+        self.top_n = top
+        self.trace_alloc = trace_alloc  # False : temps et RSS seulement (mesures non faussées)
+        self.cprofile_path = cprofile_path
+        self.phases: List[Phase] = []
+        self._t0 = time.perf_counter()
+        self._cprof: Optional[cProfile.Profile] = None
+
+    def start(self):
+        if self.enabled and self.cprofile_path:
+            self._cprof = cProfile.Profile()
+            self._cprof.enable()
+        self._t0 = time.perf_counter()
+
+    @contextmanager
+    def phase(self, name: str):
+        ph = Phase(name)
+        if not self.enabled:
+            yield ph
+            return
+        if self.trace_alloc:
+            tracemalloc.start(1)  # 1 frame suffit pour regrouper par ligne
+        t0 = time.perf_counter()
+        try:
+            yield ph
+        finally:
+            ph.seconds = time.perf_counter() - t0
+            snapshot = None
+            if self.trace_alloc:
+                ph.traced_net, ph.traced_peak = tracemalloc.get_traced_memory()
+                snapshot = tracemalloc.take_snapshot() if self.top_n else None
+                tracemalloc.stop()
+            ph.peak_rss = peak_rss_bytes()
+            if snapshot is not None:
+                snapshot = snapshot.filter_traces(_NOISE_FILTERS)
+                ph.top = [{'where': f"{os.path.basename(st.traceback[0].filename)}:{st.traceback[0].lineno}",
+                           'size_bytes': st.size, 'count': st.count}
+                          for st in snapshot.statistics('lineno')[:self.top_n]]
+            self.phases.append(ph)
+
+    def stop(self):
+        if self._cprof is not None:
+            self._cprof.disable()
+            self._cprof.dump_stats(self.cprofile_path)
+            self._cprof = None
+
+    # ----- restitution -----
+    def summary(self, extra: Optional[dict] = None) -> dict:
+        return {
+            'generated_at': datetime.datetime.utcnow().isoformat() + 'Z',
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'total_seconds': round(time.perf_counter() - self._t0, 4),
+            'peak_rss_bytes': peak_rss_bytes(),
+            'phases': [p.to_dict() for p in self.phases],
+            **(extra or {}),
+        }
+
+    def report(self) -> str:
+        total = sum(p.seconds for p in self.phases) or 1.0
+        lines = [f"[PROFILE] {'phase':<14} {'temps':>9} {'%':>6} {'pic alloc':>10} {'retenu':>10} {'RSS max':>10}  débit"]
+        for p in self.phases:
+            rate = (f"{p.items / p.seconds:,.0f} {p.unit}/s ({p.items:,})"
+                    if p.items is not None and p.seconds > 0 else "")
+            lines.append(f"[PROFILE] {p.name:<14} {p.seconds * 1000:>7.0f}ms {p.seconds / total:>6.1%} "
+                         f"{_mb(p.traced_peak):>10} {_mb(p.traced_net):>10} {_mb(p.peak_rss):>10}  {rate}")
+        for p in self.phases:
+            for a in p.top[:3]:
+                lines.append(f"[PROFILE]   {p.name:<12} {_mb(a['size_bytes']):>9} ({a['count']:,} blocs) {a['where']}")
+        if self.cprofile_path:
+            lines.append(f"[PROFILE] cProfile -> {self.cprofile_path} "
+                         f"(python -m pstats {self.cprofile_path})")
+        return "\n".join(lines)
+
+    def write_json(self, path: str, extra: Optional[dict] = None):
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(extra), f, ensure_ascii=False, indent=2)
@@ -0,0 +1,256 @@
+# Delta entre deux builds de quests.json (--delta-from) : ce qui a changé d'un patch du jeu à l'autre
+#
+#   public/data/quests.delta.json    quêtes ajoutées (complètes), supprimées, modifiées
+#                                    (champs changés seulement), lignes de tâches modifiées,
+#                                    arêtes ajoutées / retirées, vues de layout changées et
+#                                    autres clés de tête modifiées
+#   public/data/quests.changelog.md  résumé lisible pour relire les changements de données
+#
+# Le delta s'applique à la sortie précédente identifiée par son generated_at (base) et
+# produit la nouvelle (target) : un client qui a déjà la base ne télécharge que le delta.
+# Chaque quête modifiée ou ajoutée porte un hash de contenu stable (quête + lignes de
+# ses tâches, JSON canonique) indépendant du schéma (1 ou 2) et de l'ordre des clés.
+import os, json, gzip, hashlib
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from string_tables import decode_interned
+
+DELTA_VERSION = 1
+_SKIP_META = ('quests', 'tasks', 'layout', 'generated_at')
+
+
+def read_output(path: str) -> dict:
+    """quests.json (ou .json.gz) d'un build précédent, tables de chaînes (--intern) décodées."""
+    opener = gzip.open if path.endswith('.gz') else open
+    with opener(path, 'rt', encoding='utf-8') as f:
+        return decode_interned(json.load(f))
+
+
+def _canonical(obj) -> bytes:
+    return json.dumps(obj, ensure_ascii=False, sort_keys=True, separators=(',', ':')).encode('utf-8')
+
+
+def split_tasks(data: dict) -> Tuple[Dict[str, dict], Dict[str, List[str]]]:
+    """
+    (lignes de tâches par TaskID, TaskID de chaque quête) quel que soit le schéma ;
+    colonnes nulles retirées comme dans la table du schéma 2.
+    """
+    rows: Dict[str, dict] = {}
+    refs: Dict[str, List[str]] = {}
+    table = data.get('tasks') if isinstance(data.get('tasks'), dict) else {}
+    for q in data.get('quests', []):
+        ids = []
+        for t in q.get('tasks') or ():
+            if isinstance(t, dict):
+                tid = str(t.get('task_id'))
+                if isinstance(t.get('data'), dict):
+                    rows[tid] = {k: v for k, v in t['data'].items() if v is not None}
+            else:
+                tid = str(t)
+                if tid in table:
+                    rows[tid] = {k: v for k, v in table[tid].items() if v is not None}
+            ids.append(tid)
+        refs[q['id']] = ids
+    return rows, refs
+
+
+def _quest_record(q: dict, ids: List[str]) -> dict:
+    return {**q, 'tasks': ids}
+
+
+def quest_hash(record: dict, rows: Dict[str, dict]) -> str:
+    """Hash de contenu d'une quête (tâches sous forme d'IDs) et des lignes de ses tâches."""
+    h = hashlib.sha1(_canonical(record))
+    for tid in record.get('tasks', ()):
+        h.update(_canonical([tid, rows.get(tid)]))
+    return h.hexdigest()[:16]
+
+
+def _edges(quests: Iterable[dict]) -> set:
+    return {(src, q['id'], kind) for q in quests
+            for field, kind in (('prerequisites', 'pre'), ('not_prerequisites', 'not'))
+            for src in q.get(field) or ()}
+
+
+def compute_delta(old: dict, new: dict) -> dict:
+    """Delta qui transforme la sortie `old` en `new` (cf. en-tête du module)."""
+    old_rows, old_refs = split_tasks(old)
+    new_rows, new_refs = split_tasks(new)
+    old_q = {q['id']: _quest_record(q, old_refs[q['id']]) for q in old.get('quests', [])}
+    new_q = {q['id']: _quest_record(q, new_refs[q['id']]) for q in new.get('quests', [])}
+    new_schema = int(new.get('schema_version', 1))
+
+    new_src = {q['id']: q for q in new.get('quests', [])}
+
+    def out_quest(rec: dict) -> dict:
+        # quête telle que dans la nouvelle sortie (schéma 1 : lignes recopiées, colonnes nulles comprises)
+        return rec if new_schema >= 2 else new_src[rec['id']]
+
+    added, changed = [], []
+    for qid, rec in new_q.items():
+        prev = old_q.get(qid)
+        if prev is None:
+            added.append({'hash': quest_hash(rec, new_rows), 'quest': out_quest(rec)})
+            continue
+        h_new = quest_hash(rec, new_rows)
+        if h_new == quest_hash(prev, old_rows):
+            continue
+        full = out_quest(rec)
+        fields = {k: full[k] for k in rec if k not in prev or prev[k] != rec[k]}
+        if new_schema < 2 and 'tasks' not in fields and any(old_rows.get(t) != new_rows.get(t) for t in rec['tasks']):
+            fields['tasks'] = full['tasks']  # schéma 1 : les lignes sont dans la quête
+        changed.append({'id': qid, 'hash': h_new, 'set': fields, 'unset': [k for k in prev if k not in rec]})
+    removed = [qid for qid in old_q if qid not in new_q]
+
+    referenced = {t for ids in new_refs.values() for t in ids}
+    task_delta = {
+        'changed': {t: new_rows[t] for t in sorted(referenced) if t in new_rows and old_rows.get(t) != new_rows[t]},
+        'removed': sorted(t for t in old_rows if t not in referenced or t not in new_rows),
+    }
+    old_edges, new_edges = _edges(old_q.values()), _edges(new_q.values())
+    # ordre des quêtes de la sortie : transmis seulement s'il diffère de « base sans les
+    # supprimées, puis les ajoutées »
+    order: Optional[List[str]] = list(new_q)
+    if order == [qid for qid in old_q if qid in new_q] + [a['quest']['id'] for a in added]:
+        order = None
+
+    # layout : par vue, positions des nœuds déplacés / ajoutés et nœuds retirés (None = vue supprimée)
+    layout: Dict[str, Dict[str, Optional[dict]]] = {}
+    old_layout, new_layout = old.get('layout') or {}, new.get('layout') or {}
+    for direction in sorted(set(old_layout) | set(new_layout)):
+        a, b = old_layout.get(direction) or {}, new_layout.get(direction) or {}
+        views: Dict[str, Optional[dict]] = {}
+        for v in sorted(set(a) | set(b)):
+            va, vb = a.get(v), b.get(v)
+            if va == vb:
+                continue
+            views[v] = None if vb is None else {
+                'set': {n: pos for n, pos in vb.items() if (va or {}).get(n) != pos},
+                'unset': [n for n in (va or {}) if n not in vb]}
+        if views:
+            layout[direction] = views
+    meta = {k: v for k, v in new.items() if k not in _SKIP_META and old.get(k) != v}
+    meta_removed = [k for k in old if k not in _SKIP_META and k not in new]
+
+    return {
+        'delta_version': DELTA_VERSION,
+        'base': {'generated_at': old.get('generated_at'), 'schema_version': old.get('schema_version', 1),
+                 'quest_count': len(old_q)},
+        'target': {'generated_at': new.get('generated_at'), 'schema_version': new.get('schema_version', 1),
+                   'quest_count': len(new_q)},
+        'order': order,
+        'added': added,
+        'removed': removed,
+        'changed': changed,
+        'tasks': task_delta,
+        'edges': {'added': sorted(list(e) for e in new_edges - old_edges),
+                  'removed': sorted(list(e) for e in old_edges - new_edges)},
+        'layout': layout,
+        'meta': meta,
+        'meta_removed': meta_removed,
+    }
+
+
+def apply_delta(old: dict, delta: dict) -> dict:
+    """Applique un delta à la sortie de base (même schéma que la cible) ; retourne la nouvelle sortie."""
+    if old.get('generated_at') != delta['base']['generated_at']:
+        raise ValueError(f"delta prévu pour le build du {delta['base']['generated_at']}, "
+                         f"pas pour {old.get('generated_at')}")
+    if int(old.get('schema_version', 1)) != int(delta['target']['schema_version'] or 1):
+        raise ValueError("delta entre deux schémas différents : recharger la sortie complète")
+    removed = set(delta['removed'])
+    quests = {q['id']: dict(q) for q in old['quests'] if q['id'] not in removed}
+    for c in delta['changed']:
+        q = quests[c['id']]
+        q.update(c['set'])
+        for k in c['unset']:
+            q.pop(k, None)
+    for a in delta['added']:
+        quests[a['quest']['id']] = a['quest']
+    order = delta['order'] or list(quests)
+    data = {k: v for k, v in old.items() if k not in delta['meta_removed']}
+    data.update(delta['meta'])
+    data['generated_at'] = delta['target']['generated_at']
+    data['quests'] = [quests[qid] for qid in order]
+    if delta['layout'] or 'layout' in data:
+        layout = {d: dict(views) for d, views in (data.get('layout') or {}).items()}
+        for direction, views in delta['layout'].items():
+            cur = layout.setdefault(direction, {})
+            for view, change in views.items():
+                if change is None:
+                    cur.pop(view, None)
+                    continue
+                gone = set(change['unset'])
+                nodes = {n: pos for n, pos in (cur.get(view) or {}).items() if n not in gone}
+                nodes.update(change['set'])
+                cur[view] = nodes
+        data['layout'] = layout
+    if int(delta['target']['schema_version'] or 1) >= 2:
+        gone_tasks = set(delta['tasks']['removed'])
+        table = {t: r for t, r in (old.get('tasks') or {}).items() if t not in gone_tasks}
+        table.update(delta['tasks']['changed'])
+        # même ordre que build_task_table : première référence
+        data['tasks'] = {t: table[t] for q in data['quests'] for t in q['tasks'] if t in table}
+    return data
+
+
+def format_changelog(delta: dict, old: dict, new: dict) -> str:
+    """Résumé Markdown du delta (titres repris des deux sorties)."""
+    titles = {q['id']: q.get('title') or '' for q in old.get('quests', [])}
+    titles.update({q['id']: q.get('title') or '' for q in new.get('quests', [])})
+
+    def label(qid: str) -> str:
+        return f"`{qid}` {titles.get(qid, '')}".rstrip()
+
+    lines = ["# Changements des quêtes",
+             "",
+             f"Base : {delta['base']['generated_at']} ({delta['base']['quest_count']} quêtes) → "
+             f"cible : {delta['target']['generated_at']} ({delta['target']['quest_count']} quêtes)",
+             "",
+             f"- {len(delta['added'])} quête(s) ajoutée(s), {len(delta['removed'])} supprimée(s), "
+             f"{len(delta['changed'])} modifiée(s)",
+             f"- {len(delta['tasks']['changed'])} ligne(s) de tâches modifiée(s) ou ajoutée(s), "
+             f"{len(delta['tasks']['removed'])} retirée(s)",
+             f"- {len(delta['edges']['added'])} arête(s) ajoutée(s), {len(delta['edges']['removed'])} retirée(s)",
+             f"- {sum(len(v) for v in delta['layout'].values())} vue(s) de layout recalculée(s)"]
+    if delta['added']:
+        lines += ["", "## Ajoutées", ""] + [f"- {label(a['quest']['id'])}" for a in delta['added']]
+    if delta['removed']:
+        lines += ["", "## Supprimées", ""] + [f"- {label(qid)}" for qid in delta['removed']]
+    if delta['changed']:
+        lines += ["", "## Modifiées", ""]
+        for c in delta['changed']:
+            fields = sorted(set(c['set']) | set(c['unset']))
+            lines.append(f"- {label(c['id'])} : {', '.join(fields) if fields else 'lignes de tâches'}")
+    if delta['edges']['added'] or delta['edges']['removed']:
+        lines += ["", "## Prérequis", ""]
+        lines += [f"- + {src} → {dst}{' (exclusion)' if kind == 'not' else ''}"
+                  for src, dst, kind in delta['edges']['added']]
+        lines += [f"- − {src} → {dst}{' (exclusion)' if kind == 'not' else ''}"
+                  for src, dst, kind in delta['edges']['removed']]
+    return "\n".join(lines) + "\n"
+
+
+def delta_summary(delta: dict) -> str:
+    return (f"+{len(delta['added'])} / -{len(delta['removed'])} / ~{len(delta['changed'])} quête(s), "
+            f"{len(delta['tasks']['changed'])} tâche(s) modifiée(s), "
+            f"+{len(delta['edges']['added'])} / -{len(delta['edges']['removed'])} arête(s)")
+
+
+def delta_paths(out_path: str) -> Tuple[str, str]:
+    base = os.path.splitext(out_path)[0]
+    return base + '.delta.json', base + '.changelog.md'
+
+
+def remove_delta(out_path: str) -> List[str]:
+    """
+    Supprime le delta (et ses .gz/.br) à côté de out_path : réécrite sans --delta-from, la
+    sortie n'est plus la cible du delta et le front prendrait sa copie pour la version à jour.
+    """
+    removed = []
+    stale = delta_paths(out_path)[0]
+    for path in (stale, stale + '.gz', stale + '.br'):
+        if os.path.isfile(path):
+            os.remove(path)
+            removed.append(path)
+    return removed
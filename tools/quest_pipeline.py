@@ -0,0 +1,1409 @@
+# Pipeline de construction de quests.json, utilisable en bibliothèque
+#
+#   from quest_pipeline import load_quest_rows, load_indexes, build_quests
+#   rows = load_quest_rows("quests.csv")
+#   ix = load_indexes(items_csv=..., objective_tasks_path=..., locale_json=..., poi_dir=..., vitals_json=...)
+#   data = build_quests(rows, ix)          # même structure que public/data/quests.json
+#   variants = build_locale_variants(data, ix, {"fr-fr": "fr-fr.json"})
+#
+# Étapes séparées : les loaders retournent des index (dict) regroupés dans un objet
+# Indexes, que build_quests() lit sans état global ; un même Indexes (et ses mémos de
+# descriptions) sert à plusieurs builds tant que ses sources ne changent pas.
+# pandas / numpy ne sont importés qu'à la lecture des CSV : importer ce module, ou
+# construire depuis des index déjà chargés, ne les charge pas.
+# convert_csv_to_json.py est la CLI au-dessus de ce module.
+import os, io, json, re, datetime, glob, math, time, contextlib, hashlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Set, Optional, Tuple
+
+from build_cache import BuildCache
+from achievement_logic import LogicSyntaxError, literals, parse_expr
+from graph_analysis import analyze_graph
+from graph_layout import compute_layouts
+from json_stream import iter_array, iter_object_items
+from profiler import PhaseProfiler
+
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+
+# 1 = lignes ObjectiveTasks complètes dans chaque quête (historique)
+# 2 = table "tasks" commune (dédupliquée, colonnes nulles retirées), quêtes -> IDs
+SCHEMA_VERSION = 2
+EXCLUDE_RE = re.compile(r"(?:^01_|^S_|^Quest_|AC_Test|devworld|_alt|EnterZone_SM|_EG|_RW|^9806_|^9809_|^9812_" \
+                        r"|(?:_soldier|_destroyer|_ranger|_musketeer|_occultist|_mystic|_swordsman)$)")
+TYPE_EXCLUDE_RE = re.compile(r"\b(?:Artifact|Mission|Community Goal)\b", re.IGNORECASE)
+MANUAL_PATH = os.path.join('tools', 'manual_links.json')
+
+# ----- Helpers colonnes (ingestion vectorisée, sans iterrows) ----------------
+_INT_NULL_STRINGS = ('true', 'false', 'nan', 'none', '')
+
+def _text_col(frame: 'pd.DataFrame', col: str, falsy_empty: bool = False, keep_nan: bool = False) -> 'pd.Series':
+    """
+    Équivalent colonne de str(get(r, col, '')).strip().
+    - falsy_empty: les valeurs « fausses » (0, '', False) deviennent '' (cas `x or ''`)
+    - keep_nan: NaN -> 'nan' (cas str(v or '') où NaN est truthy, cf. items.csv)
+    """
+    import pandas as pd
+    if col not in frame.columns:
+        return pd.Series('', index=frame.index, dtype=object)
+    s = frame[col].astype(object)
+    keep = pd.Series(True, index=frame.index) if keep_nan else s.notna()
+    if falsy_empty:
+        keep &= s.astype(bool)
+    return s.where(keep, '').map(str).str.strip()
+
+def _int_col(frame: 'pd.DataFrame', col: str) -> 'np.ndarray':
+    """
+    Équivalent colonne de to_int_safe(get(r, col, None)) : tableau objet d'int Python / None.
+    """
+    import numpy as np
+    import pandas as pd
+    out = np.full(len(frame), None, dtype=object)
+    if col not in frame.columns:
+        return out
+    s = frame[col]
+    if s.dtype == bool:
+        out[:] = s.to_numpy().astype(np.int64)
+        return out
+    obj = s.astype(object)
+    txt = obj.where(obj.notna(), '').map(str).str.strip()
+    txt = txt.where(~txt.str.lower().isin(_INT_NULL_STRINGS), None)
+    vals = np.trunc(pd.to_numeric(txt, errors='coerce').to_numpy(dtype=float))
+    ok = np.isfinite(vals) & (np.abs(vals) < 2.0 ** 63)
+    out[ok] = vals[ok].astype(np.int64)
+    # booléens mélangés dans une colonne objet (True/False + vides) -> 1/0
+    is_bool = obj.map(type).isin((bool, np.bool_)).to_numpy()
+    if is_bool.any():
+        out[is_bool] = obj[is_bool].astype(np.int64).to_numpy()
+    return out
+
+
+
+# ----- CSV des quêtes -----------------------------------------------------------
+# Colonnes texte / entières de la feuille des quêtes, normalisées en bloc
+QUEST_TEXT_COLS = {
+    'id': ('ID', False), 'title': ('Title', False), 'description': ('Description', False),
+    'type': ('Type', False), 'icon': ('Icon', False), 'achievement_id': ('Achievement Id', False),
+    'required_expr': ('Required Achievement Id', False), 'item_reward': ('Item Reward', False),
+    'item_reward_name': ('Item Reward Name', False), 'task': ('Task', True), 'schedule': ('Schedule Id', True),
+}
+QUEST_INT_COLS = {
+    'recommended_level': 'Difficulty Level', 'required_level': 'Required Level',
+    'zone_id': 'Exclusive Territory', 'exp': 'Universal Exp Amount', 'azoth': 'Azoth Reward',
+    'coin': 'Currency Reward', 'standing': 'Territory Standing',
+    'faction_influence': 'Faction Influence Amount', 'faction_reputation': 'Faction Reputation',
+    'faction_tokens': 'Faction Tokens', 'item_reward_qty': 'Item Reward Qty',
+}
+
+QUEST_CHUNK_ROWS = 20_000
+# colonnes de la passe légère du mode --stream (exclusions + index achievement -> quête)
+QUEST_LIGHT_COLS = {'id': ('ID', False), 'type': ('Type', False), 'achievement_id': ('Achievement Id', False)}
+
+def _prepare_quest_rows(df: 'pd.DataFrame', cols: Optional[Dict[str, tuple]] = None,
+                        int_cols: Optional[Dict[str, str]] = None) -> List[dict]:
+    """Exclusions et normalisation d'un DataFrame (fichier entier ou bloc) du CSV des quêtes."""
+    import pandas as pd
+    df.columns = [c.strip() for c in df.columns]
+    # 1) Construire la liste des quêtes conservées (on exclut ici)
+    qid_col = _text_col(df, 'ID')
+    keep = (qid_col != '') & ~qid_col.str.contains(EXCLUDE_RE) \
+           & ~_text_col(df, 'Type', falsy_empty=True).str.contains(TYPE_EXCLUDE_RE)
+    kept = df[keep.to_numpy()]
+    cols = QUEST_TEXT_COLS if cols is None else cols
+    int_cols = QUEST_INT_COLS if int_cols is None else int_cols
+    prepared = pd.DataFrame({k: _text_col(kept, c, falsy_empty=f) for k, (c, f) in cols.items()},
+                            index=kept.index)
+    for k, c in int_cols.items():
+        prepared[k] = pd.Series(_int_col(kept, c), index=kept.index, dtype=object)
+    return prepared.to_dict('records')
+
+def load_quest_rows(csv_path: str) -> List[dict]:
+    """Lit le CSV des quêtes, applique les exclusions et normalise les colonnes utiles."""
+    import pandas as pd
+    return _prepare_quest_rows(pd.read_csv(csv_path, encoding='utf-8', low_memory=False))
+
+def iter_quest_rows(csv_path: str, chunksize: int = QUEST_CHUNK_ROWS, light: bool = False) -> Iterator[dict]:
+    """
+    Lignes de load_quest_rows, lues par blocs de `chunksize` lignes (mémoire bornée).
+    Colonnes texte lues comme texte brut : le type d'une colonne n'est plus déduit du
+    fichier entier (une colonne texte numérique à trous donnerait sinon '12.0' ou '12'
+    selon le bloc). `light` : seulement id, type et achievement_id (passe d'index).
+    """
+    import pandas as pd
+    cols = QUEST_LIGHT_COLS if light else QUEST_TEXT_COLS
+    wanted = {c for c, _ in cols.values()} | ({'ID', 'Type'} if light else set(QUEST_INT_COLS.values()))
+    text = {c for c, _ in cols.values()}
+    header = pd.read_csv(csv_path, encoding='utf-8', nrows=0).columns
+    reader = pd.read_csv(csv_path, encoding='utf-8', chunksize=chunksize, usecols=lambda c: c.strip() in wanted,
+                         dtype={c: str for c in header if c.strip() in text}, low_memory=False)
+    with reader:
+        for chunk in reader:
+            yield from _prepare_quest_rows(chunk, cols, {} if light else None)
+
+
+# ----- items.csv (optionnel) -------------------------------------------------
+# Colonnes attendues: "Name", "Item ID", "Icon Path", "Rarity" (seules colonnes lues)
+ITEM_COLUMNS = ('Name', 'Item ID', 'Icon Path', 'Rarity')
+ITEMS_CHUNK_ROWS = 100_000
+
+def load_items(items_path: str, only: Optional[Set[str]] = None) -> Tuple[Dict[str, dict], Dict[str, dict]]:
+    """
+    Retourne (items_by_id, items_by_name) ; lève une exception si le CSV est illisible.
+    `only` : IDs / noms référencés (cf. referenced_keys) ; le CSV est alors lu par blocs
+    et seules les lignes dont l'ID, ou le nom en minuscules, est référencé sont gardées.
+    """
+    import pandas as pd
+    read = partial(pd.read_csv, items_path, encoding='utf-8', dtype=str,
+                   usecols=lambda c: c.strip() in ITEM_COLUMNS)
+    if only is None:
+        idf = read()
+        idf.columns = [c.strip() for c in idf.columns]
+    else:
+        names_lower = {k.lower() for k in only}
+        parts = []
+        for chunk in read(chunksize=ITEMS_CHUNK_ROWS):
+            chunk.columns = [c.strip() for c in chunk.columns]
+            keep = _text_col(chunk, 'Item ID', falsy_empty=True, keep_nan=True).isin(only) \
+                | _text_col(chunk, 'Name', falsy_empty=True, keep_nan=True).str.lower().isin(names_lower)
+            parts.append(chunk[keep.to_numpy()])
+        idf = pd.concat(parts) if parts else pd.DataFrame(columns=list(ITEM_COLUMNS))
+    cols = {k: _text_col(idf, c, falsy_empty=True, keep_nan=True)
+            for k, c in (('name', 'Name'), ('id', 'Item ID'), ('icon', 'Icon Path'), ('rarity', 'Rarity'))}
+    names, iids = cols['name'], cols['id']
+    # dernière occurrence gagne (dict(zip(...)) garde l'ordre de 1ʳᵉ insertion, comme la boucle)
+    has_id = iids != ''
+    by_id = pd.DataFrame({'id': iids, 'name': names.where(names != '', iids),
+                          'icon': cols['icon'], 'rarity': cols['rarity']})[has_id]
+    has_name = names != ''
+    by_name = pd.DataFrame({'id': iids, 'name': names, 'icon': cols['icon'], 'rarity': cols['rarity']})[has_name]
+    return (dict(zip(by_id['id'], by_id.to_dict('records'))),
+            dict(zip(by_name['name'].str.lower(), by_name.to_dict('records'))))
+
+
+############################################
+# Chargement des ObjectiveTasks (fusion)
+############################################
+
+def list_objective_task_files(path_or_csv: str) -> List[str]:
+    """
+    - Si path_or_csv est un dossier: on prend tous les fichiers
+      ObjectiveTasksDataManager*.csv dedans.
+    - Sinon: on traite path_or_csv comme un seul CSV.
+    """
+    if path_or_csv and os.path.isdir(path_or_csv):
+        # Tous les CSV “ObjectiveTasksDataManager*.csv” du dossier
+        return sorted(glob.glob(os.path.join(path_or_csv, "ObjectiveTasksDataManager*.csv")))
+    if path_or_csv and os.path.isfile(path_or_csv):
+        return [path_or_csv]
+    # Fallback: tenter un fichier simple dans CWD
+    if os.path.isfile("ObjectiveTasksDataManager.csv"):
+        return ["ObjectiveTasksDataManager.csv"]
+    return []
+
+def load_objective_tasks_file(fp: str) -> Optional[Tuple[Dict[str, dict], int]]:
+    """
+    Parse un shard ObjectiveTasks -> (dict[TaskID] = row(dict), lignes retenues).
+    Retourne None si la colonne TaskID est absente ; lève une exception si illisible.
+    """
+    import pandas as pd
+    df_tasks = pd.read_csv(fp, encoding='utf-8', low_memory=False)
+    df_tasks.columns = [c.strip() for c in df_tasks.columns]
+    if "TaskID" not in df_tasks.columns:
+        return None
+    tids = df_tasks["TaskID"].astype(object).map(str).str.strip()
+    keep = (tids != '').to_numpy()
+    # NaN -> None sur toutes les colonnes d'un coup
+    obj = df_tasks.astype(object)
+    records = obj.where(df_tasks.notna(), None)[keep].to_dict('records')
+    # dernière occurrence gagne (OK pour nous)
+    return dict(zip(tids[keep], records)), len(records)
+
+def _timed_parse_tasks_file(fp: str):
+    """Worker (process pool) : (fp, résultat, secondes, erreur) — pas d'exception à travers le pool."""
+    t0 = time.perf_counter()
+    try:
+        return fp, load_objective_tasks_file(fp), time.perf_counter() - t0, None
+    except Exception as e:
+        return fp, None, time.perf_counter() - t0, str(e)
+
+def load_objective_tasks_many(path_or_csv: str, cache: Optional[BuildCache] = None,
+                              changed: Optional[Set[str]] = None, jobs: int = 1,
+                              shard_report: bool = False,
+                              shards: Optional[Dict[str, Dict[str, dict]]] = None) -> Dict[str, dict]:
+    """
+    Charge un ou plusieurs ObjectiveTasksDataManager_*.csv et fusionne en:
+      dict[TaskID] = row(dict)
+    Les shards absents du cache sont parsés en parallèle (`jobs` processus) ; la fusion
+    se fait ensuite dans l'ordre trié des fichiers : la dernière occurrence gagne,
+    exactement comme en série.
+    Si `changed` est fourni, on y ajoute les TaskID modifiés depuis le run précédent
+    (shards re-parsés ou supprimés) pour invalider les quêtes qui en dépendent.
+    `shards`, si fourni, reçoit le contenu de chaque shard lu (fp -> {TaskID: ligne}) :
+    --watch re-fusionne ensuite sans relire les shards inchangés.
+    """
+    files = list_objective_task_files(path_or_csv)
+    if not files:
+        print(f"[WARN] Aucun ObjectiveTasksDataManager*.csv trouvé à partir de: {path_or_csv}")
+        return {}
+
+    # 1) cache puis parse (parallèle si plusieurs shards à lire)
+    results: Dict[str, tuple] = {}  # fp -> (résultat, secondes, erreur, source)
+    pending: List[str] = []
+    for fp in files:
+        t0 = time.perf_counter()
+        hit, res = cache.lookup('tasks', fp) if cache else (False, None)
+        if hit:
+            results[fp] = (res, time.perf_counter() - t0, None, 'cache')
+        else:
+            pending.append(fp)
+    workers = min(max(1, jobs), len(pending))
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as ex:
+            parsed = list(ex.map(_timed_parse_tasks_file, pending))
+    else:
+        parsed = [_timed_parse_tasks_file(fp) for fp in pending]
+    for fp, res, dt, err in parsed:
+        if err is None and cache:
+            cache.store('tasks', fp, res)
+        results[fp] = (res, dt, err, 'parse')
+
+    # 2) fusion déterministe, dans l'ordre des fichiers
+    idx: Dict[str, dict] = {}
+    total_rows = 0
+    overrides: Dict[str, int] = {}
+    for fp in files:
+        res, dt, err, source = results[fp]
+        if err is not None:
+            print(f"[WARN] Lecture impossible: {fp} ({err})")
+            continue
+        if res is None:
+            print(f"[WARN] Colonne 'TaskID' absente dans {os.path.basename(fp)} — ignoré")
+            continue
+        frag, nrows = res
+        if shards is not None:
+            shards[fp] = frag
+        if cache and changed is not None and cache.has_changed(fp):
+            prev = cache.previous('tasks', fp)
+            old = prev[0] if prev else {}
+            changed.update(t for t in frag.keys() | old.keys() if frag.get(t) != old.get(t))
+        # TaskID déjà fournis par un shard précédent : ce shard les écrase
+        overrides[fp] = sum(1 for t in frag if t in idx)
+        idx.update(frag)
+        total_rows += nrows
+    if cache and changed is not None and os.path.isdir(path_or_csv):
+        # shards supprimés depuis le run précédent : leurs TaskID sont « modifiés »
+        current = {os.path.abspath(f) for f in files}
+        for gone in cache.known_paths(path_or_csv):
+            name = os.path.basename(gone)
+            if gone in current or not (name.startswith("ObjectiveTasksDataManager") and name.endswith(".csv")):
+                continue
+            prev = cache.drop('tasks', gone)
+            if prev:
+                changed.update(prev[0].keys())
+    print(f"[OK] ObjectiveTasks chargés: {len(idx)} (fusion de {len(files)} fichier(s), {total_rows} lignes lues)")
+    if len(files) > 1:
+        slowest = max(files, key=lambda f: results[f][1])
+        print(f"[INFO] Shards: {len(pending)} parsé(s) sur {workers} processus, {len(files) - len(pending)} depuis le cache ;"
+              f" {sum(overrides.values())} TaskID écrasé(s) par un shard ultérieur ;"
+              f" plus lent: {os.path.basename(slowest)} ({results[slowest][1] * 1000:.0f} ms)")
+    if shard_report:
+        for fp in files:
+            res, dt, err, source = results[fp]
+            nrows = res[1] if res else 0
+            print(f"  {os.path.basename(fp):<45} {dt * 1000:8.1f} ms  {source:<5}  {nrows:6d} ligne(s)"
+                  f"  {overrides.get(fp, 0):5d} écrasé(s)" + (f"  ERREUR: {err}" if err else ""))
+    return idx
+
+# ---------- Locale helpers ----------
+def _desc_key_from_tag(tag: str) -> str:
+    """
+    Convertit un tag de la forme @\"KEY\" ou @"KEY" ou "KEY" en 'KEY'
+    """
+    s = str(tag).strip()
+    if s.startswith('@'):
+        s = s[1:].strip()
+    # retire guillemets simples/doubles entourant la clé
+    if (s.startswith('"') and s.endswith('"')) or (s.startswith("'") and s.endswith("'")):
+        s = s[1:-1]
+    return s
+
+class LocaleIndex:
+    """
+    Fichier de locale indexé une fois au chargement : clés en minuscules, lookup
+    insensible à la casse en un seul accès. Si plusieurs clés ne diffèrent que par la
+    casse, la correspondance exacte reste prioritaire (puis la clé en minuscules, puis
+    la première du fichier). Les tags résolus sont mémorisés : chaque tag n'est nettoyé
+    (@, guillemets) et cherché qu'une fois.
+    `only` (clés en minuscules) : seules ces entrées sont gardées (cf. referenced_keys).
+    """
+
+    def __init__(self, entries=None, only: Optional[Set[str]] = None):
+        self.by_key: Dict[str, str] = {}
+        self.exact: Dict[str, str] = {}  # variantes de casse : seules les clés en conflit
+        self.only = only
+        self.entries_read = 0
+        first: Dict[str, str] = {}       # clé normalisée -> clé d'origine (casse mixte), le temps du chargement
+        collided: Set[str] = set()
+        pairs = entries.items() if isinstance(entries, dict) else (entries or ())
+        for k, v in pairs:
+            self.entries_read += 1
+            nk = k.lower()
+            if only is not None and nk not in only:
+                continue
+            if nk in self.by_key and first.get(nk, nk) != k:
+                if nk not in collided:
+                    collided.add(nk)
+                    self.exact[first.get(nk, nk)] = self.by_key[nk]
+                self.exact[k] = v
+                if k != nk:
+                    continue
+            elif k != nk:
+                first[nk] = k
+            self.by_key[nk] = v
+        self.collisions = len(collided)
+        self._memo: Dict[str, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.by_key)
+
+    def __bool__(self) -> bool:
+        # une locale filtrée peut ne rien garder : elle reste « chargée »
+        return self.entries_read > 0
+
+    def get(self, key: str) -> str:
+        """Texte de `key` (KEY, @KEY, @"KEY"...) ; la clé nettoyée si absente, '' si vide."""
+        hit = self._memo.get(key)
+        if hit is None:
+            if not isinstance(key, str) or not key.strip():
+                return ""
+            k = _desc_key_from_tag(key)
+            hit = (self.exact.get(k) if self.exact else None) or self.by_key.get(k.lower()) or k
+            self._memo[key] = hit
+        return hit
+
+    def __getstate__(self):
+        # le mémo est reconstruit à l'usage (cache disque, processus de build par locale)
+        return {**self.__dict__, '_memo': {}}
+
+def as_locale_index(locale: Optional[Dict[str, str]]) -> LocaleIndex:
+    return locale if isinstance(locale, LocaleIndex) else LocaleIndex(locale)
+
+def _keys_digest(keys: Optional[Set[str]]) -> str:
+    """Empreinte d'un filtre de clés (dépendance des entrées de cache filtrées)."""
+    return hashlib.sha1("\n".join(sorted(keys)).encode("utf-8")).hexdigest() if keys is not None else ""
+
+# ---------- Optional: load locale (en-us.json) ----------
+def load_locale(path: str, only: Optional[Set[str]] = None) -> LocaleIndex:
+    """Locale lue en flux (pas d'objet JSON complet en mémoire), filtrée sur `only` si fourni."""
+    return LocaleIndex(iter_object_items(path), only)
+
+def locale_lang(path: str) -> str:
+    """'.../fr-fr.json' -> 'fr-fr' (suffixe des sorties quests.<lang>.json)."""
+    name = os.path.basename(path)
+    return (name[:-5] if name.lower().endswith('.json') else name).lower()
+
+def locale_output_path(out_path: str, lang: str) -> str:
+    """Sortie d'une locale à côté de la sortie principale : quests.json -> quests.fr-fr.json."""
+    return os.path.splitext(out_path)[0] + f".{lang}.json"
+
+# ---------- Helpers: collecte récursive des TP_DescriptionTag ----------
+SUBTASK_COL_RE = re.compile(r'^\s*sub\s*task', re.IGNORECASE)
+
+def _is_hidden_task(row: dict) -> bool:
+    v = row.get('IsHidden', 0)
+    try:
+        return int(v) == 1
+    except Exception:
+        return str(v).strip().lower() in ('1', 'true', 'yes')
+
+def _format_percent(p) -> str:
+    """Normalise un pourcentage : 0.25 -> '25%', 25 -> '25%'."""
+    try:
+        if p is None or (isinstance(p, float) and math.isnan(p)):
+            return ""
+        v = float(p)
+        if v <= 1.0:
+            v = v * 100.0
+        # pas d'arrondi agressif, gardons 0 décimale si entier
+        if abs(v - round(v)) < 1e-6:
+            return f"{int(round(v))}%"
+        return f"{v:.1f}%"
+    except Exception:
+        s = str(p).strip()
+        return s if s.endswith('%') else (s + '%')
+
+PLACEHOLDER_RE = re.compile(r'\{(POITags|itemName|targetName)\}')
+
+def compile_template(txt: str) -> tuple:
+    """
+    Description -> segments (littéral, placeholder, littéral, ...) : les indices impairs sont
+    les noms des placeholders ('POITags', 'itemName', 'targetName'). (txt,) si aucun.
+    """
+    return tuple(PLACEHOLDER_RE.split(txt))
+
+# ---------- POI definitions (javelindata_poidefinitions_*.json) ----------
+# On construit un mapping: poi_tag -> {"name": <nom localisé>, "icon": <url absolue>, "territoryId": <int>}
+POI_CDN_PREFIX = "https://cdn.nw-buddy.de/nw-data/live/"
+
+POI_FIELDS = ("POITag", "NameLocalizationKey", "MapIcon", "TerritoryID")
+
+def load_poi_file(fp: str, only: Optional[Set[str]] = None) -> Tuple[Dict[str, dict], int]:
+    """
+    Un fichier javelindata_poidefinitions_*.json, lu en flux -> (tag -> {name_key, icon,
+    territoryId}, nb d'entrées). Noms non résolus (cf. resolve_poi_names) : le résultat ne
+    dépend pas de la locale. `only` : tags à garder.
+    """
+    mapping: Dict[str, dict] = {}
+    total = 0
+    for rec in iter_array(fp, POI_FIELDS):
+        total += 1
+        tags = rec["POITag"]
+        name_key = rec["NameLocalizationKey"]
+        map_icon = rec["MapIcon"] or ""
+        territory_id = rec["TerritoryID"]
+        # URL absolue vers l'icône (si fournie)
+        icon_url = (POI_CDN_PREFIX + map_icon) if map_icon else ""
+        if not tags or not name_key:
+            continue
+        # POITag est un tableau; on mappe chaque tag vers la clé de son nom
+        try:
+            for t in tags:
+                t_str = str(t).strip()
+                if t_str and t_str not in mapping and (only is None or t_str in only):
+                    mapping[t_str] = {"name_key": name_key, "icon": icon_url, "territoryId": territory_id}
+        except Exception:
+            # si jamais ce n'est pas un tableau
+            t_str = str(tags).strip()
+            if t_str and t_str not in mapping and (only is None or t_str in only):
+                mapping[t_str] = {"name_key": name_key, "icon": icon_url, "territoryId": territory_id}
+    return mapping, total
+
+def load_poi_records(dir_path: str, cache: Optional[BuildCache] = None,
+                     only: Optional[Set[str]] = None) -> Dict[str, dict]:
+    """Tous les fichiers POI du dossier (premier tag rencontré gagne), noms non résolus."""
+    mapping: Dict[str, dict] = {}
+    if not dir_path or not os.path.isdir(dir_path):
+        return mapping
+    files = sorted(glob.glob(os.path.join(dir_path, "javelindata_poidefinitions_*.json")))
+    total = 0
+    parse = partial(load_poi_file, only=only)
+    for fp in files:
+        try:
+            frag, n = cache.load('poi', fp, parse, deps=_keys_digest(only)) if cache else parse(fp)
+        except Exception as e:
+            print(f"[WARN] Impossible de lire {os.path.basename(fp)}: {e}")
+            continue
+        total += n
+        for t_str, rec in frag.items():
+            mapping.setdefault(t_str, rec)
+    print(f"[OK] POI defs chargés: {len(mapping)} tags (depuis {len(files)} fichiers, {total} entrées)"
+          + (f", filtrés sur {len(only)} tag(s) référencé(s)" if only is not None else ""))
+    return mapping
+
+def resolve_poi_names(records: Dict[str, dict], locale: Optional[LocaleIndex] = None) -> Dict[str, dict]:
+    """tag -> {"name": <nom localisé>, "icon", "territoryId"}."""
+    locale = as_locale_index(locale)
+    return {t: {"name": locale.get(r["name_key"]),   # enlève @ et résout via locale
+                "icon": r["icon"], "territoryId": r["territoryId"]} for t, r in records.items()}
+
+def load_poi_defs(dir_path: str, locale: Optional[LocaleIndex] = None, cache: Optional[BuildCache] = None,
+                  only: Optional[Set[str]] = None) -> Dict[str, dict]:
+    return resolve_poi_names(load_poi_records(dir_path, cache, only), locale)
+
+# ---------- Vitals categories (javelindata_vitalscategories.json) ----------
+# Map: id -> {"name": <localisé>, "isNamed": bool}
+VITALS_FIELDS = ("VitalsCategoryID", "DisplayName", "IsNamed")
+
+def parse_vitals_categories(path: str, only: Optional[Set[str]] = None) -> Dict[str, dict]:
+    """
+    Lu en flux -> id -> {id, name_key, isNamed} (+ alias en minuscules), noms non résolus
+    (cf. resolve_vitals_names). `only` : IDs à garder, en minuscules.
+    """
+    mapping: Dict[str, dict] = {}
+    for rec in iter_array(path, VITALS_FIELDS):
+        vc_id = str(rec["VitalsCategoryID"] or "").strip()
+        disp = rec["DisplayName"]
+        if not vc_id or (only is not None and vc_id.lower() not in only):
+            continue
+        entry = {"id": vc_id, "name_key": str(disp) if disp else None, "isNamed": bool(rec["IsNamed"])}
+        mapping[vc_id] = entry
+        # Accès tolérant à la casse
+        mapping.setdefault(vc_id.lower(), entry)
+    return mapping
+
+def load_vitals_records(path: str, cache: Optional[BuildCache] = None,
+                        only: Optional[Set[str]] = None) -> Dict[str, dict]:
+    if not path or not os.path.isfile(path):
+        return {}
+    try:
+        parse = partial(parse_vitals_categories, only=only)
+        mapping = cache.load('vitals', path, parse, deps=_keys_digest(only)) if cache else parse(path)
+    except Exception as e:
+        print(f"[WARN] Impossible de lire {os.path.basename(path)}: {e}")
+        return {}
+    print(f"[OK] VitalsCategories chargés: {len(mapping)} entrées depuis {path}"
+          + (f", filtrées sur {len(only)} ID(s) référencé(s)" if only is not None else ""))
+    return mapping
+
+def resolve_vitals_names(records: Dict[str, dict], locale: Optional[LocaleIndex] = None) -> Dict[str, dict]:
+    locale = as_locale_index(locale)
+    # Résolution via locale (enlève @, insensible à la casse)
+    return {k: {"name": locale.get(r["name_key"]) if r["name_key"] else r["id"], "isNamed": r["isNamed"]}
+            for k, r in records.items()}
+
+def load_vitals_categories(path: str, locale: Optional[LocaleIndex] = None, cache: Optional[BuildCache] = None,
+                           only: Optional[Set[str]] = None) -> Dict[str, dict]:
+    return resolve_vitals_names(load_vitals_records(path, cache, only), locale)
+
+# ---------- Clés référencées par les tâches ----------
+def _poi_candidates(poi_tag: str) -> List[str]:
+    # si plusieurs tags sont listés, le token POI prend le 1er résolu
+    return [t.strip() for t in re.split(r'[,\|\s]+', poi_tag) if t.strip()] or [poi_tag]
+
+def referenced_keys(task_index: Dict[str, dict], rows: Optional[List[dict]] = None) -> Dict[str, Set[str]]:
+    """
+    Clés que les quêtes (`rows`, cf. load_quest_rows) et les descriptions des tâches
+    peuvent consulter : IDs / noms d'items ('items' : Item Reward, Item Reward Name,
+    ItemName des tâches), tags POI ('poi'), IDs de VitalsCategories en minuscules
+    ('vitals'), clés de locale en minuscules ('locale' : tags de description et repli des
+    tags POI ; les noms POI / vitals s'y ajoutent une fois ces sources lues, cf.
+    Indexes.locale_keys).
+    """
+    items: Set[str] = set()
+    poi: Set[str] = set()
+    vitals: Set[str] = set()
+    loc: Set[str] = set()
+    for r in rows or ():
+        items.update(k for k in (r['item_reward'], r['item_reward_name']) if k)
+    for row in task_index.values():
+        item = str(row.get('ItemName') or '').strip()
+        if item:
+            items.add(item)
+        tag = str(row.get('TP_DescriptionTag') or '').strip()
+        if tag:
+            loc.add(_desc_key_from_tag(tag).lower())
+        poi_tag = str(row.get('POITag') or '').strip()
+        if poi_tag:
+            cands = _poi_candidates(poi_tag)
+            poi.update(cands)
+            loc.add(_desc_key_from_tag(cands[0]).lower())
+        vc_id = str(row.get('ItemDropVC') or '').strip()
+        if vc_id:
+            vitals.add(vc_id.lower())
+    return {'items': items, 'poi': poi, 'vitals': vitals, 'locale': loc}
+
+
+# Helper pour récupérer l'ID de tâche dans une ligne brute (clé "Task ID"/"ID", etc.)
+def task_id_from_row(row: dict) -> str:
+    for k in row.keys():
+        if re.match(r'^\s*(Task\s*ID|ID|TaskId|TaskID)\s*$', str(k), re.I):
+            val = str(row.get(k) or "").strip()
+            if val:
+                return val
+    return ""
+
+def to_int_safe(x):
+    try:
+        if x is None or (isinstance(x, float) and math.isnan(x)): return None
+        if isinstance(x, bool): return int(x)
+        s = str(x).strip()
+        if s.lower() in ('true','false','nan','none',''): return None
+        return int(float(s))
+    except Exception:
+        return None
+
+token_re = re.compile(r"[A-Za-z0-9_\\-]+")
+
+# Support : !TOKEN, TOKEN, opérateurs &&, ||, parenthèses (on considère le ! immédiat)
+def parse_logic(expr: str):
+    out = []
+    if not isinstance(expr, str) or not expr.strip():
+        return out
+    for raw in re.findall(r'!?[A-Za-z0-9_\\-]+', expr):
+        is_neg = raw.startswith('!')
+        tok = raw[1:] if is_neg else raw
+        out.append((tok, is_neg))
+    return out
+
+def split_task_ids(task_field: str) -> List[str]:
+    """IDs de tâches d'une quête (colonne 'Task'), dédupliqués dans l'ordre."""
+    out: List[str] = []
+    seen_tids: Set[str] = set()
+    for tok in re.split(r'[,\|; \t]+', task_field) if task_field else []:
+        tid = tok.strip()
+        if not tid or tid in seen_tids:
+            continue
+        seen_tids.add(tid)
+        out.append(tid)
+    return out
+
+# ---------- Index de référence ----------
+class Indexes:
+    """
+    Index d'un build : tâches (TaskID -> ligne), items (par ID / par nom en minuscules),
+    locale, POI (tag -> nom/icône/territoire), vitals (ID -> nom/isNamed).
+    Porte aussi les mémos de résolution des descriptions, par TaskID : valables tant que
+    les index ne changent pas ; après une modification, appeler reset_memos().
+    """
+
+    def __init__(self, task_index: Optional[Dict[str, dict]] = None, items_by_id: Optional[Dict[str, dict]] = None,
+                 items_by_name: Optional[Dict[str, dict]] = None, locale: Optional[LocaleIndex] = None,
+                 poi_tags: Optional[Dict[str, dict]] = None, vitals: Optional[Dict[str, dict]] = None):
+        self.task_index: Dict[str, dict] = task_index if task_index is not None else {}
+        self.items_by_id: Dict[str, dict] = items_by_id if items_by_id is not None else {}
+        self.items_by_name: Dict[str, dict] = items_by_name if items_by_name is not None else {}
+        self.locale: LocaleIndex = as_locale_index(locale)
+        self.poi_tags: Dict[str, dict] = poi_tags if poi_tags is not None else {}
+        self.vitals: Dict[str, dict] = vitals if vitals is not None else {}
+        # POI / vitals lus, noms non résolus (indépendants de la locale, cf. for_locale)
+        self.poi_records: Dict[str, dict] = {}
+        self.vitals_records: Dict[str, dict] = {}
+        # clés référencées par les tâches (cf. referenced_keys) si les sources ont été filtrées
+        self.refs: Optional[Dict[str, Set[str]]] = None
+        # empreinte des sources (cf. load_indexes) : valide les descriptions d'un run précédent
+        self.source_key: Optional[tuple] = None
+        # colonnes "Sub Task*" par jeu de colonnes (toutes les lignes d'un shard ont les mêmes)
+        self._subtask_cols: Dict[tuple, List[str]] = {}
+        self._subtask_adj: Dict[str, Tuple[List[str], Set[str]]] = {}  # tid -> (sous-tâches connues, absentes)
+        self._task_text: Dict[str, Optional[str]] = {}                  # tid -> description rendue (None = rien)
+        self._task_frag: Dict[str, Tuple[List[str], Set[str]]] = {}     # tid -> (descriptions du sous-arbre, deps)
+        self._templates: Dict[str, tuple] = {}                          # chaîne de locale -> segments compilés
+        # valeurs rendues des placeholders par colonnes brutes : {POITags}, {itemName}, {targetName}
+        self._poi_values: Dict[Optional[str], str] = {}
+        self._item_values: Dict[tuple, str] = {}
+        self._vc_values: Dict[tuple, str] = {}
+
+    def reset_memos(self, placeholders: bool = True):
+        """
+        À appeler dès que task_index / locale / items / POI / vitals changent.
+        `placeholders=False` : garde les valeurs de placeholders rendues, qui ne dépendent
+        pas des tâches (seul task_index a changé).
+        """
+        self._subtask_adj.clear()
+        self._task_text.clear()
+        self._task_frag.clear()
+        if placeholders:
+            self.reset_placeholder_values()
+
+    def reset_placeholder_values(self):
+        self._poi_values.clear()
+        self._item_values.clear()
+        self._vc_values.clear()
+
+    def locale_get(self, key: str) -> str:
+        return self.locale.get(key)
+
+    def locale_keys(self) -> Optional[Set[str]]:
+        """Clés de locale utiles (minuscules) si les sources sont filtrées, sinon None (toutes)."""
+        if self.refs is None:
+            return None
+        keys = set(self.refs['locale'])
+        keys.update(_desc_key_from_tag(r["name_key"]).lower() for r in self.poi_records.values()
+                    if isinstance(r["name_key"], str))
+        keys.update(_desc_key_from_tag(r["name_key"]).lower() for r in self.vitals_records.values() if r["name_key"])
+        return keys
+
+    def set_locale(self, locale: LocaleIndex):
+        """Change de locale : noms POI / vitals re-résolus depuis les enregistrements lus."""
+        self.locale = locale
+        self.poi_tags = resolve_poi_names(self.poi_records, locale)
+        self.vitals = resolve_vitals_names(self.vitals_records, locale)
+        self.reset_placeholder_values()
+
+    def for_locale(self, locale: Optional[LocaleIndex] = None) -> 'Indexes':
+        """
+        Index d'une autre langue : tâches, items, POI / vitals lus et sous-tâches déjà
+        résolues partagés (ne dépendent pas de la locale). Sans `locale`, rien n'est résolu.
+        """
+        ix = Indexes(self.task_index, self.items_by_id, self.items_by_name)
+        ix.poi_records, ix.vitals_records, ix.refs = self.poi_records, self.vitals_records, self.refs
+        ix._subtask_cols = self._subtask_cols
+        ix._subtask_adj = self._subtask_adj
+        ix._templates = self._templates
+        if locale is not None:
+            ix.set_locale(locale)
+        return ix
+
+    def subtask_ids(self, row: dict, missing: Optional[Set[str]] = None) -> List[str]:
+        """Sous-tâches connues d'une ligne (colonnes "Sub Task*") ; les absentes vont dans `missing`."""
+        ids: List[str] = []
+        layout = tuple(row)
+        cols = self._subtask_cols.get(layout)
+        if cols is None:
+            cols = self._subtask_cols[layout] = [k for k in layout if isinstance(k, str) and SUBTASK_COL_RE.match(k)]
+        for k in cols:
+            v = row[k]
+            if v is None or (isinstance(v, float) and math.isnan(v)) or str(v).strip() == '':
+                continue
+            for tok in re.split(r'[,\|; \t]+', str(v).strip()):
+                tid = tok.strip()
+                if tid and tid in self.task_index:
+                    ids.append(tid)
+                elif tid and missing is not None:
+                    missing.add(tid)
+        return ids
+
+    def apply_placeholders(self, txt: str, row: dict) -> str:
+        """
+        Remplace {POITags}, {itemName}, {targetName} dans 'txt' à partir des colonnes de 'row'.
+        Pour {itemName}, on injecte un token spécial lisible par le front :
+          {{ITEM::icon=<url>::name=<nom>::drop=<xx%>}}
+        Version de référence (un str.replace par placeholder, rien n'est mémorisé) : le
+        build passe par render_placeholders ; gardée pour tools/bench.py --placeholders.
+        """
+        if not isinstance(txt, str) or not txt:
+            return txt
+        out = txt
+
+        # {POITags}
+        poi_tag = str(row.get('POITag') or '').strip()
+        if '{POITags}' in out and poi_tag:
+            out = out.replace('{POITags}', self._poi_token(poi_tag))
+
+        # {itemName} -> token ITEM
+        if '{itemName}' in out:
+            drop = row.get('ItemDropProbability') if row.get('ItemDropProbability') not in (None, '') else row.get('ChestDropProbability')
+            out = out.replace('{itemName}', self._item_token(str(row.get('ItemName') or '').strip(), drop))
+
+        # {targetName} -> "qty × {{VC::name=...::qty=...::named=0|1}}"
+        if '{targetName}' in out:
+            out = out.replace('{targetName}', self._vc_token(str(row.get('ItemDropVC') or '').strip(),
+                                                             str(row.get('KillEnemyType') or '').strip(),
+                                                             row.get('TargetQty')))
+        return out
+
+    def render_placeholders(self, txt: str, row: dict) -> str:
+        """
+        Même résultat que apply_placeholders, en une passe : chaque chaîne de locale est
+        compilée une fois en segments (cf. compile_template) et chaque valeur de placeholder
+        rendue une fois par jeu de colonnes brutes (tâches qui partagent un POI, un item, une cible).
+        """
+        if not isinstance(txt, str) or '{' not in txt:
+            return txt
+        tpl = self._templates.get(txt)
+        if tpl is None:
+            tpl = self._templates[txt] = compile_template(txt)
+        n = len(tpl)
+        if n == 1:
+            return txt
+        get = row.get
+        if n == 3:
+            return tpl[0] + self._placeholder_value(tpl[1], get) + tpl[2]
+        parts = list(tpl)
+        for i in range(1, n, 2):
+            parts[i] = self._placeholder_value(tpl[i], get)
+        return ''.join(parts)
+
+    def _placeholder_value(self, name: str, get) -> str:
+        """Valeur d'un placeholder pour une ligne de tâche (`get` = row.get), mémorisée par colonnes brutes."""
+        if name == 'POITags':
+            key = get('POITag')
+            tok = self._poi_values.get(key)
+            if tok is None:
+                poi_tag = str(key or '').strip()
+                # sans tag, le placeholder reste tel quel
+                tok = self._poi_values[key] = self._poi_token(poi_tag) if poi_tag else '{POITags}'
+            return tok
+        if name == 'itemName':
+            key = (get('ItemName'), get('ItemDropProbability'), get('ChestDropProbability'))
+            tok = self._item_values.get(key)
+            if tok is None:
+                drop = key[1] if key[1] not in (None, '') else key[2]
+                tok = self._item_values[key] = self._item_token(str(key[0] or '').strip(), drop)
+            return tok
+        key = (get('ItemDropVC'), get('KillEnemyType'), get('TargetQty'))
+        tok = self._vc_values.get(key)
+        if tok is None:
+            tok = self._vc_values[key] = self._vc_token(str(key[0] or '').strip(), str(key[1] or '').strip(), key[2])
+        return tok
+
+    def _poi_token(self, poi_tag: str) -> str:
+        # si plusieurs tags sont listés, on prend le 1er résolu
+        candidates = _poi_candidates(poi_tag)
+        for t in candidates:
+            rec = self.poi_tags.get(t)
+            if rec and (rec.get("name") or rec.get("icon") or rec.get("territoryId") is not None):
+                name = rec.get("name") or t
+                icon = rec.get("icon") or ""
+                tid  = rec.get("territoryId")
+                # Token POI consommé par le front (affiche un badge + lien NWDB zone/tid)
+                return f"{{{{POI::icon={icon}::name={name}::tid={tid}}}}}"
+        # fallback: tentative directe via locale, sinon garder le tag brut
+        return self.locale_get(candidates[0]) or candidates[0]
+
+    def _item_token(self, item_raw: str, drop_raw) -> str:
+        icon, disp, rarity = "", "", ""
+        if item_raw:
+            # résolution via items.csv (par nom, puis par ID)
+            rec = self.items_by_name.get(item_raw.lower()) or self.items_by_id.get(item_raw)
+            if rec:
+                icon = rec.get('icon') or ''
+                disp = rec.get('name') or item_raw
+                rarity = (rec.get('rarity') or '').lower()
+            else:
+                disp = item_raw
+        drop = _format_percent(drop_raw)
+        return f"{{{{ITEM::icon={icon}::name={disp}::drop={drop}::rarity={rarity}}}}}"
+
+    def _vc_token(self, vc_id: str, kill_type: str, raw_qty) -> str:
+        try:
+            if raw_qty is None or (isinstance(raw_qty, float) and math.isnan(raw_qty)):
+                qty_val = ''
+            else:
+                qf = float(raw_qty)
+                qty_val = int(qf) if abs(qf - int(qf)) < 1e-6 else qf
+        except Exception:
+            qty_val = str(raw_qty).strip()
+
+        vc_rec = self.vitals.get(vc_id) or self.vitals.get(vc_id.lower()) if vc_id else None
+        if vc_rec:
+            vc_name = vc_rec.get("name") or vc_id
+            named   = "1" if vc_rec.get("isNamed") else "0"
+        else:
+            # fallback KillEnemyType (non nommé)
+            vc_name = kill_type or 'Target'
+            named   = "0"
+        qty_str = f"{qty_val}" if str(qty_val) != '' else ""
+        vc_url = f"https://nwdb.info/db/creature/{vc_id}" if vc_id else ""
+        return f"{{{{VC::name={vc_name}::qty={qty_str}::named={named}::id={vc_id}::url={vc_url}}}}}"
+
+    def _subtasks_of(self, tid: str) -> Tuple[List[str], Set[str]]:
+        adj = self._subtask_adj.get(tid)
+        if adj is None:
+            missing: Set[str] = set()
+            adj = self._subtask_adj[tid] = (self.subtask_ids(self.task_index[tid], missing), missing)
+        return adj
+
+    def _task_text_of(self, tid: str) -> Optional[str]:
+        if tid not in self._task_text:
+            row = self.task_index[tid]
+            txt = None
+            if not _is_hidden_task(row):
+                tag = str(row.get('TP_DescriptionTag') or '').strip()
+                if tag:
+                    base = self.locale_get(tag) if self.locale else tag
+                    txt = self.render_placeholders(base, row)
+            self._task_text[tid] = txt
+        return self._task_text[tid]
+
+    def collect_desc_texts(self, root: str) -> Tuple[List[str], Set[str]]:
+        """
+        Descriptions (locale résolue, placeholders appliqués) de la tâche `root` et de ses
+        sous-tâches, en préordre, chaque tâche visitée une fois (IsHidden == 1 ignoré).
+        Parcours itératif (pile explicite) ; résultat mémoïsé par TaskID.
+        Retourne aussi les TaskID visités + sous-tâches référencées mais absentes de l'index.
+        """
+        memo = self._task_frag.get(root)
+        if memo is not None:
+            return memo
+        out: List[str] = []
+        visited: Set[str] = set()
+        missing: Set[str] = set()
+        stack = [root]
+        while stack:
+            tid = stack.pop()
+            if tid in visited:
+                continue
+            visited.add(tid)
+            txt = self._task_text_of(tid)
+            if txt:
+                out.append(txt)
+            children, absent = self._subtasks_of(tid)
+            missing |= absent
+            stack.extend(reversed(children))
+        memo = self._task_frag[root] = (out, visited | missing)
+        return memo
+
+    def resolve_task_desc_texts(self, task_ids: List[str]) -> Tuple[List[str], Set[str]]:
+        """
+        Descriptions finales (avec placeholders appliqués) des tâches d'une quête.
+        Retourne aussi les TaskID dont le résultat dépend (tâches visitées + références absentes).
+        """
+        # Concaténer les sous-arbres mémoïsés puis dédupliquer les textes revient au parcours
+        # avec un `visited` commun à la quête : une tâche déjà vue n'apporte que des textes déjà vus.
+        desc_texts: list[str] = []
+        deps: Set[str] = set(t for t in task_ids if t not in self.task_index)
+        for tid in task_ids:
+            if isinstance(self.task_index.get(tid), dict):
+                texts, tdeps = self.collect_desc_texts(tid)
+                desc_texts.extend(texts)
+                deps |= tdeps
+        # de-dupe en préservant l'ordre
+        seen_txt: set[str] = set()
+        flat_txt: list[str] = []
+        for s in desc_texts:
+            if s not in seen_txt:
+                seen_txt.add(s)
+                flat_txt.append(s)
+        return flat_txt, deps
+
+# ---------- Chargement groupé ----------
+def load_indexes(items_csv: Optional[str] = None, objective_tasks_path: Optional[str] = None,
+                 locale_json: Optional[str] = None, poi_dir: Optional[str] = None, vitals_json: Optional[str] = None,
+                 cache: Optional[BuildCache] = None, jobs: int = 1, changed: Optional[Set[str]] = None,
+                 shard_report: bool = False, prof: Optional[PhaseProfiler] = None,
+                 shards: Optional[Dict[str, Dict[str, dict]]] = None, referenced_only: bool = False,
+                 rows: Optional[List[dict]] = None) -> Indexes:
+    """
+    Charge les index de référence ; chaque source est optionnelle (None = index vide).
+    Avec `cache`, les sources inchangées sont relues depuis le cache disque, `changed`
+    reçoit les TaskID modifiés depuis le run précédent et `source_key` identifie le jeu
+    de sources (validité des descriptions mémorisées d'un run à l'autre).
+    `shards` : cf. load_objective_tasks_many.
+    `referenced_only` : items, POI, vitals et locale réduits aux clés référencées par les
+    quêtes `rows` et les tâches chargées (cf. referenced_keys) ; la sortie est la même.
+    """
+    prof = prof or PhaseProfiler()
+    ix = Indexes()
+    cached = cache is not None and cache.enabled
+
+    with prof.phase('task_index') as ph:
+        if objective_tasks_path is not None:
+            ix.task_index = load_objective_tasks_many(objective_tasks_path, cache, changed, jobs=jobs,
+                                                      shard_report=shard_report, shards=shards)
+        ph.count(len(ix.task_index), 'tâches')
+
+    # 2 passes : clés référencées par les quêtes et les tâches, puis seules les lignes /
+    # entrées correspondantes des autres sources sont gardées
+    ix.refs = referenced_keys(ix.task_index, rows) if referenced_only else None
+
+    items_key = ""
+    with prof.phase('items') as ph:
+        if items_csv and os.path.isfile(items_csv):
+            only = ix.refs and ix.refs['items']
+            try:
+                parse = partial(load_items, only=only)
+                ix.items_by_id, ix.items_by_name = cache.load('items', items_csv, parse, deps=_keys_digest(only)) \
+                    if cache else parse(items_csv)
+                items_key = cache.fingerprint(items_csv)[2] if cached else ""
+                if only is not None:
+                    print(f"[OK] Items chargés: {len(ix.items_by_id):,} par ID, {len(ix.items_by_name):,} par nom "
+                          f"(filtrés sur {len(only):,} référence(s))")
+            except Exception as ex:
+                print(f"[items.csv] lecture impossible: {ex}")
+        ph.count(len(ix.items_by_id), 'items')
+
+    with prof.phase('poi_defs') as ph:
+        ix.poi_records = load_poi_records(poi_dir, cache, ix.refs and ix.refs['poi']) if poi_dir else {}
+        ph.count(len(ix.poi_records), 'tags')
+
+    with prof.phase('vitals') as ph:
+        ix.vitals_records = load_vitals_records(vitals_json, cache, ix.refs and ix.refs['vitals']) \
+            if vitals_json else {}
+        ph.count(len(ix.vitals_records), 'entrées')
+
+    locale_key = ""
+    with prof.phase('locale') as ph:
+        locale = LocaleIndex()
+        if locale_json is not None:
+            keys = ix.locale_keys()
+            try:
+                parse = partial(load_locale, only=keys)
+                locale = cache.load('locale', locale_json, parse, deps=_keys_digest(keys)) if cache \
+                    else parse(locale_json)
+                locale_key = cache.fingerprint(locale_json)[2] if cached else ""
+                print(f"[OK] Locale chargé: {len(locale):,} entrées depuis {locale_json}"
+                      + (f" ({locale.entries_read:,} lues, filtrées sur les clés référencées)" if keys is not None else "")
+                      + (f" ({locale.collisions} clé(s) en double à la casse près)" if locale.collisions else ""))
+            except Exception as e:
+                print(f"[WARN] Impossible de charger le fichier locale {locale_json}: {e}")
+        ix.set_locale(locale)
+        ph.count(len(ix.locale), 'entrées')
+
+    if cached:
+        poi_files = sorted(glob.glob(os.path.join(poi_dir, "javelindata_poidefinitions_*.json"))) if poi_dir else []
+        ix.source_key = (items_key, locale_key,
+                         os.path.abspath(objective_tasks_path) if objective_tasks_path else "",
+                         tuple(cache.fingerprint(fp)[2] for fp in poi_files),
+                         cache.fingerprint(vitals_json)[2] if vitals_json and os.path.isfile(vitals_json) else "")
+    return ix
+
+def achievement_index(rows: Iterable[dict]) -> Dict[str, set]:
+    """Index achievement -> questId, uniquement sur les quêtes conservées."""
+    ach_to_q: Dict[str, set] = {}
+    for r in rows:
+        ach, qid = r['achievement_id'], r['id']
+        if ach:
+            ach_to_q.setdefault(ach, set()).add(qid)
+    return ach_to_q
+
+def is_main_story(q: dict) -> bool:
+    return q["type"].strip().lower() == "main story quest"
+
+def build_quest_record(r: dict, ix: Indexes, ach_to_q: Dict[str, set], edges: list,
+                       desc_memo: Optional[Dict[str, tuple]] = None) -> Tuple[dict, bool]:
+    """
+    Une quête (sans sa priorité finale) à partir d'une ligne de load_quest_rows ; ses
+    arêtes sont ajoutées à `edges`. Retourne (quête, description recalculée ?).
+    """
+    recomputed = False
+    qid = r['id']
+    q = {
+        "id": qid,
+        "title": r['title'],
+        "description": r['description'],
+        "type": r['type'],
+        "icon": r['icon'],
+        "recommended_level": r['recommended_level'],
+        "required_level": r['required_level'],
+        "zone_id": r['zone_id'],
+        "rewards": [],
+        "achievement_id": r['achievement_id'] or None,
+        "required_achievements_expr": r['required_expr'] or None,
+        "prerequisites": [],
+        "not_prerequisites": [],
+        "repeatable": False,
+        "priority": 1,
+        "tasks": []
+    }
+
+    # Rewards
+    exp = r['exp'] or 0
+    az  = r['azoth'] or 0
+    coin = r['coin'] or 0
+    standing = r['standing'] or 0
+    faction_influence  = r['faction_influence'] or 0
+    faction_reputation  = r['faction_reputation'] or 0
+    faction_tokens  = r['faction_tokens'] or 0
+    q["experience_reward"] = exp
+    q["azoth_reward"] = az
+    q["currency_reward"] = coin
+    q["territory_standing"] = standing
+    q["faction_influence"] = faction_influence
+    q["faction_reputation"] = faction_reputation
+    q["faction_tokens"] = faction_tokens
+    if exp > 0: q["rewards"].append(f"XP +{exp}")
+    if az  > 0: q["rewards"].append(f"Azoth +{az}")
+    if coin> 0: q["rewards"].append(f"Coin +{coin}")
+    if standing > 0: q["rewards"].append(f"Territory Standing +{standing}")
+    # ---- Items de récompense (peuvent être 0, 1 ou 2) ----
+    item_id_raw   = r['item_reward']
+    item2_name_raw = r['item_reward_name']
+    item2_qty      = r['item_reward_qty'] or 0  # qty liée au *Name* seulement
+
+    # Résolutions
+    resolved_by_id = ix.items_by_id.get(item_id_raw) if item_id_raw else None
+    # "Item Reward Name" contient en réalité un *ID* d'item : on essaie par ID d'abord, puis par nom en fallback
+    resolved_item2 = (
+        ix.items_by_id.get(item2_name_raw) or
+        (ix.items_by_name.get(item2_name_raw.lower()) if item2_name_raw else None)
+    ) if item2_name_raw else None
+
+    # Nouveau format : liste d’objets item_rewards
+    q["item_rewards"] = []
+    if item_id_raw:
+        q["item_rewards"].append({
+            "id": item_id_raw,
+            "name": (resolved_by_id.get("name") if resolved_by_id else item_id_raw),
+            "icon": (resolved_by_id.get("icon") if resolved_by_id else None),
+            "rarity": (resolved_by_id.get("rarity") if resolved_by_id else None),
+            "qty": None  # pas de quantité liée à "Item Reward" (ID)
+        })
+    if item2_name_raw:
+        q["item_rewards"].append({
+            "id":    (resolved_item2.get("id")    if resolved_item2 else None),
+            "name":  (resolved_item2.get("name")  if resolved_item2 else item2_name_raw),
+            "icon":  (resolved_item2.get("icon")  if resolved_item2 else None),
+            "rarity":(resolved_item2.get("rarity")if resolved_item2 else None),
+            "qty":   (item2_qty if item2_qty and item2_qty > 1 else None)
+        })
+
+    # Fallback compat’ avec l’existant (on privilégie l’item par *Name* s’il existe)
+    chosen = (q["item_rewards"][1] if len(q["item_rewards"]) > 1 else (q["item_rewards"][0] if q["item_rewards"] else None))
+    q["item_reward"]                 = (chosen.get("id") if chosen else (item_id_raw or ""))
+    q["item_reward_name"]            = (item2_name_raw or "")
+    q["item_reward_qty"]             = (item2_qty or 0)
+    q["item_reward_resolved_name"]   = (chosen.get("name") if chosen else (item2_name_raw or item_id_raw))
+    q["item_reward_icon"]            = (chosen.get("icon") if chosen else None)
+    q["item_reward_rarity"]          = (chosen.get("rarity") if chosen else None)
+
+    # Texte récap dans q["rewards"] (laisser simple)
+    if q["item_rewards"]:
+        for it in q["item_rewards"]:
+            label = it["name"]
+            if it.get("qty"):
+                label += f" x{it['qty']}"
+            q["rewards"].append(label)
+
+    task_field = r['task']
+    task_ids = split_task_ids(task_field)
+    # Les lignes ObjectiveTasks sont résolues à l'écriture (cf. build_task_table) :
+    # un ID absent de task_index est gardé tel quel pour debug/affichage
+    q["tasks"] = task_ids
+
+    # ----- Descriptions finales (avec placeholders appliqués) -----
+    memo = desc_memo.get(qid) if desc_memo is not None else None
+    if memo is not None and memo[0] == task_field:
+        q["task_desc_texts"] = list(memo[2])
+    else:
+        texts, deps = ix.resolve_task_desc_texts(task_ids)
+        q["task_desc_texts"] = texts
+        recomputed = True
+        if desc_memo is not None:
+            desc_memo[qid] = (task_field, deps, texts)
+
+    # Repeatable via "Schedule Id" (Hourly/Daily)
+    sched = r['schedule']
+    if isinstance(sched, str) and ('hourly' in sched.lower() or 'daily' in sched.lower()):
+        q["repeatable"] = True
+
+    # Prérequis logiques : AST de l'expression (&&, ||, !, parenthèses), puis une arête
+    # par feuille — négative sous un nombre impair de '!', "alternative" sous un '||'
+    req = q["required_achievements_expr"]
+    if req:
+        try:
+            ast = parse_expr(req)
+            lits = list(literals(ast))
+        except LogicSyntaxError as ex:
+            print(f"[WARN] Expression invalide ({qid}): {ex} — approximation par jetons")
+            ast = None
+            lits = [(tok, is_neg, False) for tok, is_neg in parse_logic(req)]
+        q["required_achievements_ast"] = ast
+        seen_pos, seen_neg = set(), set()
+        required_pos = set()
+        for tok, is_neg, optional in lits:
+            if tok in ach_to_q:
+                if not is_neg and not optional:
+                    required_pos.update(ach_to_q[tok])
+                for src in ach_to_q[tok]:
+                    if src == qid:
+                        continue  # pas d'auto-lien
+                    if is_neg:
+                        if src not in seen_neg:
+                            q["not_prerequisites"].append(src)
+                            edges.append((src, qid, True))   # True = négatif
+                            seen_neg.add(src)
+                    else:
+                        if src not in seen_pos:
+                            q["prerequisites"].append(src)
+                            edges.append((src, qid, False))  # False = positif
+                            seen_pos.add(src)
+        alternatives = [src for src in q["prerequisites"] if src not in required_pos]
+        if alternatives:
+            q["alternative_prerequisites"] = alternatives
+
+    return q, recomputed
+
+def build_quest_records(rows: List[dict], ix: Indexes,
+                        desc_memo: Optional[Dict[str, tuple]] = None) -> Tuple[List[dict], list, int]:
+    """
+    Construit les quêtes (triées par priorité) et les arêtes issues des expressions d'achievements.
+    `desc_memo` : qid -> (task_field, deps, texts) ; les entrées valides sont réutilisées,
+    les autres recalculées et mises à jour en place. Retourne (quests, edges, nb recalculées).
+    """
+    ach_to_q = achievement_index(rows)
+    quests = []
+    edges = []
+    recomputed = 0
+    for r in rows:
+        q, fresh = build_quest_record(r, ix, ach_to_q, edges, desc_memo)
+        recomputed += fresh
+        quests.append(q)
+
+    # quêtes principales d'abord, ordre du CSV conservé (tri stable)
+    for q in quests:
+        if is_main_story(q):
+            q["priority"] = 0
+
+    quests.sort(key=lambda x: x["priority"])
+    return quests, edges, recomputed
+
+def build_task_table(quests: List[dict], task_index: Dict[str, dict]) -> Dict[str, dict]:
+    """
+    Table des tâches référencées par les quêtes (schéma 2) : une entrée par TaskID,
+    dans l'ordre de première référence, sans les colonnes nulles.
+    """
+    table: Dict[str, dict] = {}
+    for q in quests:
+        for tid in q["tasks"]:
+            if tid not in table and tid in task_index:
+                table[tid] = {k: v for k, v in task_index[tid].items() if v is not None}
+    return table
+
+def embed_task_rows(quests: List[dict], task_index: Dict[str, dict]) -> None:
+    """Schéma 1 : remplace les IDs de tâches par {"task_id", "data"} (ligne complète)."""
+    for q in quests:
+        q["tasks"] = [{"task_id": tid, "data": task_index[tid]} if tid in task_index else {"task_id": tid}
+                      for tid in q["tasks"]]
+
+def load_manual_levels(manual_path: str = MANUAL_PATH) -> Dict[str, int]:
+    """Niveaux requis manuels (clé "requiredLevels"), utilisés si le CSV n'en a pas."""
+    if not os.path.isfile(manual_path):
+        return {}
+    try:
+        with open(manual_path, 'r', encoding='utf-8') as f:
+            return {str(k): int(v) for k, v in ((json.load(f).get("requiredLevels")) or {}).items()}
+    except Exception as ex:
+        print(f"[manual_links] requiredLevels illisibles dans {manual_path}: {ex}")
+        return {}
+
+def load_manual_links(manual_path: str = MANUAL_PATH) -> List[Tuple[str, str, bool]]:
+    """Liens manuels (clé "links") : (source, cible, négatif), dans l'ordre du fichier."""
+    if not os.path.isfile(manual_path):
+        return []
+    try:
+        with open(manual_path, 'r', encoding='utf-8') as f:
+            manual = json.load(f)
+        links = []
+        for link in (manual.get("links") or []):
+            src = str(link.get("source", "")).strip()
+            tgt = str(link.get("target", "")).strip()
+            kind = str(link.get("type", "requires")).strip().lower()  # default = requires
+            if not src or not tgt or src == tgt:
+                continue
+            links.append((src, tgt, kind in ("not", "negative", "forbid")))
+        return links
+    except Exception as ex:
+        print(f"[manual_links] erreur de lecture {manual_path}: {ex}")
+        return []
+
+def add_manual_link(target_q: dict, src: str, negative: bool, edges: list):
+    # initialise les listes si besoin
+    target_q.setdefault("prerequisites", [])
+    target_q.setdefault("not_prerequisites", [])
+    field = "not_prerequisites" if negative else "prerequisites"
+    if src not in target_q[field]:
+        target_q[field].append(src)
+        edges.append((src, target_q["id"], negative))  # True = négatif
+
+def apply_manual_links(quests: List[dict], edges: list, manual_path: str = MANUAL_PATH):
+    id_to_q = {q["id"]: q for q in quests}
+    for src, tgt, negative in load_manual_links(manual_path):
+        if src not in id_to_q or tgt not in id_to_q:
+            print(f"[manual_links] ignoré (id absent): {src} -> {tgt}")
+            continue
+        add_manual_link(id_to_q[tgt], src, negative, edges)
+
+
+# ---------- Build complet ----------
+def build_quests(rows: List[dict], ix: Indexes, schema: int = SCHEMA_VERSION, analysis: bool = True,
+                 drop_cycles: bool = False, layout: bool = True, manual_path: str = MANUAL_PATH,
+                 desc_memo: Optional[Dict[str, tuple]] = None, prof: Optional[PhaseProfiler] = None,
+                 stats: Optional[dict] = None, layout_memo: Optional[Dict[tuple, tuple]] = None) -> dict:
+    """
+    Structure complète de quests.json (non écrite) à partir des lignes de load_quest_rows()
+    et des index : quêtes, liens manuels, analyse du graphe (clé "graph"), layout
+    précalculé (clé "layout"), puis table des tâches (schéma 2) ou lignes recopiées (schéma 1).
+    `desc_memo` / `layout_memo` : descriptions par quête et layouts par vue des builds
+    précédents (cf. build_quest_records, compute_layouts), réutilisés s'ils sont valides.
+    `stats`, si fourni, reçoit 'recomputed' (descriptions recalculées), 'layout_seconds'
+    et 'layout_views' (vues recalculées / total).
+    """
+    prof = prof or PhaseProfiler()
+    # quêtes + descriptions (les descriptions dominent ce coût)
+    with prof.phase('descriptions') as ph:
+        quests, edges, recomputed = build_quest_records(rows, ix, desc_memo)
+        ph.count(len(quests), 'quêtes')
+    with prof.phase('manual_links') as ph:
+        apply_manual_links(quests, edges, manual_path)
+        ph.count(len(edges), 'arêtes')
+    graph_summary = None
+    if analysis:
+        with prof.phase('analysis') as ph:
+            graph_summary = analyze_graph(quests, edges, drop_cycles=drop_cycles)
+            ph.count(len(quests), 'quêtes')
+
+    data = {
+        "generated_at": datetime.datetime.utcnow().isoformat()+"Z",
+        "quest_count": len(quests),
+        "edge_count": len(edges),
+        "quests": quests
+    }
+    if graph_summary is not None:
+        data["graph"] = graph_summary
+    layout_seconds = 0.0
+    layout_views = (0, 0)
+    if layout:
+        t0 = time.perf_counter()
+        before = dict(layout_memo) if layout_memo is not None else {}
+        with prof.phase('layout') as ph:
+            data["layout"] = compute_layouts(quests, load_manual_levels(manual_path), memo=layout_memo)
+            ph.count(sum(len(v) for v in data['layout'].values()), 'vues')
+        layout_seconds = time.perf_counter() - t0
+        total = sum(len(v) for v in data['layout'].values())
+        reused = sum(1 for d, views in data['layout'].items() for k, v in views.items()
+                     if before.get((d, k), (None, None))[1] is v)
+        layout_views = (total - reused, total)
+    if schema >= 2:
+        data = {"schema_version": schema, **data, "tasks": build_task_table(quests, ix.task_index)}
+    else:
+        embed_task_rows(quests, ix.task_index)
+    if stats is not None:
+        stats.update(recomputed=recomputed, layout_seconds=layout_seconds, layout_views=layout_views)
+    return data
+
+
+# ---------- Variantes par locale ----------
+# Seules les descriptions de tâches (et les noms POI / vitals qu'elles incluent) dépendent
+# de la locale : lignes, graphe, analyse, layout et table des tâches sont calculés une fois
+# par build_quests() puis partagés par toutes les langues, comme les POI / vitals lus
+# (seuls leurs noms sont re-résolus).
+_LOCALE_WORKER: dict = {}
+
+def _init_locale_worker(base: Indexes, quest_tasks: List[Tuple[str, List[str]]]):
+    _LOCALE_WORKER.update(base=base, quest_tasks=quest_tasks)
+
+def locale_desc_texts(base: Indexes, locale_json: str,
+                      quest_tasks: List[Tuple[str, List[str]]]) -> Dict[str, List[str]]:
+    """Descriptions de tâches par quête (qid -> textes) avec la locale `locale_json`."""
+    ix = base.for_locale(load_locale(locale_json, only=base.locale_keys()))
+    return {qid: ix.resolve_task_desc_texts(tids)[0] for qid, tids in quest_tasks}
+
+def _timed_locale_texts(item: Tuple[str, str]):
+    """
+    Worker (process pool) : (lang, textes, secondes, erreur, log) — pas d'exception à
+    travers le pool ; les messages des loaders sont rendus au parent, qui les affiche
+    dans l'ordre des locales plutôt qu'entremêlés.
+    """
+    lang, path = item
+    w = _LOCALE_WORKER
+    t0 = time.perf_counter()
+    log = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(log):
+            texts = locale_desc_texts(w['base'], path, w['quest_tasks'])
+        return lang, texts, time.perf_counter() - t0, None, log.getvalue()
+    except Exception as e:
+        return lang, None, time.perf_counter() - t0, str(e), log.getvalue()
+
+def localize(data: dict, texts: Dict[str, List[str]]) -> dict:
+    """
+    Copie de `data` (build_quests) avec les descriptions de `texts` : seules les quêtes
+    sont copiées (superficiellement), graphe / layout / table des tâches sont partagés.
+    """
+    quests = [{**q, "task_desc_texts": texts.get(q["id"], q["task_desc_texts"])} for q in data["quests"]]
+    return {**data, "quests": quests}
+
+def build_locale_variants(data: dict, base: Indexes, locales: Dict[str, str], jobs: int = 1) -> Dict[str, dict]:
+    """
+    Variantes de `data` (construit avec `base`) pour chaque locale (lang -> fichier JSON),
+    en parallèle sur `jobs` processus. Les locales illisibles sont signalées et omises.
+    """
+    quest_tasks = [(q["id"], [t if isinstance(t, str) else t["task_id"] for t in q["tasks"]])
+                   for q in data["quests"]]
+    items = list(locales.items())
+    # sans la locale ni les mémos de textes de `base` : rien d'inutile à sérialiser
+    shared = base.for_locale()
+    workers = min(max(1, jobs), len(items))
+    if workers > 1:
+        # l'index partagé est envoyé une fois par processus, pas une fois par locale
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_locale_worker,
+                                 initargs=(shared, quest_tasks)) as ex:
+            results = list(ex.map(_timed_locale_texts, items))
+    else:
+        _init_locale_worker(shared, quest_tasks)
+        try:
+            results = [_timed_locale_texts(it) for it in items]
+        finally:
+            _LOCALE_WORKER.clear()
+    out: Dict[str, dict] = {}
+    for lang, texts, dt, err, log in results:
+        print(log, end="")
+        if err is not None:
+            print(f"[WARN] Locale {lang} ({locales[lang]}) ignorée: {err}")
+            continue
+        out[lang] = localize(data, texts)
+        print(f"[OK] Locale {lang}: descriptions résolues en {dt * 1000:.0f} ms")
+    return out
@@ -0,0 +1,148 @@
+# Mode --stream du convertisseur : CSV des quêtes lu par blocs, quêtes écrites au fil de l'eau
+#
+# Le build normal garde tout le CSV (DataFrame puis lignes), toutes les quêtes et toutes
+# les arêtes jusqu'au json.dump final. Ici la mémoire ne dépend plus du nombre de quêtes
+# (seuls restent les index de référence : tâches, items, locale, POI, vitals) :
+#
+#  1. passe légère (ID, Type, Achievement Id) : exclusions, index achievement -> quêtes
+#     (nécessaire pour résoudre les prérequis d'une quête avant d'avoir lu les suivantes)
+#  2. passe complète par blocs : chaque quête est construite (build_quest_record), ses
+#     liens manuels appliqués, puis écrite — les quêtes principales directement dans la
+#     sortie, les autres dans un fichier tampon recopié ensuite : même ordre que le tri
+#     par priorité du build normal (quêtes principales d'abord, ordre du CSV sinon)
+#  3. quest_count, edge_count, puis table des tâches (schéma 2) : seuls les TaskID
+#     référencés sont gardés pendant la passe 2
+#
+# Sortie : même contenu que build_quests(..., analysis=False, layout=False) — l'analyse du
+# graphe et le layout ont besoin du graphe entier (le front relance alors ELK) ; clés de
+# tête dans un autre ordre (compteurs après les quêtes). Écriture dans un fichier
+# temporaire renommé à la fin, comme write_outputs.
+import os, json, shutil, datetime, tempfile
+from typing import Dict, List, Optional, Tuple
+
+from output_formats import compress_file_variants
+from quest_pipeline import (MANUAL_PATH, QUEST_CHUNK_ROWS, SCHEMA_VERSION, Indexes, add_manual_link,
+                            build_quest_record, is_main_story, iter_quest_rows, load_manual_links)
+from profiler import PhaseProfiler
+
+
+class _EdgeCounter:
+    """Remplace la liste d'arêtes de build_quest_record : seul leur nombre est écrit."""
+
+    def __init__(self):
+        self.count = 0
+
+    def append(self, _edge):
+        self.count += 1
+
+
+class _Encoder:
+    """Encodage d'une valeur à une profondeur donnée, identique à json.dumps(data, indent=2) global."""
+
+    def __init__(self, minify: bool):
+        self.minify = minify
+        self.nl = '' if minify else '\n'
+
+    def value(self, obj, level: int) -> str:
+        if self.minify:
+            return json.dumps(obj, ensure_ascii=False, separators=(',', ':'))
+        return json.dumps(obj, ensure_ascii=False, indent=2).replace('\n', '\n' + '  ' * level)
+
+    def item_sep(self, level: int) -> str:
+        return ',' + self.nl + ('' if self.minify else '  ' * level)
+
+    def key(self, k: str, level: int) -> str:
+        return ('' if self.minify else '  ' * level) + json.dumps(k) + (':' if self.minify else ': ')
+
+
+def scan_quest_ids(csv_path: str, chunksize: int = QUEST_CHUNK_ROWS) -> Tuple[set, Dict[str, set]]:
+    """Passe légère : ids conservés et index achievement -> quêtes."""
+    ids: set = set()
+    ach_to_q: Dict[str, set] = {}
+    for r in iter_quest_rows(csv_path, chunksize, light=True):
+        ids.add(r['id'])
+        if r['achievement_id']:
+            ach_to_q.setdefault(r['achievement_id'], set()).add(r['id'])
+    return ids, ach_to_q
+
+
+def stream_quests(csv_path: str, ix: Indexes, out_path: str, schema: int = SCHEMA_VERSION,
+                  manual_path: str = MANUAL_PATH, chunksize: int = QUEST_CHUNK_ROWS, minify: bool = False,
+                  gz: bool = False, br: bool = False, prof: Optional[PhaseProfiler] = None) -> Tuple[List[dict], dict]:
+    """
+    Écrit out_path (et .gz / .br) en flux ; retourne (fichiers écrits comme write_outputs,
+    stats : quest_count, edge_count, main_story, tasks).
+    """
+    prof = prof or PhaseProfiler()
+    with prof.phase('stream_scan') as ph:
+        ids, ach_to_q = scan_quest_ids(csv_path, chunksize)
+        ph.count(len(ids), 'quêtes')
+
+    links: Dict[str, List[Tuple[str, bool]]] = {}
+    for src, tgt, negative in load_manual_links(manual_path):
+        if src not in ids or tgt not in ids:
+            print(f"[manual_links] ignoré (id absent): {src} -> {tgt}")
+            continue
+        links.setdefault(tgt, []).append((src, negative))
+    del ids
+
+    enc = _Encoder(minify)
+    out_dir = os.path.dirname(out_path) or '.'
+    os.makedirs(out_dir, exist_ok=True)
+    tmp = out_path + '.tmp'
+    edges = _EdgeCounter()
+    # TaskID référencés, dans l'ordre de première référence de la sortie
+    main_tids: Dict[str, None] = {}
+    other_tids: Dict[str, None] = {}
+    n_main = n_other = 0
+    with prof.phase('stream_quests') as ph, open(tmp, 'w', encoding='utf-8') as out, \
+            tempfile.TemporaryFile('w+', encoding='utf-8', dir=out_dir) as spool:
+        out.write('{' + enc.nl)
+        head = {'generated_at': datetime.datetime.utcnow().isoformat() + "Z"}
+        if schema >= 2:
+            head = {'schema_version': schema, **head}
+        for k, v in head.items():
+            out.write(enc.key(k, 1) + enc.value(v, 1) + ',' + enc.nl)
+        out.write(enc.key('quests', 1) + '[')
+        for r in iter_quest_rows(csv_path, chunksize):
+            q, _ = build_quest_record(r, ix, ach_to_q, edges)
+            for src, negative in links.get(q['id'], ()):
+                add_manual_link(q, src, negative, edges)
+            tids = main_tids if is_main_story(q) else other_tids
+            for tid in q['tasks']:
+                if tid in ix.task_index:
+                    tids[tid] = None
+            if schema < 2:
+                q['tasks'] = [{"task_id": tid, "data": ix.task_index[tid]} if tid in ix.task_index
+                              else {"task_id": tid} for tid in q['tasks']]
+            if is_main_story(q):
+                q['priority'] = 0
+                out.write((enc.item_sep(2) if n_main else enc.nl + ('' if minify else '    ')) + enc.value(q, 2))
+                n_main += 1
+            else:
+                spool.write((enc.item_sep(2) if n_other else '') + enc.value(q, 2))
+                n_other += 1
+        if n_other:
+            out.write(enc.item_sep(2) if n_main else enc.nl + ('' if minify else '    '))
+            spool.seek(0)
+            shutil.copyfileobj(spool, out, 1 << 20)
+        out.write((enc.nl + '  ' if n_main + n_other and not minify else '') + '],' + enc.nl)
+        out.write(enc.key('quest_count', 1) + str(n_main + n_other) + ',' + enc.nl)
+        out.write(enc.key('edge_count', 1) + str(edges.count) + (',' if schema >= 2 else '') + enc.nl)
+        if schema >= 2:
+            # même table que build_task_table : ordre de première référence, colonnes nulles retirées
+            order = list(main_tids) + [t for t in other_tids if t not in main_tids]
+            out.write(enc.key('tasks', 1) + '{')
+            for i, tid in enumerate(order):
+                row = {k: v for k, v in ix.task_index[tid].items() if v is not None}
+                out.write((enc.item_sep(2) if i else enc.nl + ('' if minify else '    '))
+                          + json.dumps(tid, ensure_ascii=False) + (':' if minify else ': ') + enc.value(row, 2))
+            out.write((enc.nl + '  ' if order and not minify else '') + '}' + enc.nl)
+        out.write('}')
+        ph.count(n_main + n_other, 'quêtes')
+    os.replace(tmp, out_path)
+    stats = {'quest_count': n_main + n_other, 'edge_count': edges.count, 'main_story': n_main,
+             'tasks': len(set(main_tids) | set(other_tids)) if schema >= 2 else None}
+    with prof.phase('stream_compress'):
+        written = compress_file_variants(out_path, gz=gz, br=br)
+    return written, stats
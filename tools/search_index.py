@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+# Index de recherche précalculé des quêtes (public/data/quests.search.json, --search-index)
+#
+# Index inversé terme -> quêtes, sur l'id, le titre, la description, les textes de
+# tâches résolus et les noms d'objets, de créatures (VC) et de POI qu'ils citent.
+# Termes triés : une recherche par préfixe est une recherche dichotomique + un
+# parcours de plage ; la recherche approchée (fautes de frappe) passe par les
+# trigrammes des termes, calculés au chargement (l'index écrit reste compact), et
+# n'est tentée que pour un mot sans correspondance exacte ni préfixe.
+#
+# Postings : par terme, liste d'entiers (écart avec la quête précédente << 7) | masque
+# des champs où le terme apparaît. Le même algorithme est implémenté côté front
+# (src/utils/searchIndex.ts) ; ce module sert aussi à interroger / mesurer l'index
+# hors navigateur :
+#
+#   python tools/search_index.py public/data/quests.search.json "ancient brige"
+#   python tools/search_index.py public/data/quests.search.json --bench 1000 msq boar
+import re, json, time, heapq, bisect, argparse, unicodedata
+from typing import Dict, List, Optional, Set, Tuple
+
+INDEX_VERSION = 1
+FIELDS = ('id', 'title', 'description', 'tasks', 'items', 'creatures', 'poi')
+WEIGHTS = (6, 10, 2, 1, 3, 3, 3)
+FIELD_BITS = 7
+PREFIX_FACTOR = 0.6
+FUZZY_FACTOR = 0.3
+MIN_PREFIX = 3
+MAX_PREFIX_TERMS = 64
+
+_WORD = re.compile(r'[^\W_]+')
+_CAMEL = re.compile(r'(?<=[a-z])(?=[A-Z])')
+_TOKEN = re.compile(r'\{\{(ITEM|POI|VC)((?:::[^}]*)?)\}\}')
+_TOKEN_FIELDS = {'ITEM': 'items', 'POI': 'poi', 'VC': 'creatures'}
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Mots en minuscules sans accents ; les mots d'une lettre (hors chiffres) sont ignorés.
+    Mêmes règles que tokenize() du front, par catégorie Unicode : marques (M) retirées,
+    mots de lettres et de nombres (L, N : ce que couvre [^\\W_]), mot d'un caractère gardé
+    s'il est un nombre (N).
+    """
+    if not text:
+        return []
+    text = unicodedata.normalize('NFKD', str(text))
+    text = ''.join(c for c in text if unicodedata.category(c)[0] != 'M').lower()
+    return [w for w in _WORD.findall(text) if len(w) > 1 or unicodedata.category(w)[0] == 'N']
+
+
+def parse_tokens(text: str) -> List[Tuple[str, Dict[str, str]]]:
+    """Jetons {{ITEM|POI|VC::clé=valeur::…}} d'un texte de tâche : (type, champs)."""
+    return [(kind, dict(p.split('=', 1) for p in payload.split('::')[1:] if '=' in p))
+            for kind, payload in _TOKEN.findall(text)]
+
+
+def _quest_texts(q: dict) -> Dict[str, List[str]]:
+    """Textes indexés d'une quête, par champ."""
+    out: Dict[str, List[str]] = {f: [] for f in FIELDS}
+    qid = str(q.get('id') or '')
+    out['id'] = [qid.replace('_', ' '), _CAMEL.sub(' ', qid).replace('_', ' ')]
+    out['title'] = [q.get('title') or '']
+    out['description'] = [q.get('description') or '']
+    for text in q.get('task_desc_texts') or ():
+        text = str(text)
+        for kind, kv in parse_tokens(text):
+            field = _TOKEN_FIELDS[kind]
+            out[field] += [kv.get('name', ''), kv.get('id', '') if kind == 'VC' else '']
+        out['tasks'].append(_TOKEN.sub(' ', text))
+    for it in q.get('item_rewards') or ():
+        if isinstance(it, dict):
+            out['items'].append(it.get('name') or '')
+    out['items'].append(q.get('item_reward_resolved_name') or '')
+    return out
+
+
+def build_search_index(quests: List[dict]) -> dict:
+    """Index (structure JSON) des quêtes de build_quests, dans leur ordre."""
+    postings: Dict[str, Dict[int, int]] = {}
+    for doc, q in enumerate(quests):
+        texts = _quest_texts(q)
+        for bit, field in enumerate(FIELDS):
+            for text in texts[field]:
+                for term in tokenize(text):
+                    docs = postings.setdefault(term, {})
+                    docs[doc] = docs.get(doc, 0) | (1 << bit)
+    terms = sorted(postings)
+    encoded = []
+    for term in terms:
+        prev, row = 0, []
+        for doc in sorted(postings[term]):
+            row.append(((doc - prev) << FIELD_BITS) | postings[term][doc])
+            prev = doc
+        encoded.append(row)
+    return {'version': INDEX_VERSION, 'fields': list(FIELDS), 'weights': list(WEIGHTS),
+            'ids': [q['id'] for q in quests], 'titles': [q.get('title') or '' for q in quests],
+            'terms': terms, 'postings': encoded}
+
+
+def _trigrams(term: str) -> Set[str]:
+    padded = f"${term}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _within(a: str, b: str, k: int) -> bool:
+    """Distance de Levenshtein(a, b) <= k (arrêt dès qu'une ligne dépasse k)."""
+    if abs(len(a) - len(b)) > k:
+        return False
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            cur.append(min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb)))
+        if min(cur) > k:
+            return False
+        prev = cur
+    return prev[-1] <= k
+
+
+def max_typos(term: str) -> int:
+    return 0 if len(term) < 4 else 1 if len(term) < 8 else 2
+
+
+class SearchIndex:
+    """Requêtes sur un index produit par build_search_index (ET entre les mots de la requête)."""
+
+    def __init__(self, index: dict):
+        if index.get('version') != INDEX_VERSION:
+            raise ValueError(f"version d'index non supportée: {index.get('version')}")
+        self.ids: List[str] = index['ids']
+        self.titles: List[str] = index['titles']
+        self.terms: List[str] = index['terms']
+        self.weights: List[int] = index['weights']
+        self._postings: List[List[int]] = index['postings']
+        self._grams: Optional[Dict[str, List[int]]] = None
+        self._decoded: Dict[int, Dict[int, int]] = {}
+        # meilleur poids pour chaque masque de champs
+        self._mask_weight = [max((w for b, w in enumerate(self.weights) if m >> b & 1), default=0)
+                             for m in range(1 << FIELD_BITS)]
+
+    @classmethod
+    def load(cls, path: str) -> 'SearchIndex':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _term_weights(self, t: int) -> Dict[int, int]:
+        """Quête -> meilleur poids de champ pour le terme t (postings décodés une fois, gardés)."""
+        got = self._decoded.get(t)
+        if got is None:
+            got, doc, mw, low = {}, 0, self._mask_weight, (1 << FIELD_BITS) - 1
+            for v in self._postings[t]:
+                doc += v >> FIELD_BITS
+                got[doc] = mw[v & low]
+            self._decoded[t] = got
+        return got
+
+    def _fuzzy_terms(self, word: str) -> List[int]:
+        k = max_typos(word)
+        if not k:
+            return []
+        if self._grams is None:
+            grams: Dict[str, List[int]] = {}
+            for t, term in enumerate(self.terms):
+                for g in _trigrams(term):
+                    grams.setdefault(g, []).append(t)
+            self._grams = grams
+        qgrams = _trigrams(word)
+        counts: Dict[int, int] = {}
+        for g in qgrams:
+            for t in self._grams.get(g, ()):
+                counts[t] = counts.get(t, 0) + 1
+        # une faute touche au plus 3 trigrammes
+        need = max(1, len(qgrams) - 3 * k)
+        return [t for t, c in counts.items() if c >= need and _within(word, self.terms[t], k)]
+
+    def expand(self, word: str, fuzzy: bool = True) -> List[Tuple[int, float]]:
+        """Termes de l'index qui correspondent à un mot : (n° de terme, facteur)."""
+        lo = bisect.bisect_left(self.terms, word)
+        out: List[Tuple[int, float]] = []
+        if lo < len(self.terms) and self.terms[lo] == word:
+            out.append((lo, 1.0))
+            lo += 1
+        if len(word) >= MIN_PREFIX:
+            hi = bisect.bisect_left(self.terms, word + '\uffff', lo, min(len(self.terms), lo + MAX_PREFIX_TERMS))
+            out += [(t, PREFIX_FACTOR) for t in range(lo, hi)]
+        if not out and fuzzy:
+            out = [(t, FUZZY_FACTOR) for t in self._fuzzy_terms(word)]
+        return out
+
+    def _word_scores(self, matches: List[Tuple[int, float]]) -> Dict[int, float]:
+        """Quête -> meilleur score d'un mot sur ses termes (dict partagé : ne pas modifier)."""
+        (t0, f0), rest = matches[0], matches[1:]
+        if f0 == 1.0 and not rest:
+            return self._term_weights(t0)
+        scores: Dict[int, float] = {doc: f0 * w for doc, w in self._term_weights(t0).items()}
+        for t, factor in rest:
+            get = scores.get
+            for doc, w in self._term_weights(t).items():
+                if factor * w > get(doc, 0.0):
+                    scores[doc] = factor * w
+        return scores
+
+    def search(self, query: str, limit: int = 20, fuzzy: bool = True) -> List[Tuple[str, float]]:
+        """(id de quête, score) triés par score décroissant ; chaque mot doit correspondre."""
+        words = [self.expand(w, fuzzy) for w in dict.fromkeys(tokenize(query))]
+        if not words or not all(words):
+            return []
+        # mot le plus sélectif d'abord : pour les suivants, on ne consulte que ses quêtes
+        # quand c'est moins coûteux que de décoder tous leurs postings
+        sizes = [sum(len(self._postings[t]) for t, _ in m) for m in words]
+        order = sorted(range(len(words)), key=sizes.__getitem__)
+        # jamais modifié en place : le dict partagé du premier mot peut servir tel quel
+        total = self._word_scores(words[order[0]])
+        for i in order[1:]:
+            if len(total) * len(words[i]) < sizes[i]:
+                weights = [(self._term_weights(t), factor) for t, factor in words[i]]
+                nxt: Dict[int, float] = {}
+                for doc, s in total.items():
+                    best = max(factor * tw.get(doc, 0) for tw, factor in weights)
+                    if best:
+                        nxt[doc] = s + best
+            else:
+                scores = self._word_scores(words[i])
+                nxt = {d: s + scores[d] for d, s in total.items() if d in scores}
+            total = nxt
+            if not total:
+                return []
+        # à score égal, ordre de découverte (celui des postings du mot le plus sélectif)
+        best = heapq.nlargest(limit, total, key=total.__getitem__)
+        return [(self.ids[d], round(total[d], 3)) for d in best]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Interroge (ou mesure) un index de recherche quests.search.json")
+    ap.add_argument('index')
+    ap.add_argument('queries', nargs='+')
+    ap.add_argument('--limit', type=int, default=10)
+    ap.add_argument('--no-fuzzy', action='store_true', help="pas de recherche approchée")
+    ap.add_argument('--bench', type=int, metavar='N', help="répète chaque requête N fois et affiche le temps moyen")
+    args = ap.parse_args(argv)
+    t0 = time.perf_counter()
+    ix = SearchIndex.load(args.index)
+    print(f"[OK] Index: {len(ix):,} quêtes, {len(ix.terms):,} termes, chargé en {(time.perf_counter() - t0) * 1000:.0f} ms")
+    titles = dict(zip(ix.ids, ix.titles))
+    for q in args.queries:
+        res = ix.search(q, args.limit, fuzzy=not args.no_fuzzy)
+        if args.bench:
+            t0 = time.perf_counter()
+            for _ in range(args.bench):
+                ix.search(q, args.limit, fuzzy=not args.no_fuzzy)
+            per = (time.perf_counter() - t0) / args.bench
+            print(f"{q!r}: {len(res)} résultat(s), {per * 1e6:.0f} µs/requête")
+        else:
+            print(f"{q!r}: {len(res)} résultat(s)")
+        for qid, score in res:
+            print(f"  {score:>6.2f}  {qid}  {titles.get(qid, '')}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+# Sortie découpée de quests.json pour un chargement paresseux côté front (--split)
+#
+#   public/data/quests.manifest.json    quêtes réduites à ce qu'affiche le graphe (id, titre,
+#                                       type, zone, niveaux, prérequis, priorité, profondeur),
+#                                       graphe, layout, arêtes entre parts et table part -> fichier
+#   public/data/quests/<part>.<hash>.json  tous les autres champs (description, tâches,
+#                                       récompenses, expression d'achievements…) des quêtes
+#                                       d'une zone (ou d'un type) ; en schéma 2, avec le
+#                                       sous-ensemble de la table des tâches qu'elles référencent ;
+#                                       découpé par zone, avec le layout de la vue de la zone
+#
+# Manifest et dossier des parts sont nommés d'après la sortie (--out public/data/ptr.json ->
+# ptr.manifest.json, ptr/) : plusieurs sorties peuvent partager un dossier.
+#
+# Le nom de chaque part contient un hash de son contenu : elle peut être servie avec un
+# cache long (immutable), seul le manifest (petit) doit être revalidé. Les parts sont
+# écrites avant le manifest, puis celles qu'aucun manifest de la sortie ne référence sont
+# supprimées : un client qui lit le manifest trouve toujours ses fichiers.
+import os, re, json, glob, hashlib
+from typing import Any, Dict, List, Optional, Tuple
+
+from output_formats import encode_json, write_outputs
+
+SPLIT_KEYS = ('zone', 'type')
+# champs gardés dans le manifest (nœuds et arêtes du graphe) ; le reste va dans les parts
+MANIFEST_FIELDS = ('id', 'title', 'type', 'zone_id', 'required_level', 'recommended_level', 'repeatable',
+                   'priority', 'depth', 'prerequisites', 'not_prerequisites', 'alternative_prerequisites',
+                   'redundant_prerequisites')
+# listes facultatives côté front : dans le manifest seulement si non vides
+OPTIONAL_LISTS = ('not_prerequisites', 'alternative_prerequisites', 'redundant_prerequisites')
+_PART_NAME = re.compile(r'^[0-9A-Za-z_-]+\.[0-9a-f]{12}\.json$')
+
+
+def part_key(quest: dict, by: str) -> str:
+    """Part d'une quête : zone_id ('none' si absent) ou type ('none' si vide)."""
+    value = quest.get('zone_id') if by == 'zone' else quest.get('type')
+    if value is None or value == '':
+        return 'none'
+    return str(value)
+
+
+def _slug(key: str) -> str:
+    return re.sub(r'[^0-9A-Za-z_-]+', '-', key).strip('-').lower() or 'none'
+
+
+def split_data(data: dict, by: str = 'zone') -> tuple:
+    """
+    (manifest, parts) à partir de la structure de build_quests ; parts : clé -> contenu.
+    Le manifest n'a pas encore sa table 'parts' (noms de fichiers), cf. write_split.
+    """
+    if by not in SPLIT_KEYS:
+        raise ValueError(f"découpage inconnu: {by} (attendu: {', '.join(SPLIT_KEYS)})")
+    table = data.get('tasks') if isinstance(data.get('tasks'), dict) else None
+    light: List[dict] = []
+    parts: Dict[str, dict] = {}
+    owner: Dict[str, str] = {}
+    for q in data['quests']:
+        key = part_key(q, by)
+        owner[q['id']] = key
+        part = parts.setdefault(key, {'quests': {}})
+        kept = {f for f in MANIFEST_FIELDS if f in q and not (f in OPTIONAL_LISTS and not q[f])}
+        part['quests'][q['id']] = {k: v for k, v in q.items() if k not in kept}
+        light.append({**{k: v for k, v in q.items() if k in kept}, 'part': key})
+    if table is not None:
+        for part in parts.values():
+            tids = {t for heavy in part['quests'].values() for t in heavy.get('tasks', ()) if isinstance(t, str)}
+            part['tasks'] = {t: table[t] for t in sorted(tids) if t in table}
+
+    # arêtes dont les deux bouts sont dans des parts différentes : le front sait quelles
+    # autres parts charger pour afficher les dépendances d'une zone
+    cross: List[list] = []
+    for q in data['quests']:
+        for field, kind in (('prerequisites', 'pre'), ('not_prerequisites', 'not')):
+            for src in q.get(field) or ():
+                if src in owner and owner[src] != owner[q['id']]:
+                    cross.append([src, q['id'], kind])
+
+    manifest = {k: v for k, v in data.items() if k not in ('quests', 'tasks')}
+    if by == 'zone' and isinstance(data.get('layout'), dict):
+        # vue d'une zone dans la part de la zone (chargée quand on l'affiche) ; 'all' reste
+        layout: Dict[str, dict] = {}
+        for direction, views in data['layout'].items():
+            layout[direction] = {}
+            for view, pos in views.items():
+                if view != 'all' and view in parts:
+                    parts[view].setdefault('layout', {}).setdefault(direction, {})[view] = pos
+                else:
+                    layout[direction][view] = pos
+        manifest['layout'] = layout
+    manifest.update(split_by=by, quests=light, cross_part_edges=cross)
+    if 'schema_version' in data:
+        for part in parts.values():
+            part['schema_version'] = data['schema_version']
+    return manifest, parts
+
+
+def split_paths(out_path: str, lang: Optional[str] = None) -> Tuple[str, str]:
+    """
+    (manifest, dossier des parts) de la sortie out_path : public/data/quests.json ->
+    quests.manifest.json (quests.<lang>.manifest.json pour une locale) et quests/.
+    """
+    stem = os.path.splitext(out_path)[0]
+    return f"{stem}.{lang}.manifest.json" if lang else f"{stem}.manifest.json", stem
+
+
+def _manifests(out_path: str) -> List[str]:
+    """Manifests de la sortie et de ses locales (pas ceux d'une autre sortie du dossier)."""
+    stem = glob.escape(os.path.splitext(out_path)[0])
+    return sorted(glob.glob(stem + '.manifest.json') + glob.glob(stem + '.*.manifest.json'))
+
+
+def write_split(data: dict, out_path: str, by: str = 'zone', lang: Optional[str] = None, minify: bool = False,
+                gz: bool = False, br: bool = False) -> List[dict]:
+    """
+    Écrit le manifest de out_path et ses parts (cf. split_paths) ; même retour que
+    write_outputs (manifest en premier). `lang` donne un manifest par locale, les parts
+    identiques d'une langue à l'autre étant alors partagées (même hash).
+    """
+    manifest_path, parts_dir = split_paths(out_path, lang)
+    manifest, parts = split_data(data, by)
+    written: List[dict] = []
+    entries: Dict[str, dict] = {}
+    for key in sorted(parts):
+        part = {'part': key, **parts[key]}
+        raw = encode_json(part, minify)
+        fname = f"{_slug(key)}.{hashlib.sha1(raw).hexdigest()[:12]}.json"
+        written += write_outputs(part, os.path.join(parts_dir, fname), minify=minify, gz=gz, br=br, raw=raw)
+        entries[key] = {'file': f"{os.path.basename(parts_dir)}/{fname}", 'quests': len(parts[key]['quests']),
+                        'bytes': len(raw)}
+    manifest['parts'] = entries
+    written = write_outputs(manifest, manifest_path, minify=minify, gz=gz, br=br) + written
+    remove_stale_parts(out_path)
+    return written
+
+
+def remove_stale_parts(out_path: str) -> int:
+    """Supprime les parts (et .gz/.br) de out_path qu'aucun de ses manifests ne référence."""
+    keep = set()
+    for fp in _manifests(out_path):
+        try:
+            with open(fp, 'r', encoding='utf-8') as f:
+                keep |= {os.path.basename(e['file']) for e in json.load(f).get('parts', {}).values()}
+        except (OSError, ValueError, KeyError, AttributeError) as e:
+            print(f"[WARN] Manifest illisible: {fp} ({e}) — parts conservées")
+            return 0
+    removed = 0
+    for fp in glob.glob(os.path.join(glob.escape(split_paths(out_path)[1]), '*.json*')):
+        base = os.path.basename(fp)
+        stem = base[:-3] if base.endswith(('.gz', '.br')) else base
+        if _PART_NAME.match(stem) and stem not in keep:
+            os.remove(fp)
+            removed += 1
+    return removed
+
+
+def remove_split(out_path: str) -> List[str]:
+    """
+    Supprime les manifests de out_path (quests.manifest.json, quests.<lang>.manifest.json et
+    leurs .gz/.br) et toutes ses parts : réécrite sans --split, la sortie complète doit être
+    celle que lit le front, qui préfère le manifest s'il existe.
+    """
+    removed = []
+    for fp in _manifests(out_path):
+        for path in (fp, fp + '.gz', fp + '.br'):
+            if os.path.isfile(path):
+                os.remove(path)
+                removed.append(path)
+    parts_dir = split_paths(out_path)[1]
+    n = remove_stale_parts(out_path)
+    if n:
+        removed.append(f"{parts_dir}/ ({n} fichier(s))")
+    if os.path.isdir(parts_dir) and not os.listdir(parts_dir):
+        os.rmdir(parts_dir)
+    return removed
+
+
+def load_split(manifest_path: str) -> Dict[str, Any]:
+    """Recompose la structure complète (comme quests.json) à partir d'un manifest et de ses parts."""
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        manifest = json.load(f)
+    base = os.path.dirname(manifest_path)
+    heavy: Dict[str, dict] = {}
+    table: Dict[str, dict] = {}
+    for entry in manifest.get('parts', {}).values():
+        with open(os.path.join(base, entry['file']), 'r', encoding='utf-8') as f:
+            part = json.load(f)
+        heavy.update(part['quests'])
+        table.update(part.get('tasks', {}))
+        for direction, views in part.get('layout', {}).items():
+            manifest['layout'][direction].update(views)
+    data = {k: v for k, v in manifest.items() if k not in ('split_by', 'quests', 'cross_part_edges', 'parts')}
+    data['quests'] = [{**{k: v for k, v in q.items() if k != 'part'}, **heavy.get(q['id'], {})}
+                      for q in manifest['quests']]
+    if 'schema_version' in manifest:
+        data['tasks'] = table
+    return data
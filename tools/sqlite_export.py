@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+# Export SQLite de la sortie du convertisseur (--sqlite) pour les requêtes ponctuelles
+#
+#   quests          une ligne par quête : champs scalaires en colonnes, listes / objets non
+#                   normalisés (rewards, AST, prérequis redondants…) en texte JSON
+#   quest_tasks     quête -> tâches racines (position)
+#   tasks           toutes les tâches atteignables depuis les quêtes (racines + sous-tâches),
+#                   une colonne par colonne ObjectiveTasks
+#   task_subtasks   tâche -> sous-tâches (colonnes "Sub Task*", position)
+#   edges           arêtes du graphe : kind 'pre' / 'not', alternative, redundant
+#   item_rewards    récompenses d'objets résolues
+#   quest_texts     descriptions de tâches résolues (task_desc_texts)
+#   tokens          jetons {{ITEM|POI|VC::…}} de ces descriptions, un champ par colonne
+#   meta            clés de tête (generated_at, schema_version, graph…) en JSON
+#   quest_task_tree quête -> toutes ses tâches, sous-tâches comprises (profondeur minimale) :
+#                   « quelles quêtes font tuer / ramasser X » sans requête récursive
+#
+# Base écrite dans un fichier temporaire en une transaction (executemany, index créés
+# après les insertions) puis renommée : un lecteur ne voit jamais de base partielle.
+#
+#   sqlite3 quests.sqlite "select id, title from quests where zone_id = 12 and required_level between 10 and 20"
+#   sqlite3 quests.sqlite "select distinct quest_id from quest_task_tree join tasks using (task_id)
+#                          where ItemName = 'CorruptedHeart'"
+import os, json, math, time, sqlite3, argparse
+from typing import Dict, Iterable, List
+
+from quest_delta import read_output
+from search_index import parse_tokens
+
+SQLITE_VERSION = 1
+# colonnes des tâches toujours présentes (indexées, requêtes stables d'un export à l'autre)
+TASK_INDEXED = ('ItemName', 'ItemDropVC', 'POITag', 'KillEnemyType')
+TOKEN_FIELDS = ('icon', 'name', 'drop', 'rarity', 'qty', 'named', 'id', 'url', 'tid')
+# champs de quête ventilés dans leurs propres tables
+NORMALIZED = ('tasks', 'prerequisites', 'not_prerequisites', 'item_rewards', 'task_desc_texts')
+# champs de quête toujours en JSON, même réduits à une chaîne (AST d'un seul littéral)
+JSON_FIELDS = ('required_achievements_ast',)
+
+_INDEXES = (
+    ('quests', ('zone_id',)), ('quests', ('required_level',)), ('quests', ('recommended_level',)),
+    ('quests', ('zone_id', 'required_level')), ('quests', ('achievement_id',)), ('quests', ('type',)),
+    ('quest_tasks', ('task_id',)), ('task_subtasks', ('subtask_id',)), ('quest_task_tree', ('task_id',)),
+    ('tasks', ('ItemName',)), ('tasks', ('ItemDropVC',)), ('tasks', ('POITag',)), ('tasks', ('KillEnemyType',)),
+    ('tasks', ('Type',)),
+    ('edges', ('dst',)), ('item_rewards', ('item_id',)), ('item_rewards', ('name',)),
+    ('tokens', ('kind', 'name')), ('tokens', ('id',)),
+)
+
+
+def _quote(name: str) -> str:
+    return '"' + name.replace('"', '""') + '"'
+
+
+def _value(v):
+    """Valeur Python -> valeur SQLite (NaN -> NULL, bool -> 0/1, listes / objets -> JSON)."""
+    if v is None or (isinstance(v, float) and math.isnan(v)):
+        return None
+    if isinstance(v, bool):
+        return int(v)
+    if isinstance(v, (int, float, str)):
+        return v
+    return json.dumps(v, ensure_ascii=False)
+
+
+def _columns(rows: Iterable[dict], skip: Iterable[str] = (), always: Iterable[str] = ()) -> Dict[str, List[str]]:
+    """
+    Union des clés dans l'ordre d'apparition -> clés qui l'alimentent. SQLite ignore la casse
+    des noms de colonnes : les clés ne différant que par la casse partagent une colonne (le
+    nom rencontré en premier) et leurs valeurs y sont fusionnées (cf. _coalesce).
+    """
+    skipped = {k.lower() for k in skip}
+    by_lower: Dict[str, str] = {}
+    cols: Dict[str, List[str]] = {}
+    for k in list(always) + [k for row in rows for k in row]:
+        low = k.lower()
+        if low in skipped:
+            continue
+        if low not in by_lower:
+            by_lower[low] = k
+            cols[k] = [k]
+        elif k not in cols[by_lower[low]]:
+            cols[by_lower[low]].append(k)
+    return cols
+
+
+def _coalesce(row: dict, keys: List[str]):
+    """Première valeur renseignée de la ligne parmi les variantes de casse d'une colonne."""
+    for k in keys:
+        v = row.get(k)
+        if v is not None and not (isinstance(v, float) and math.isnan(v)):
+            return v
+    return None
+
+
+def _has_columns(cols: Dict[str, List[str]], names: Iterable[str]) -> bool:
+    present = {c.lower() for c in cols}
+    return all(n.lower() in present for n in names)
+
+
+def _task_closure(roots: Iterable[str], ix) -> Dict[str, List[str]]:
+    """Tâches atteignables depuis les racines -> sous-tâches connues (ordre de découverte)."""
+    out: Dict[str, List[str]] = {}
+    stack = [t for t in roots if t in ix.task_index]
+    while stack:
+        tid = stack.pop()
+        if tid in out:
+            continue
+        out[tid] = ix.subtask_ids(ix.task_index[tid])
+        stack.extend(t for t in out[tid] if t not in out)
+    return out
+
+
+def _task_tree(roots: List[str], closure: Dict[str, List[str]]) -> Iterable[tuple]:
+    """(tâche, profondeur minimale) des tâches d'une quête, parcours en largeur."""
+    depth = {t: 0 for t in roots}
+    level = list(depth)
+    while level:
+        nxt = []
+        for tid in level:
+            for sub in closure.get(tid, ()):
+                if sub not in depth:
+                    depth[sub] = depth[tid] + 1
+                    nxt.append(sub)
+        level = nxt
+    return depth.items()
+
+
+def _quest_task_ids(q: dict) -> List[str]:
+    return [t if isinstance(t, str) else t.get('task_id') for t in q.get('tasks') or ()
+            if isinstance(t, str) or isinstance(t, dict)]
+
+
+def write_sqlite(data: dict, path: str, ix=None) -> dict:
+    """
+    Écrit la base (remplace `path`) ; `ix` (Indexes du build) donne les lignes complètes
+    des tâches et leurs sous-tâches — sans lui, table des tâches de la sortie (schéma 2)
+    ou lignes recopiées (schéma 1), sans sous-tâches. Retourne le nombre de lignes par table.
+    """
+    quests = data['quests']
+    if ix is not None:
+        closure = _task_closure((t for q in quests for t in _quest_task_ids(q)), ix)
+        task_rows = {tid: ix.task_index[tid] for tid in closure}
+    else:
+        closure = {}
+        if isinstance(data.get('tasks'), dict):
+            task_rows = dict(data['tasks'])
+        else:
+            task_rows = {t['task_id']: t['data'] for q in quests for t in q.get('tasks') or ()
+                         if isinstance(t, dict) and isinstance(t.get('data'), dict)}
+
+    quest_cols = _columns(({k: v for k, v in q.items() if k not in NORMALIZED} for q in quests), skip=('id',))
+    task_cols = _columns(task_rows.values(), skip=('task_id',), always=TASK_INDEXED)
+
+    tmp = path + '.tmp'
+    if os.path.exists(tmp):
+        os.remove(tmp)
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    con = sqlite3.connect(tmp)
+    counts: Dict[str, int] = {}
+    try:
+        con.execute('PRAGMA journal_mode = OFF')
+        con.execute('PRAGMA synchronous = OFF')
+        with con:
+            con.execute(f"CREATE TABLE quests (id TEXT PRIMARY KEY, {', '.join(map(_quote, quest_cols))})"
+                        if quest_cols else "CREATE TABLE quests (id TEXT PRIMARY KEY)")
+            con.execute(f"CREATE TABLE tasks (task_id TEXT PRIMARY KEY, {', '.join(map(_quote, task_cols))})")
+            con.executescript("""
+                CREATE TABLE quest_tasks (quest_id TEXT NOT NULL, pos INTEGER NOT NULL, task_id TEXT NOT NULL,
+                                          PRIMARY KEY (quest_id, pos));
+                CREATE TABLE task_subtasks (task_id TEXT NOT NULL, pos INTEGER NOT NULL, subtask_id TEXT NOT NULL,
+                                            PRIMARY KEY (task_id, pos));
+                CREATE TABLE edges (src TEXT NOT NULL, dst TEXT NOT NULL, kind TEXT NOT NULL,
+                                    alternative INTEGER NOT NULL, redundant INTEGER NOT NULL,
+                                    PRIMARY KEY (src, dst, kind));
+                CREATE TABLE item_rewards (quest_id TEXT NOT NULL, pos INTEGER NOT NULL, item_id TEXT, name TEXT,
+                                           icon TEXT, rarity TEXT, qty INTEGER, PRIMARY KEY (quest_id, pos));
+                CREATE TABLE quest_texts (quest_id TEXT NOT NULL, pos INTEGER NOT NULL, text TEXT NOT NULL,
+                                          PRIMARY KEY (quest_id, pos));
+                CREATE TABLE quest_task_tree (quest_id TEXT NOT NULL, task_id TEXT NOT NULL, depth INTEGER NOT NULL,
+                                              PRIMARY KEY (quest_id, task_id));
+                CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+            """)
+            con.execute(f"CREATE TABLE tokens (quest_id TEXT NOT NULL, text_pos INTEGER NOT NULL, pos INTEGER NOT NULL, "
+                        f"kind TEXT NOT NULL, {', '.join(f'{_quote(f)} TEXT' for f in TOKEN_FIELDS)}, "
+                        f"PRIMARY KEY (quest_id, text_pos, pos))")
+
+            def insert(table: str, cols: List[str], rows: Iterable[tuple]):
+                cur = con.executemany(f"INSERT OR IGNORE INTO {table} ({', '.join(map(_quote, cols))}) "
+                                      f"VALUES ({', '.join('?' * len(cols))})", rows)
+                counts[table] = counts.get(table, 0) + max(cur.rowcount, 0)
+
+            def quest_value(q: dict, col: str):
+                v = _coalesce(q, quest_cols[col])
+                return json.dumps(v, ensure_ascii=False) if col in JSON_FIELDS and v is not None else _value(v)
+            insert('quests', ['id', *quest_cols],
+                   ((q['id'], *(quest_value(q, c) for c in quest_cols)) for q in quests))
+            insert('tasks', ['task_id', *task_cols],
+                   ((tid, *(_value(_coalesce(row, keys)) for keys in task_cols.values()))
+                    for tid, row in task_rows.items()))
+            insert('quest_tasks', ['quest_id', 'pos', 'task_id'],
+                   ((q['id'], i, t) for q in quests for i, t in enumerate(_quest_task_ids(q))))
+            insert('task_subtasks', ['task_id', 'pos', 'subtask_id'],
+                   ((tid, i, s) for tid, subs in closure.items() for i, s in enumerate(subs)))
+
+            def edge_rows():
+                for q in quests:
+                    alt = set(q.get('alternative_prerequisites') or ())
+                    red = set(q.get('redundant_prerequisites') or ())
+                    for src in q.get('prerequisites') or ():
+                        yield src, q['id'], 'pre', int(src in alt), int(src in red)
+                    for src in q.get('not_prerequisites') or ():
+                        yield src, q['id'], 'not', 0, 0
+            insert('quest_task_tree', ['quest_id', 'task_id', 'depth'],
+                   ((q['id'], tid, depth) for q in quests for tid, depth in _task_tree(_quest_task_ids(q), closure)))
+            insert('edges', ['src', 'dst', 'kind', 'alternative', 'redundant'], edge_rows())
+            insert('item_rewards', ['quest_id', 'pos', 'item_id', 'name', 'icon', 'rarity', 'qty'],
+                   ((q['id'], i, *(_value(it.get(k)) for k in ('id', 'name', 'icon', 'rarity', 'qty')))
+                    for q in quests for i, it in enumerate(q.get('item_rewards') or ()) if isinstance(it, dict)))
+            texts = [(q['id'], i, str(t)) for q in quests for i, t in enumerate(q.get('task_desc_texts') or ())]
+            insert('quest_texts', ['quest_id', 'pos', 'text'], texts)
+            insert('tokens', ['quest_id', 'text_pos', 'pos', 'kind', *TOKEN_FIELDS],
+                   ((qid, tp, i, kind, *(kv.get(f) for f in TOKEN_FIELDS))
+                    for qid, tp, text in texts for i, (kind, kv) in enumerate(parse_tokens(text))))
+            meta = {k: v for k, v in data.items() if k not in ('quests', 'tasks', 'layout')}
+            meta['sqlite_version'] = SQLITE_VERSION
+            insert('meta', ['key', 'value'], ((k, json.dumps(v, ensure_ascii=False)) for k, v in meta.items()))
+
+            for table, cols in _INDEXES:
+                # colonnes absentes de cet export (ex. pas de colonne Type dans ObjectiveTasks)
+                known = {'quests': quest_cols, 'tasks': task_cols}.get(table)
+                if known is not None and not _has_columns(known, cols):
+                    continue
+                con.execute(f"CREATE INDEX {_quote('ix_' + table + '_' + '_'.join(cols))} "
+                            f"ON {table} ({', '.join(map(_quote, cols))})")
+        con.execute('ANALYZE')
+    finally:
+        con.close()
+    os.replace(tmp, path)
+    return counts
+
+
+def format_counts(counts: Dict[str, int]) -> str:
+    return ', '.join(f"{table} {n:,}" for table, n in counts.items())
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Exporte un quests.json existant en base SQLite (sans sous-tâches)")
+    ap.add_argument('quests_json')
+    ap.add_argument('sqlite_path')
+    args = ap.parse_args(argv)
+    t0 = time.perf_counter()
+    counts = write_sqlite(read_output(args.quests_json), args.sqlite_path)
+    print(f"[OK] {args.sqlite_path} ({os.path.getsize(args.sqlite_path):,} o) en "
+          f"{(time.perf_counter() - t0) * 1000:.0f} ms : {format_counts(counts)}")
+
+
+if __name__ == '__main__':
+    main()
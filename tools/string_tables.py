@@ -0,0 +1,162 @@
+# Tables de chaînes partagées pour la sortie (--intern) : valeurs répétées remplacées par des indices
+#
+# Une part importante de quests.json est faite des mêmes chaînes répétées (type de quête,
+# icônes, rareté, colonne Type des tâches…) et des mêmes préfixes d'URL (CDN nw-buddy des
+# icônes / POI, nwdb.info des créatures) dans les jetons {{ITEM|POI|VC::…}}.
+#
+#  - strings  : table des valeurs des champs « répétitifs », triée par fréquence ; dans les
+#               enregistrements, la valeur est remplacée par son indice (null reste null).
+#               Un champ est interné si toutes ses valeurs sont des chaînes (ou null) et
+#               qu'il y a au moins deux occurrences par valeur distincte en moyenne.
+#  - prefixes : préfixes d'URL fréquents ; dans la table strings et les task_desc_texts,
+#               chaque occurrence est remplacée par un caractère de la zone d'usage privé
+#               Unicode (U+E000 + n), 3 octets au lieu de ~60.
+#
+# Les champs internés sont listés dans data["interned"]["fields"] par type d'enregistrement
+# (quest, item_reward, task) : décodage sans perte, ici (decode_interned) comme dans le
+# front (src/utils/questData.ts).
+import re
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, Optional
+
+INTERN_VERSION = 1
+PUA_BASE = 0xE000
+MAX_PREFIXES = 0xF8FF - PUA_BASE + 1
+_URL_DIR = re.compile(r'https?://[^\s"{}:]+/')
+_PUA = re.compile('[\ue000-\uf8ff]')
+TEXT_FIELDS = ('task_desc_texts',)
+
+
+def _records(data: dict) -> Dict[str, List[dict]]:
+    """Enregistrements de la sortie par type : quêtes, récompenses d'objets, lignes de tâches."""
+    quests = data.get('quests', [])
+    tasks = data.get('tasks')
+    if isinstance(tasks, dict):
+        task_rows = list(tasks.values())
+    else:  # schéma 1 : lignes recopiées dans les quêtes
+        task_rows = [t['data'] for q in quests for t in q.get('tasks') or () if isinstance(t, dict)
+                     and isinstance(t.get('data'), dict)]
+    return {'quest': quests,
+            'item_reward': [it for q in quests for it in q.get('item_rewards') or () if isinstance(it, dict)],
+            'task': task_rows}
+
+
+def _repetitive_fields(records: List[dict]) -> List[str]:
+    values: Dict[str, list] = {}
+    for rec in records:
+        for k, v in rec.items():
+            values.setdefault(k, []).append(v)
+    out = []
+    for k, vs in values.items():
+        strs = [v for v in vs if v is not None]
+        if len(strs) >= 4 and all(isinstance(v, str) for v in strs) and len(set(strs)) * 2 <= len(strs):
+            out.append(k)
+    return out
+
+
+def _texts(data: dict) -> Iterator[str]:
+    for q in data.get('quests', []):
+        for field in TEXT_FIELDS:
+            for t in q.get(field) or ():
+                if isinstance(t, str):
+                    yield t
+
+
+def _pick_prefixes(texts: Iterable[str]) -> List[str]:
+    counts = Counter(m for t in texts for m in _URL_DIR.findall(t))
+    # gain approximatif : (longueur - 1 caractère) par occurrence
+    ranked = sorted((p for p, c in counts.items() if c >= 4), key=lambda p: -(len(p) - 1) * counts[p])
+    return ranked[:MAX_PREFIXES]
+
+
+def encode_interned(data: dict) -> dict:
+    """Copie de `data` avec tables de chaînes et de préfixes (data n'est pas modifié)."""
+    kinds = _records(data)
+    fields = {kind: _repetitive_fields(recs) for kind, recs in kinds.items()}
+    counts: Counter = Counter()
+    for kind, recs in kinds.items():
+        for rec in recs:
+            counts.update(rec[f] for f in fields[kind] if rec.get(f) is not None)
+    strings = sorted(counts, key=lambda s: (-counts[s], s))
+    index = {s: i for i, s in enumerate(strings)}
+
+    prefixes = _pick_prefixes(list(strings) + list(_texts(data)))
+    if any(_PUA.search(s) for s in strings) or any(_PUA.search(t) for t in _texts(data)):
+        print("[WARN] --intern : caractères d'usage privé déjà présents dans les textes — préfixes d'URL non codés")
+        prefixes = []
+    prefix_re = re.compile('|'.join(re.escape(p) for p in sorted(prefixes, key=len, reverse=True))) \
+        if prefixes else None
+    prefix_char = {p: chr(PUA_BASE + i) for i, p in enumerate(prefixes)}
+
+    def code(text: str) -> str:
+        return prefix_re.sub(lambda m: prefix_char[m.group(0)], text) if prefix_re else text
+
+    def intern(rec: dict, kind: str) -> dict:
+        return {k: (index[v] if k in fields[kind] and v is not None else v) for k, v in rec.items()}
+
+    quests = []
+    for q in data.get('quests', []):
+        q = intern(q, 'quest')
+        if isinstance(q.get('item_rewards'), list):
+            q['item_rewards'] = [intern(it, 'item_reward') if isinstance(it, dict) else it
+                                 for it in q['item_rewards']]
+        for field in TEXT_FIELDS:
+            if isinstance(q.get(field), list):
+                q[field] = [code(t) if isinstance(t, str) else t for t in q[field]]
+        if isinstance(q.get('tasks'), list):
+            q['tasks'] = [{**t, 'data': intern(t['data'], 'task')}
+                          if isinstance(t, dict) and isinstance(t.get('data'), dict) else t for t in q['tasks']]
+        quests.append(q)
+
+    out = {'interned': {'version': INTERN_VERSION, 'strings': [code(s) for s in strings], 'prefixes': prefixes,
+                        'fields': fields, 'texts': list(TEXT_FIELDS)}}
+    for k, v in data.items():
+        if k == 'quests':
+            v = quests
+        elif k == 'tasks' and isinstance(v, dict):
+            v = {tid: intern(row, 'task') for tid, row in v.items()}
+        out[k] = v
+    return out
+
+
+def decode_interned(data: dict) -> dict:
+    """Inverse de encode_interned (sortie sans clé 'interned' rendue telle quelle)."""
+    meta: Optional[dict] = data.get('interned')
+    if meta is None:
+        return data
+    if meta.get('version') != INTERN_VERSION:
+        raise ValueError(f"tables de chaînes version {meta.get('version')} non supportée")
+    prefixes = meta['prefixes']
+
+    def expand(text: str) -> str:
+        return _PUA.sub(lambda m: prefixes[ord(m.group(0)) - PUA_BASE], text) if prefixes else text
+
+    strings = [expand(s) for s in meta['strings']]
+    fields = {kind: set(fs) for kind, fs in meta['fields'].items()}
+
+    def restore(rec: dict, kind: str) -> dict:
+        return {k: (strings[v] if k in fields.get(kind, ()) and v is not None else v) for k, v in rec.items()}
+
+    quests = []
+    for q in data['quests']:
+        q = restore(q, 'quest')
+        if isinstance(q.get('item_rewards'), list):
+            q['item_rewards'] = [restore(it, 'item_reward') if isinstance(it, dict) else it
+                                 for it in q['item_rewards']]
+        for field in meta['texts']:
+            if isinstance(q.get(field), list):
+                q[field] = [expand(t) if isinstance(t, str) else t for t in q[field]]
+        if isinstance(q.get('tasks'), list):
+            q['tasks'] = [{**t, 'data': restore(t['data'], 'task')}
+                          if isinstance(t, dict) and isinstance(t.get('data'), dict) else t for t in q['tasks']]
+        quests.append(q)
+    out = {}
+    for k, v in data.items():
+        if k == 'quests':
+            v = quests
+        elif k == 'tasks' and isinstance(v, dict):
+            v = {tid: restore(row, 'task') for tid, row in v.items()}
+        elif k == 'interned':
+            continue
+        out[k] = v
+    return out
@@ -0,0 +1,282 @@
+#!/usr/bin/env python3
+# Index de déblocage des quêtes (public/data/quests.unlock.json, --unlock-index)
+#
+# Chaque quête reçoit un indice dense dans un ordre topologique des prérequis positifs
+# (ordre du fichier à égalité) : les ancêtres d'une quête ont un indice plus petit, une
+# chaîne triée par indice se joue dans l'ordre et les bitsets ont peu d'octets de poids fort.
+#
+#   requires   prérequis obligatoires directs (prerequisites hors alternatives)
+#   any_of     alternatives directes (prérequis sous un '||') : au moins une suffit
+#   excludes   not_prerequisites : une seule terminée bloque la quête
+#   ancestors  fermeture des prérequis obligatoires, bitset (base64, petit-boutiste, octets
+#              nuls de poids fort retirés) ; cycles : les membres sont ancêtres les uns des
+#              autres (la quête elle-même exclue)
+#   rewards / chain_rewards  XP, pièces, azoth de la quête, et cumul sur ancêtres + quête
+#
+# Les '||' de l'expression d'achievement sont ramenés à un seul groupe « au moins une
+# alternative » par quête : approximation de required_achievements_ast, qui reste la
+# référence pour un cas précis. Module utilisable hors navigateur :
+#
+#   python tools/unlock_index.py public/data/quests.unlock.json --progress characters.json
+#   python tools/unlock_index.py public/data/quests.unlock.json --progress characters.json --target 12_demonstorm2
+#
+# characters.json : export du localStorage 'nwq-characters-v1' du front
+# ({characters: [{name, completed: {id: bool}}]}) ou simple liste d'ids terminés.
+import json, base64, heapq, argparse
+from typing import Dict, Iterable, List
+
+UNLOCK_VERSION = 1
+REWARD_FIELDS = {'xp': 'experience_reward', 'coin': 'currency_reward', 'azoth': 'azoth_reward'}
+
+
+def pack_bits(mask: int) -> str:
+    return base64.b64encode(mask.to_bytes((mask.bit_length() + 7) // 8, 'little')).decode('ascii')
+
+
+def unpack_bits(text: str) -> int:
+    return int.from_bytes(base64.b64decode(text), 'little')
+
+
+def _popcount(mask: int) -> int:
+    return bin(mask).count('1')
+
+
+def _bits(mask: int) -> Iterable[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def _topo_order(quests: List[dict]) -> List[int]:
+    """Positions des quêtes en ordre topologique (prérequis positifs), ordre du fichier à égalité."""
+    pos = {q['id']: i for i, q in enumerate(quests)}
+    succ: List[List[int]] = [[] for _ in quests]
+    indeg = [0] * len(quests)
+    for i, q in enumerate(quests):
+        for src in dict.fromkeys(q.get('prerequisites') or ()):
+            if src in pos and pos[src] != i:
+                succ[pos[src]].append(i)
+                indeg[i] += 1
+    heap = [i for i, d in enumerate(indeg) if not d]
+    heapq.heapify(heap)
+    order: List[int] = []
+    while heap:
+        i = heapq.heappop(heap)
+        order.append(i)
+        for j in succ[i]:
+            indeg[j] -= 1
+            if not indeg[j]:
+                heapq.heappush(heap, j)
+    if len(order) < len(quests):  # quêtes prises dans un cycle (ou en aval) : ordre du fichier
+        seen = set(order)
+        order += [i for i in range(len(quests)) if i not in seen]
+    return order
+
+
+def build_unlock_index(quests: List[dict]) -> dict:
+    """Index (structure JSON) des quêtes de build_quests."""
+    order = _topo_order(quests)
+    ordered = [quests[i] for i in order]
+    dense = {q['id']: n for n, q in enumerate(ordered)}
+
+    def refs(ids) -> List[int]:
+        return sorted({dense[s] for s in ids or () if s in dense})
+
+    requires, any_of, excludes = [], [], []
+    for n, q in enumerate(ordered):
+        alternatives = set(q.get('alternative_prerequisites') or ())
+        requires.append([p for p in refs(s for s in q.get('prerequisites') or () if s not in alternatives) if p != n])
+        any_of.append([p for p in refs(alternatives) if p != n])
+        excludes.append([p for p in refs(q.get('not_prerequisites')) if p != n])
+
+    # fermeture en ordre topologique, puis points fixes tant qu'un cycle fait encore changer
+    ancestors = [0] * len(ordered)
+    changed = True
+    while changed:
+        changed = False
+        for n, reqs in enumerate(requires):
+            mask = 0
+            for p in reqs:
+                mask |= ancestors[p] | (1 << p)
+            mask &= ~(1 << n)
+            if mask != ancestors[n]:
+                ancestors[n] = mask
+                changed = True
+
+    rewards = {k: [int(q.get(f) or 0) for q in ordered] for k, f in REWARD_FIELDS.items()}
+    chain = {k: [v[n] + sum(v[a] for a in _bits(ancestors[n])) for n in range(len(ordered))]
+             for k, v in rewards.items()}
+    return {'version': UNLOCK_VERSION, 'ids': [q['id'] for q in ordered],
+            'titles': [q.get('title') or '' for q in ordered],
+            'requires': requires, 'any_of': any_of, 'excludes': excludes,
+            'ancestors': [pack_bits(m) for m in ancestors],
+            'rewards': rewards, 'chain_rewards': chain}
+
+
+class UnlockIndex:
+    """Requêtes de progression sur un index produit par build_unlock_index (progression = bitset)."""
+
+    def __init__(self, index: dict):
+        if index.get('version') != UNLOCK_VERSION:
+            raise ValueError(f"version d'index de déblocage non supportée: {index.get('version')}")
+        self.ids: List[str] = index['ids']
+        self.titles: List[str] = index['titles']
+        self.pos: Dict[str, int] = {qid: n for n, qid in enumerate(self.ids)}
+        self.requires: List[List[int]] = index['requires']
+        self.any_of: List[List[int]] = index['any_of']
+        self.excludes: List[List[int]] = index['excludes']
+        self.ancestors: List[int] = [unpack_bits(s) for s in index['ancestors']]
+        self.rewards: Dict[str, List[int]] = index['rewards']
+        self.chain_rewards: Dict[str, List[int]] = index['chain_rewards']
+
+        def masks(lists: List[List[int]]) -> List[int]:
+            return [sum(1 << p for p in refs) for refs in lists]
+
+        self.requires_mask = masks(self.requires)
+        self.any_of_mask = masks(self.any_of)
+        self.excludes_mask = masks(self.excludes)
+
+    @classmethod
+    def load(cls, path: str) -> 'UnlockIndex':
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def mask(self, completed) -> int:
+        """Progression -> bitset ; `completed` : ids terminés ou dict id -> bool du store."""
+        if isinstance(completed, dict):
+            completed = (qid for qid, done in completed.items() if done)
+        out = 0
+        for qid in completed:
+            n = self.pos.get(qid)
+            if n is not None:
+                out |= 1 << n
+        return out
+
+    def ids_of(self, mask: int) -> List[str]:
+        """Ids d'un bitset, dans l'ordre de jeu (indice dense)."""
+        return [self.ids[n] for n in _bits(mask)]
+
+    def is_available(self, n: int, done: int) -> bool:
+        return (not done >> n & 1 and not self.requires_mask[n] & ~done
+                and (not self.any_of_mask[n] or bool(self.any_of_mask[n] & done))
+                and not self.excludes_mask[n] & done)
+
+    def available(self, done: int) -> List[str]:
+        """Quêtes jouables maintenant : non terminées, prérequis faits, aucune exclusion terminée."""
+        return [self.ids[n] for n in range(len(self.ids)) if self.is_available(n, done)]
+
+    def available_many(self, progress: List[int]) -> List[List[str]]:
+        """
+        `available` pour plusieurs personnages à la fois : progression transposée (un entier
+        par quête, un bit par personnage), puis quelques opérations bit à bit par quête.
+        """
+        everyone = (1 << len(progress)) - 1
+        col = [0] * len(self.ids)
+        for c, done in enumerate(progress):
+            for n in _bits(done):
+                col[n] |= 1 << c
+        out: List[List[str]] = [[] for _ in progress]
+        for n, qid in enumerate(self.ids):
+            ok = everyone & ~col[n]
+            for p in self.requires[n]:
+                ok &= col[p]
+            if self.any_of[n]:
+                any_done = 0
+                for p in self.any_of[n]:
+                    any_done |= col[p]
+                ok &= any_done
+            for p in self.excludes[n]:
+                ok &= ~col[p]
+            for c in _bits(ok):
+                out[c].append(qid)
+        return out
+
+    def remaining_chain(self, target: str, done: int) -> int:
+        """
+        Plus courte chaîne restante (bitset, quête cible comprise) : ancêtres obligatoires non
+        faits, plus pour chaque groupe d'alternatives non satisfait l'alternative dont la
+        propre chaîne restante est la plus courte (choix glouton).
+        """
+        t = self.pos[target]
+        need = (self.ancestors[t] | (1 << t)) & ~done
+        pending = list(_bits(need))
+        while pending:
+            n = pending.pop()
+            if not self.any_of_mask[n] or self.any_of_mask[n] & (done | need):
+                continue
+            best = min(self.any_of[n], key=lambda a: (_popcount((self.ancestors[a] | (1 << a)) & ~done & ~need), a))
+            extra = (self.ancestors[best] | (1 << best)) & ~done & ~need
+            need |= extra
+            pending += _bits(extra)
+        return need
+
+    def blocked_by(self, target: str, done: int) -> dict:
+        """
+        Ce qui empêche de jouer `target` : prérequis manquants (chaîne restante hors cible) et
+        quêtes terminées qui excluent la cible ou une quête de sa chaîne (blocage définitif).
+        """
+        chain = self.remaining_chain(target, done)
+        missing = chain & ~(1 << self.pos[target])
+        excluded_by = 0
+        for n in _bits(chain):
+            excluded_by |= self.excludes_mask[n] & done
+        return {'missing': self.ids_of(missing), 'excluded_by': self.ids_of(excluded_by),
+                'available': self.is_available(self.pos[target], done)}
+
+    def rewards_of(self, mask: int) -> Dict[str, int]:
+        """XP, pièces et azoth cumulés des quêtes d'un bitset."""
+        bits = list(_bits(mask))
+        return {k: sum(v[n] for n in bits) for k, v in self.rewards.items()}
+
+
+def load_progress(path: str) -> Dict[str, List[str]]:
+    """Export du store du front (personnages) ou liste d'ids terminés -> nom -> ids."""
+    with open(path, 'r', encoding='utf-8') as f:
+        raw = json.load(f)
+    if isinstance(raw, list):
+        return {'progress': [str(x) for x in raw]}
+    chars = raw.get('characters', [])
+    return {c.get('name') or c.get('id') or f"#{i}": [qid for qid, done in (c.get('completed') or {}).items() if done]
+            for i, c in enumerate(chars)}
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Quêtes disponibles / bloquantes / chaîne restante d'après une progression")
+    ap.add_argument('index')
+    ap.add_argument('--progress', help="export du localStorage 'nwq-characters-v1' ou liste JSON d'ids terminés")
+    ap.add_argument('--target', action='append', default=[], metavar='QUEST_ID',
+                    help="quête visée : prérequis manquants, exclusions, chaîne restante et récompenses")
+    ap.add_argument('--limit', type=int, default=20, help="quêtes disponibles affichées par personnage")
+    args = ap.parse_args(argv)
+    ix = UnlockIndex.load(args.index)
+    progress = load_progress(args.progress) if args.progress else {'progress': []}
+    names = list(progress)
+    masks = [ix.mask(progress[name]) for name in names]
+    for t in args.target:
+        if t not in ix.pos:
+            ap.error(f"quête inconnue: {t}")
+    for name, done, avail in zip(names, masks, ix.available_many(masks)):
+        print(f"[OK] {name}: {_popcount(done)} quête(s) terminée(s), {len(avail)} disponible(s)")
+        for qid in avail[:args.limit]:
+            print(f"       - {qid}  {ix.titles[ix.pos[qid]]}")
+        if len(avail) > args.limit:
+            print(f"       … {len(avail) - args.limit} autre(s)")
+        for t in args.target:
+            info = ix.blocked_by(t, done)
+            chain = ix.remaining_chain(t, done)
+            gain = ix.rewards_of(chain)
+            state = 'disponible' if info['available'] else 'terminée' if done >> ix.pos[t] & 1 else 'bloquée'
+            print(f"  {t} ({state}) : {_popcount(chain)} quête(s) restante(s), "
+                  f"+{gain['xp']:,} XP, +{gain['coin']:,} pièces, +{gain['azoth']:,} azoth")
+            if info['excluded_by']:
+                print(f"  [WARN] exclue par : {', '.join(info['excluded_by'])}")
+            for qid in ix.ids_of(chain):
+                print(f"       {qid}  {ix.titles[ix.pos[qid]]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,255 @@
+# Mode --watch du convertisseur : index gardés en mémoire, rebuild incrémental
+#
+# Les sources sont surveillées par scrutation (stat toutes les `interval` s, sans
+# dépendance) ; un changement n'est traité qu'une fois taille et mtime stables sur un
+# tour, pour ne pas lire un fichier en cours d'écriture. Selon la source modifiée :
+#  - CSV des quêtes       : relu ; seules les quêtes dont la colonne Task a changé
+#                           recalculent leurs descriptions
+#  - shards ObjectiveTasks : seuls les shards modifiés / ajoutés / supprimés sont relus,
+#                           puis re-fusionnés ; seules les quêtes dont une tâche a changé
+#                           recalculent leurs descriptions
+#  - manual_links.json    : ré-appliqué, aucune description recalculée
+#  - items / locale / POI / vitals : source relue (noms POI et vitals re-résolus quand la
+#                           locale change) ; toutes les descriptions sont recalculées.
+#                           Avec --referenced-only, items / POI / vitals / locale sont aussi
+#                           relus quand une quête ou tâche modifiée référence une clé non chargée
+#  - autres langues (--locales) : variantes quests.<lang>.json (et leurs index / parts)
+#                           refaites quand la sortie change ou que leur fichier est modifié
+# Le layout est repris vue par vue (memo de compute_layouts) : seules les vues dont les
+# nœuds ou arêtes ont changé sont recalculées. La sortie est réécrite atomiquement, et
+# pas du tout si son contenu n'a pas changé (pas de rechargement inutile côté Vite) ;
+# avec --split / --search-index / --unlock-index / --sqlite / --locales, manifest, parts, index,
+# base et variantes de langue suivent (seules les parts dont le contenu change changent de nom).
+import os, glob, time
+from typing import Dict, List, Optional, Set, Tuple
+
+from output_formats import write_outputs
+from quest_delta import remove_delta
+from search_index import build_search_index
+from split_output import write_split
+from sqlite_export import write_sqlite
+from unlock_index import build_unlock_index
+from quest_pipeline import (MANUAL_PATH, Indexes, LocaleIndex, build_locale_variants, build_quests,
+                            list_objective_task_files, load_items, load_locale, load_objective_tasks_file,
+                            load_poi_records, load_quest_rows, load_vitals_records, locale_output_path,
+                            referenced_keys)
+
+Snapshot = Dict[str, Tuple[str, int, int]]  # chemin absolu -> (source, taille, mtime_ns)
+
+
+def snapshot_sources(sources: Dict[str, Optional[str]], manual_path: str = MANUAL_PATH) -> Snapshot:
+    """État (taille, mtime) de chaque fichier d'entrée, y compris les shards et POI présents."""
+    snap: Snapshot = {}
+
+    def add(kind: str, path: Optional[str]):
+        if not path:
+            return
+        try:
+            st = os.stat(path)
+        except OSError:
+            return
+        snap[os.path.abspath(path)] = (kind, st.st_size, st.st_mtime_ns)
+
+    add('quests', sources.get('quests_csv'))
+    add('items', sources.get('items_csv'))
+    if sources.get('objective_tasks_path') is not None:
+        for fp in list_objective_task_files(sources['objective_tasks_path']):
+            add('tasks', fp)
+    add('locale', sources.get('locale_json'))
+    poi_dir = sources.get('poi_dir')
+    if poi_dir and os.path.isdir(poi_dir):
+        for fp in glob.glob(os.path.join(poi_dir, "javelindata_poidefinitions_*.json")):
+            add('poi', fp)
+    add('vitals', sources.get('vitals_json'))
+    for fp in sources.get('locales') or ():
+        add('locales', fp)
+    add('manual', manual_path)
+    return snap
+
+
+def diff_snapshots(old: Snapshot, new: Snapshot) -> Dict[str, str]:
+    """Fichiers ajoutés, modifiés ou supprimés -> source concernée."""
+    return {p: (new.get(p) or old[p])[0] for p in old.keys() | new.keys() if old.get(p) != new.get(p)}
+
+
+class WatchSession:
+    """
+    État chaud d'un --watch : lignes de quêtes, index, contenu de chaque shard, mémos de
+    descriptions et de layout, dernière sortie écrite.
+    """
+
+    def __init__(self, sources: Dict[str, Optional[str]], rows: List[dict], ix: Indexes,
+                 shards: Dict[str, Dict[str, dict]], out_path: str, build_opts: dict, write_opts: dict,
+                 desc_memo: Optional[Dict[str, tuple]] = None, layout_memo: Optional[Dict[tuple, tuple]] = None,
+                 manual_path: str = MANUAL_PATH, last_data: Optional[dict] = None, split_by: Optional[str] = None,
+                 search_index: bool = False, unlock_index: bool = False, sqlite_path: Optional[str] = None,
+                 locales: Optional[Dict[str, str]] = None, jobs: int = 1):
+        self.sources = sources
+        self.rows = rows
+        self.ix = ix
+        self.shards = {os.path.abspath(fp): frag for fp, frag in shards.items()}
+        self.out_path = out_path
+        self.build_opts = build_opts
+        self.write_opts = write_opts
+        self.desc_memo: Dict[str, tuple] = desc_memo if desc_memo is not None else {}
+        self.layout_memo: Dict[tuple, tuple] = layout_memo if layout_memo is not None else {}
+        self.manual_path = manual_path
+        self.split_by = split_by
+        self.search_index = search_index
+        self.unlock_index = unlock_index
+        self.sqlite_path = sqlite_path
+        self.locales = locales or {}
+        self.jobs = jobs
+        self._last = self._content(last_data) if last_data is not None else None
+
+    @staticmethod
+    def _content(data: dict) -> dict:
+        return {k: v for k, v in data.items() if k != 'generated_at'}
+
+    # ----- rechargements ciblés -----
+    def _reload_shards(self, paths: List[str]) -> Set[str]:
+        """Relit les shards modifiés, re-fusionne ; retourne les TaskID dont la ligne fusionnée a changé."""
+        touched: Set[str] = set()
+        for fp in paths:
+            old = self.shards.pop(fp, {})
+            frag = {}
+            if os.path.isfile(fp):
+                try:
+                    res = load_objective_tasks_file(fp)
+                except Exception as e:
+                    print(f"[WARN] Lecture impossible: {fp} ({e}) — version précédente conservée")
+                    res = (old, len(old))
+                if res is None:
+                    print(f"[WARN] Colonne 'TaskID' absente dans {os.path.basename(fp)} — ignoré")
+                else:
+                    frag = res[0]
+                    self.shards[fp] = frag
+            touched |= old.keys() | frag.keys()
+        # fusion dans l'ordre trié des fichiers : la dernière occurrence gagne, comme au chargement
+        merged: Dict[str, dict] = {}
+        for fp in list_objective_task_files(self.sources['objective_tasks_path']):
+            merged.update(self.shards.get(os.path.abspath(fp), {}))
+        old_idx = self.ix.task_index
+        self.ix.task_index = merged
+        print(f"[OK] ObjectiveTasks re-fusionnés: {len(merged)} ({len(paths)} shard(s) relu(s))")
+        return {t for t in touched if old_idx.get(t) != merged.get(t)}
+
+    def _write_index(self, build, quests: List[dict], path: str, suffix: str):
+        write_outputs(build(quests), os.path.splitext(path)[0] + suffix, minify=True, gz=self.write_opts['gz'],
+                      br=self.write_opts['br'])
+
+    def _write_locales(self, data: dict):
+        """Variantes --locales de `data` (fichiers de locale relus), avec leur index de recherche et parts."""
+        for lang, variant in build_locale_variants(data, self.ix, self.locales, jobs=self.jobs).items():
+            path = locale_output_path(self.out_path, lang)
+            write_outputs(variant, path, **self.write_opts)
+            if self.search_index:
+                self._write_index(build_search_index, variant['quests'], path, '.search.json')
+            if self.split_by:
+                write_split(variant, self.out_path, by=self.split_by, lang=lang, minify=self.write_opts['minify'],
+                            gz=self.write_opts['gz'], br=self.write_opts['br'])
+
+    def rebuild(self, changed: Dict[str, str]) -> bool:
+        """Rebuild après modification de `changed` (chemin -> source). Retourne True si la sortie a été réécrite."""
+        t0 = time.perf_counter()
+        kinds = set(changed.values())
+        src, ix = self.sources, self.ix
+        all_descs = False
+        changed_tids: Set[str] = set()
+        if 'tasks' in kinds:
+            changed_tids = self._reload_shards(sorted(p for p, k in changed.items() if k == 'tasks'))
+        if 'quests' in kinds:
+            self.rows = load_quest_rows(src['quests_csv'])
+        if ix.refs is not None and kinds & {'tasks', 'quests'}:
+            # sources filtrées (--referenced-only) : une quête ou tâche peut viser une clé non chargée
+            refs = referenced_keys(ix.task_index, self.rows)
+            for kind in ('items', 'poi', 'vitals'):
+                if not refs[kind] <= ix.refs[kind]:
+                    kinds.add(kind)
+            ix.refs = refs
+        if 'items' in kinds and src.get('items_csv'):
+            ix.items_by_id, ix.items_by_name = load_items(src['items_csv'], only=ix.refs and ix.refs['items']) \
+                if os.path.isfile(src['items_csv']) else ({}, {})
+            all_descs = True
+        names = False
+        if 'poi' in kinds and src.get('poi_dir'):
+            ix.poi_records = load_poi_records(src['poi_dir'], only=ix.refs and ix.refs['poi'])
+            names = True
+        if 'vitals' in kinds and src.get('vitals_json'):
+            ix.vitals_records = load_vitals_records(src['vitals_json'], only=ix.refs and ix.refs['vitals'])
+            names = True
+        keys = ix.locale_keys()
+        missing_keys = keys is not None and ix.locale.only is not None and not keys <= ix.locale.only
+        if src.get('locale_json') and ('locale' in kinds or missing_keys):
+            ix.locale = load_locale(src['locale_json'], only=keys) if os.path.isfile(src['locale_json']) \
+                else LocaleIndex()
+            print(f"[OK] Locale rechargé: {len(ix.locale):,} entrées")
+            names = True
+        if names:
+            # noms POI / vitals résolus via la locale
+            ix.set_locale(ix.locale)
+            all_descs = True
+
+        if all_descs:
+            ix.reset_memos()
+            self.desc_memo.clear()
+        elif changed_tids:
+            ix.reset_memos(placeholders=False)
+            for qid in [qid for qid, m in self.desc_memo.items() if m[1] & changed_tids]:
+                del self.desc_memo[qid]
+
+        stats: dict = {}
+        data = build_quests(self.rows, ix, desc_memo=self.desc_memo, layout_memo=self.layout_memo,
+                            manual_path=self.manual_path, stats=stats, **self.build_opts)
+        content = self._content(data)
+        rewritten = content != self._last
+        if rewritten:
+            write_outputs(data, self.out_path, **self.write_opts)
+            if self.split_by:
+                write_split(data, self.out_path, by=self.split_by, minify=self.write_opts['minify'],
+                            gz=self.write_opts['gz'], br=self.write_opts['br'])
+            remove_delta(self.out_path)  # un delta (--delta-from) menait à la sortie précédente
+            if self.search_index:
+                self._write_index(build_search_index, data['quests'], self.out_path, '.search.json')
+            if self.unlock_index:
+                self._write_index(build_unlock_index, data['quests'], self.out_path, '.unlock.json')
+            if self.sqlite_path:
+                write_sqlite(data, self.sqlite_path, ix)
+            self._last = content
+        if self.locales and (rewritten or 'locales' in kinds):
+            self._write_locales(data)
+        names = sorted(os.path.basename(p) for p in changed)
+        views = stats.get('layout_views', (0, 0))
+        print(f"[OK] Rebuild ({', '.join(names[:3])}{' …' if len(names) > 3 else ''}) en "
+              f"{(time.perf_counter() - t0) * 1000:.0f} ms — descriptions recalculées: "
+              f"{stats['recomputed']}/{len(data['quests'])}, layout: {views[0]}/{views[1]} vue(s) recalculée(s)"
+              + (f", {len(changed_tids)} tâche(s) modifiée(s)" if 'tasks' in kinds else "")
+              + (f" -> {self.out_path}" if rewritten else " — sortie inchangée")
+              + (f", {len(self.locales)} locale(s) réécrite(s)" if self.locales and (rewritten or 'locales' in kinds)
+                 else ""))
+        return rewritten
+
+    def run(self, snapshot: Optional[Snapshot] = None, interval: float = 0.5):
+        """Boucle de surveillance (Ctrl+C pour arrêter)."""
+        snap = snapshot if snapshot is not None else snapshot_sources(self.sources, self.manual_path)
+        print(f"[INFO] --watch : {len(snap)} fichier(s) surveillé(s) (toutes les {interval:g}s), Ctrl+C pour arrêter")
+        try:
+            while True:
+                time.sleep(interval)
+                cur = snapshot_sources(self.sources, self.manual_path)
+                if cur == snap:
+                    continue
+                # attendre que les écritures en cours se terminent
+                while True:
+                    time.sleep(interval)
+                    nxt = snapshot_sources(self.sources, self.manual_path)
+                    if nxt == cur:
+                        break
+                    cur = nxt
+                changed, snap = diff_snapshots(snap, cur), cur
+                try:
+                    self.rebuild(changed)
+                except Exception as e:
+                    print(f"[WARN] Rebuild impossible ({e}) — sortie précédente conservée")
+        except KeyboardInterrupt:
+            print("[INFO] --watch arrêté")